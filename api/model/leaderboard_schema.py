@@ -0,0 +1,31 @@
+from __future__ import annotations
+from typing import List, Optional
+from pydantic import BaseModel
+from domain.model.leaderboard_entry import LeaderboardEntry
+
+
+class LeaderboardEntryResponse(BaseModel):
+    user_id: int
+    username: Optional[str] = None
+    games_played: int
+    total_buyin: float  # EUR
+    avg_buyins_per_game: float
+    profit: float  # EUR
+    roi: float  # %
+
+    @classmethod
+    def from_domain(cls, entry: LeaderboardEntry) -> LeaderboardEntryResponse:
+        stats = entry.statistics
+        return cls(
+            user_id=entry.user_id,
+            username=entry.username,
+            games_played=stats.games_num,
+            total_buyin=stats.total_buyin_money,
+            avg_buyins_per_game=stats.average_buyin_number,
+            profit=stats.profit_money,
+            roi=stats.roi,
+        )
+
+
+class LeaderboardResponse(BaseModel):
+    players: List[LeaderboardEntryResponse]
@@ -3,6 +3,7 @@ import datetime
 from typing import List, Optional
 from pydantic import BaseModel
 from domain.entity.player_action import PlayerAction
+from domain.model.roi_point import RoiPoint
 
 
 class PlayerActionResponse(BaseModel):
@@ -24,3 +25,18 @@ class PlayerActionResponse(BaseModel):
 
 class PlayerActionListResponse(BaseModel):
     actions: List[PlayerActionResponse]
+    # Передаётся как since, чтобы получить только более новые действия
+    next_cursor: Optional[int] = None
+
+
+class RoiPointResponse(BaseModel):
+    date: datetime.date
+    roi: float  # %
+
+    @classmethod
+    def from_domain(cls, point: RoiPoint) -> RoiPointResponse:
+        return cls(date=point.date, roi=point.roi)
+
+
+class RoiHistoryResponse(BaseModel):
+    points: List[RoiPointResponse]
@@ -1,11 +1,41 @@
-from fastapi import APIRouter, HTTPException
-from engine import Session
+from datetime import date
+from typing import Annotated, Optional, Tuple
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from engine import ReadAsyncSession
+from domain.repository.player_stats_rollup_repository import LEADERBOARD_SORT_FIELDS
 from domain.service.player_statistics_service import PlayerStatisticsService
-from api.model.player_stats_schema import PlayerActionListResponse, PlayerActionResponse
+from api.model.leaderboard_schema import LeaderboardEntryResponse, LeaderboardResponse
+from api.model.player_stats_schema import (
+    PlayerActionListResponse,
+    PlayerActionResponse,
+    RoiHistoryResponse,
+    RoiPointResponse,
+)
 from cachetools import TTLCache
 from config import STATS_BLOCKED_USER_IDS
 
-actions_cache = TTLCache(maxsize=500, ttl=600)  # 10 минут
+# Записи хранят версию действий пользователя (последний id и количество):
+# новое действие сразу делает запись устаревшей. TTL 10 минут
+actions_cache = TTLCache[
+    Tuple[int, Optional[int]], Tuple[str, PlayerActionListResponse], float
+](maxsize=500, ttl=600)
+# Записи хранят версию статистики всех пользователей: любой закуп или выход
+# делает таблицу лидеров устаревшей. TTL 10 минут
+leaderboard_cache = TTLCache[
+    Tuple[Optional[date], Optional[date], int, str],
+    Tuple[Tuple, LeaderboardResponse],
+    float,
+](maxsize=100, ttl=600)
+# Записи хранят версию статистики пользователя: новые закупы и выходы
+# пользователя делают его кривую ROI устаревшей. TTL 30 минут
+roi_history_cache = TTLCache[
+    Tuple[int, Optional[date], Optional[date], Optional[int]],
+    Tuple[Tuple, RoiHistoryResponse],
+    float,
+](maxsize=500, ttl=1800)
+
+# Поле сортировки; "-" в начале — по убыванию
+LEADERBOARD_SORT_PATTERN = rf"^-?({'|'.join(LEADERBOARD_SORT_FIELDS)})$"
 
 router = APIRouter()
 
@@ -16,25 +46,144 @@ router = APIRouter()
     summary="Get player actions history",
     tags=["Statistics"],
 )
-def get_player_actions(user_id: int):
+async def get_player_actions(
+    user_id: int,
+    response: Response,
+    since: Annotated[Optional[int], Query(ge=0)] = None,
+    if_none_match: Annotated[Optional[str], Header()] = None,
+):
+    """Actions of the player by time.
+
+    ``since`` is the ``next_cursor`` of an earlier response (an action id):
+    only actions recorded after it are returned. The ETag changes with
+    every new action of the player; a request with a matching
+    If-None-Match gets 304 Not Modified without a body.
+    """
     if user_id in STATS_BLOCKED_USER_IDS:
         raise HTTPException(
             status_code=403, detail="Access denied to actions for this user."
         )
 
-    if user_id in actions_cache:
-        return actions_cache[user_id]
+    key = (user_id, since)
+    async with ReadAsyncSession() as session:
+        stats_service = PlayerStatisticsService(session)
+        last_id, count = await stats_service.action_repo.get_user_actions_version(
+            user_id
+        )
+        if not count:
+            raise HTTPException(
+                status_code=404, detail="No actions found for this user."
+            )
+
+        etag = f'"{user_id}-{since or 0}-{last_id}-{count}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        cached = actions_cache.get(key)
+        if cached and cached[0] == etag:
+            result = cached[1]
+        else:
+            actions = await stats_service.action_repo.get_all_user_actions(
+                user_id, since
+            )
+            result = PlayerActionListResponse(
+                actions=[PlayerActionResponse.from_domain(a) for a in actions],
+                next_cursor=max((a.id for a in actions), default=since or 0),
+            )
+            actions_cache[key] = (etag, result)
+
+    response.headers.update(headers)
+    return result
+
 
-    session = Session()
-    stats_service = PlayerStatisticsService(session)
-    actions = stats_service.action_repo.get_all_user_actions(user_id)
-    session.close()
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match may list several tags, weak ones prefixed with W/."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
 
-    if not actions:
-        raise HTTPException(status_code=404, detail="No actions found for this user.")
 
-    response = PlayerActionListResponse(
-        actions=[PlayerActionResponse.from_domain(a) for a in actions]
+@router.get(
+    "/api/stats/{user_id}/roi_history",
+    response_model=RoiHistoryResponse,
+    summary="Get player cumulative ROI by day",
+    tags=["Statistics"],
+)
+async def get_roi_history(
+    user_id: int,
+    date_from: Annotated[Optional[date], Query(alias="from")] = None,
+    date_to: Annotated[Optional[date], Query(alias="to")] = None,
+    points: Annotated[Optional[int], Query(ge=3, le=5000)] = None,
+):
+    """Cumulative ROI at the end of every day the player played.
+
+    The ROI of each day counts the whole history up to it, also before
+    ``from``. With ``points`` the curve is downsampled to that many points
+    keeping its shape (largest triangle three buckets).
+    """
+    if user_id in STATS_BLOCKED_USER_IDS:
+        raise HTTPException(
+            status_code=403, detail="Access denied to actions for this user."
+        )
+
+    key = (user_id, date_from, date_to, points)
+    async with ReadAsyncSession() as session:
+        stats_service = PlayerStatisticsService(session)
+        version = await stats_service.rollup_repo.get_user_version(user_id)
+        cached = roi_history_cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        history = await stats_service.get_roi_history(
+            user_id, date_from, date_to, points
+        )
+
+    response = RoiHistoryResponse(
+        points=[RoiPointResponse.from_domain(p) for p in history]
+    )
+    roi_history_cache[key] = (version, response)
+    return response
+
+
+@router.get(
+    "/api/leaderboard",
+    response_model=LeaderboardResponse,
+    summary="Get player statistics for a date range",
+    tags=["Statistics"],
+)
+async def get_leaderboard(
+    date_from: Annotated[Optional[date], Query(alias="from")] = None,
+    date_to: Annotated[Optional[date], Query(alias="to")] = None,
+    min_games: Annotated[int, Query(ge=0)] = 0,
+    sort: Annotated[str, Query(pattern=LEADERBOARD_SORT_PATTERN)] = "-roi",
+):
+    """Games, buy-ins, profit and ROI of every player for the period.
+
+    Dates are inclusive, in the bot's timezone; without them the whole
+    history is used. ``sort`` is a field of the response entries, prefixed
+    with "-" for descending order.
+    """
+    key = (date_from, date_to, min_games, sort)
+    async with ReadAsyncSession() as session:
+        stats_service = PlayerStatisticsService(session)
+        version = await stats_service.rollup_repo.get_version()
+        cached = leaderboard_cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        entries = await stats_service.get_leaderboard(
+            date_from,
+            date_to,
+            min_games,
+            STATS_BLOCKED_USER_IDS,
+            sort.lstrip("-"),
+            descending=sort.startswith("-"),
+        )
+
+    response = LeaderboardResponse(
+        players=[LeaderboardEntryResponse.from_domain(e) for e in entries]
     )
-    actions_cache[user_id] = response
+    leaderboard_cache[key] = (version, response)
     return response
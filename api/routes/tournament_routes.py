@@ -1,8 +1,7 @@
-from typing import List
-from fastapi import APIRouter, HTTPException
-from sqlalchemy import select
-from domain.entity.tournament import Tournament
-from engine import Session
+from typing import Annotated, List, Optional, Tuple
+from cachetools import TTLCache
+from fastapi import APIRouter, HTTPException, Query, Response
+from engine import ReadAsyncSession
 from domain.repository.tournament_repository import TournamentRepository
 from domain.scheme.tournament_scheme import (
     TournamentResponse,
@@ -13,6 +12,17 @@ from domain.repository.player_tournament_action_repository import (
     PlayerTournamentActionRepository,
 )
 
+# Страницы списка турниров по (limit, cursor); запись хранит версию данных,
+# при изменении турниров или участников страница строится заново. TTL 30 минут
+tournaments_cache = TTLCache[
+    Tuple[Optional[int], Optional[int]],
+    Tuple[Tuple, List[TournamentResponse], Optional[int]],
+    float,
+](maxsize=100, ttl=1800)
+
+# Заголовок с курсором следующей страницы
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 router = APIRouter()
 
 
@@ -22,36 +32,46 @@ router = APIRouter()
     summary="Get all tournaments",
     tags=["Tournaments"],
 )
-def get_tournaments():
-    session = Session()
-    try:
+async def get_tournaments(
+    response: Response,
+    limit: Annotated[Optional[int], Query(ge=1, le=200)] = None,
+    cursor: Annotated[Optional[int], Query(ge=1)] = None,
+):
+    """Newest tournaments first.
+
+    Without ``limit`` every tournament is returned. With ``limit`` the id to
+    pass as ``cursor`` for the next page is sent in the X-Next-Cursor header;
+    the header is absent on the last page.
+    """
+    key = (limit, cursor)
+    async with ReadAsyncSession() as session:
         repo = TournamentRepository(session)
-        tournaments = repo.get_all_tournaments()
-
-        from domain.repository.player_tournament_action_repository import (
-            PlayerTournamentActionRepository,
-        )
+        version = await repo.get_list_version()
+
+        cached = tournaments_cache.get(key)
+        if cached and cached[0] == version:
+            page, next_cursor = cached[1], cached[2]
+        else:
+            # Одна строка сверх лимита показывает, есть ли следующая страница
+            items = await repo.find_tournament_list_page(
+                limit + 1 if limit else None, cursor
+            )
+            next_cursor = None
+            if limit and len(items) > limit:
+                items = items[:limit]
+                next_cursor = items[-1].tournament.id
 
-        action_repo = PlayerTournamentActionRepository(session)
+            page = []
+            for item in items:
+                model = TournamentResponse.from_domain(item.tournament)
+                model.winners = item.winners
+                model.total_players = item.total_players
+                page.append(model)
+            tournaments_cache[key] = (version, page, next_cursor)
 
-        response = []
-        for t in tournaments:
-            model = TournamentResponse.from_domain(t)
-
-            # Fetch winners
-            # We need a new method in action_repo or just query directly here for simplicity for now
-            # But better to use repository method.
-            # Let's add a method get_winners(tournament_id) to PlayerTournamentActionRepository.
-            winners_actions = action_repo.get_winners(t.id)
-            model.winners = [
-                f"{w.player.name or w.player.username}" for w in winners_actions
-            ]
-            model.total_players = action_repo.count_total_players(t.id)
-            response.append(model)
-
-        return response
-    finally:
-        session.close()
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(next_cursor)
+    return page
 
 
 @router.get(
@@ -60,19 +80,17 @@ def get_tournaments():
     summary="Get tournament details",
     tags=["Tournaments"],
 )
-def get_tournament_details(tournament_id: int):
-    session = Session()
+async def get_tournament_details(tournament_id: int):
+    session = ReadAsyncSession()
     try:
         repo = TournamentRepository(session)
-        tournament = repo.db.scalar(
-            select(Tournament).where(Tournament.id == tournament_id)
-        )
+        tournament = await repo.find_by_id(tournament_id)
 
         if not tournament:
             raise HTTPException(status_code=404, detail="Tournament not found")
 
         action_repo = PlayerTournamentActionRepository(session)
-        actions = action_repo.find_actions_by_tournament_id(tournament_id)
+        actions = await action_repo.find_actions_by_tournament_id(tournament_id)
 
         participants = []
         for action in actions:
@@ -117,4 +135,4 @@ def get_tournament_details(tournament_id: int):
 
         return TournamentDetailResponse(**model_dict)
     finally:
-        session.close()
+        await session.close()
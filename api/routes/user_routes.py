@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from engine import Session
+from engine import ReadAsyncSession
 from domain.repository.player_action_repository import PlayerActionRepository
 from api.model.user_list_schema import UserInfo, UserList
 from cachetools import TTLCache
@@ -14,16 +14,17 @@ router = APIRouter()
 @router.get(
     "/api/users", response_model=UserList, summary="List all users", tags=["Users"]
 )
-def get_users():
+async def get_users():
     if "users" in users_cache:
         return users_cache["users"]
 
-    session = Session()
-    repo = PlayerActionRepository(session)
-    user_entities = [
-        u for u in repo.get_distinct_users() if u.user_id not in STATS_BLOCKED_USER_IDS
-    ]
-    session.close()
+    async with ReadAsyncSession() as session:
+        repo = PlayerActionRepository(session)
+        user_entities = [
+            u
+            for u in await repo.get_distinct_users()
+            if u.user_id not in STATS_BLOCKED_USER_IDS
+        ]
 
     response = UserList(users=[UserInfo(**u.__dict__) for u in user_entities])
     users_cache["users"] = response
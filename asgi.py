@@ -1,11 +1,38 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.routes import player_stats_routes, user_routes, tournament_routes
+from config import BOT_MODE, WEBHOOK_SECRET, WEBHOOK_URL
+from webhook import create_webhook_router, start_application, stop_application
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # В режиме webhook бот работает в том же процессе и цикле событий, что и API
+    if BOT_MODE != "webhook":
+        yield
+        return
+
+    if not WEBHOOK_SECRET:
+        raise RuntimeError("webhook_secret is required in webhook mode.")
+
+    from bot_main import build_application
+
+    application = build_application()
+    await start_application(application, WEBHOOK_URL, WEBHOOK_SECRET)
+    app.state.telegram_application = application
+    try:
+        yield
+    finally:
+        await stop_application(application)
+
 
 app = FastAPI(
     title="Poker Bot API",
     description="Provides player data and statistics from the Telegram Poker Bot",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -14,11 +41,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[tournament_routes.NEXT_CURSOR_HEADER],
 )
 
 app.include_router(player_stats_routes.router)
 app.include_router(user_routes.router)
 app.include_router(tournament_routes.router)
+if BOT_MODE == "webhook" and WEBHOOK_SECRET:
+    app.include_router(create_webhook_router(WEBHOOK_SECRET))
 
 
 @app.get("/", tags=["Root"])
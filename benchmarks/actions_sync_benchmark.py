@@ -0,0 +1,142 @@
+"""
+Delta sync benchmark: repeated loads of /api/stats/{user_id}/actions.
+
+Serves the statistics routes over ASGI (httpx) from a temporary SQLite
+database file holding four years of a player's games, and measures what a
+client transfers: the first full load, a reload with If-None-Match when
+nothing changed (304), and a load with the ``since`` cursor after three
+new actions, one of them dated before the rest of the history. Checks that
+new actions show up at once instead of after the cache expires and that the
+delta joined to the first load equals a fresh full load.
+
+Run from the project root (config.json is required):
+    python -m benchmarks.actions_sync_benchmark
+"""
+
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event, insert
+
+import db_init  # noqa: F401  registers all models
+from api.routes import player_stats_routes
+from benchmarks.roi_history_benchmark import DAYS, USER_ID, generate_actions
+from domain.entity.game import Game
+from domain.entity.player_action import PlayerAction
+from domain.repository.player_action_repository import PlayerActionRepository
+from engine import AsyncSession, Base, ReadAsyncSession, create_async_db_engine
+
+NEW_ACTIONS = 3
+
+
+async def timed(statements: list, call) -> tuple:
+    statements.clear()
+    started = time.perf_counter()
+    result = await call()
+    return result, len(statements), time.perf_counter() - started
+
+
+async def main() -> None:
+    actions = generate_actions(random.Random(25))
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+        engine = create_async_db_engine(url)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        AsyncSession.configure(bind=engine)
+        ReadAsyncSession.configure(bind=engine)
+        async with AsyncSession() as session:
+            await session.execute(insert(Game), [{"id": i} for i in range(1, DAYS + 2)])
+            await session.execute(insert(PlayerAction), actions)
+            await session.commit()
+
+        statements = []
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+        app = FastAPI()
+        app.include_router(player_stats_routes.router)
+        path = f"/api/stats/{USER_ID}/actions"
+
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://api"
+        ) as client:
+            full, count, elapsed = await timed(statements, lambda: client.get(path))
+            assert full.status_code == 200
+            etag = full.headers["etag"]
+            cursor = full.json()["next_cursor"]
+            print(
+                f"Full load: {len(full.content) / 1024:.0f} KiB, "
+                f"{len(full.json()['actions'])} actions, {count} statements, "
+                f"{elapsed * 1000:.0f} ms"
+            )
+
+            same, count, elapsed = await timed(
+                statements, lambda: client.get(path, headers={"If-None-Match": etag})
+            )
+            assert same.status_code == 304 and not same.content
+            print(
+                f"Reload, nothing changed: 304, {len(same.content)} bytes, "
+                f"{count} statement, {elapsed * 1000:.1f} ms"
+            )
+
+            async with AsyncSession() as session:
+                repository = PlayerActionRepository(session)
+                for amount in range(NEW_ACTIONS):
+                    await repository.record_action(
+                        PlayerAction(
+                            game_id=DAYS + 1,
+                            user_id=USER_ID,
+                            username="grinder",
+                            action="buyin",
+                            chips=1500,
+                            amount=10.0 + amount,
+                            # Задним числом: дельта всё равно идёт после прежних действий
+                            timestamp=(
+                                datetime(2000, 1, 1, tzinfo=timezone.utc)
+                                if amount == 0
+                                else datetime.now(timezone.utc)
+                            ),
+                        )
+                    )
+                await session.commit()
+
+            stale, _, _ = await timed(
+                statements, lambda: client.get(path, headers={"If-None-Match": etag})
+            )
+            assert stale.status_code == 200, "new actions not visible"
+
+            delta, count, elapsed = await timed(
+                statements, lambda: client.get(path, params={"since": cursor})
+            )
+            new = delta.json()["actions"]
+            assert len(new) == NEW_ACTIONS, len(new)
+            print(
+                f"Delta after {NEW_ACTIONS} new actions: {len(delta.content)} bytes, "
+                f"{count} statements, {elapsed * 1000:.1f} ms"
+            )
+
+            fresh = await client.get(path)
+            assert full.json()["actions"] + new == fresh.json()["actions"]
+            assert delta.json()["next_cursor"] == fresh.json()["next_cursor"]
+            empty = await client.get(
+                path, params={"since": delta.json()["next_cursor"]}
+            )
+            assert empty.json()["actions"] == []
+            print(
+                "Full load + delta equals a fresh full load; new actions show at once"
+            )
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
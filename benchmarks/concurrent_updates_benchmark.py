@@ -0,0 +1,274 @@
+"""
+Concurrent updates stress test: simultaneous eliminations and quits.
+
+300 players of a started tournament leave it at the same moment, while 200
+players try to cash out 1500 chips each from a game bank that holds only
+50 buy-ins, and a few slow read-only commands (like /summarygames) arrive
+in between. All updates go through ``UnitOfWorkUpdateProcessor`` with the
+bot's ``ordering_keys``. Compared with the serial processor (the previous
+behaviour) and with plain concurrency without ordering keys.
+
+Checks for the ordered run: the ranks are exactly 1..300, no two players
+share a rank, the bank never goes negative and the ledger matches the raw
+actions. Each run uses its own temporary SQLite database file.
+
+Run from the project root (config.json is required):
+    python -m benchmarks.concurrent_updates_benchmark
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter
+from typing import Awaitable, Callable, List, Tuple
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+
+import db_init  # noqa: F401  registers all models
+from config import CHIP_COUNT, CHIP_VALUE
+from domain.entity.game import Game
+from domain.entity.player import Player
+from domain.entity.player_action import PlayerAction
+from domain.entity.player_tournament_action import PlayerTournamentAction
+from domain.entity.tournament import Tournament
+from domain.repository.game_ledger_repository import GameLedgerRepository
+from domain.repository.player_action_repository import PlayerActionRepository
+from domain.repository.player_repository import PlayerRepository
+from domain.repository.player_tournament_action_repository import (
+    PlayerTournamentActionRepository,
+)
+from domain.repository.tournament_repository import TournamentRepository
+from domain.scheme.player_data import PlayerData
+from domain.service.tournament_engine import TournamentEngine
+from domain.use_cases.Tournament.eliminate_player_use_case import (
+    EliminatePlayerUseCase,
+)
+from engine import AsyncSession, Base, create_async_db_engine
+from telegram import Update
+from unit_of_work import ScopedSession, UnitOfWorkUpdateProcessor, mark_rollback_only
+from update_ordering import ordering_keys
+
+PLAYERS = 300
+BUYINS = 50
+QUITS = 200
+SLOW_READS = 10
+SLOW_READ_TIME = 0.2
+CONCURRENCY = 4
+
+
+def recorded_update(update_id: int, user_id: int, text: str) -> Update:
+    return Update.de_json(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": -100, "type": "supergroup", "title": "Poker"},
+                "from": {"id": user_id, "is_bot": False, "first_name": "P"},
+                "text": text,
+            },
+        },
+        None,
+    )
+
+
+async def prepare(url: str):
+    engine = create_async_db_engine(url)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    AsyncSession.configure(bind=engine)
+    PlayerRepository.clear_cache()
+
+    async with AsyncSession() as session:
+        players = [
+            Player(telegram_id=i, username=f"player{i}", name=f"Player {i}")
+            for i in range(1, PLAYERS + 1)
+        ]
+        tournament = Tournament()
+        game = Game()
+        session.add_all(players + [tournament, game])
+        await session.flush()
+        await PlayerTournamentActionRepository(session).register_players(
+            tournament.id, players
+        )
+        tournament.make_tournament_started()
+
+        action_repository = PlayerActionRepository(session)
+        for user_id in range(1, BUYINS + 1):
+            await action_repository.record_action(
+                PlayerAction(
+                    game_id=game.id,
+                    user_id=user_id,
+                    action="buyin",
+                    chips=CHIP_COUNT,
+                    amount=CHIP_VALUE,
+                    timestamp=datetime.now(timezone.utc),
+                )
+            )
+        await session.commit()
+        return engine, tournament.id, game.id
+
+
+def eliminate_use_case() -> EliminatePlayerUseCase:
+    action_repository = PlayerTournamentActionRepository(ScopedSession)
+    return EliminatePlayerUseCase(
+        player_tournament_action_repository=action_repository,
+        tournament_engine=TournamentEngine(
+            TournamentRepository(ScopedSession), action_repository
+        ),
+    )
+
+
+async def eliminate(use_case: EliminatePlayerUseCase, user_id: int) -> None:
+    await use_case.execute(PlayerData(user_id, f"player{user_id}", f"Player {user_id}"))
+
+
+async def quit_game(game_id: int, user_id: int, accepted: list) -> None:
+    """The check-then-write of PlayerActions.quit."""
+    bank = await GameLedgerRepository(ScopedSession).get_bank(game_id)
+    max_chips = bank.get_available_chips() if bank else 0
+    if CHIP_COUNT > max_chips:
+        return
+    # Пауза между проверкой и записью, как при отправке ответа пользователю
+    await asyncio.sleep(0)
+    await PlayerActionRepository(ScopedSession).record_action(
+        PlayerAction(
+            game_id=game_id,
+            user_id=user_id,
+            action="quit",
+            chips=CHIP_COUNT,
+            amount=CHIP_VALUE,
+            timestamp=datetime.now(timezone.utc),
+        )
+    )
+    accepted.append(user_id)
+
+
+async def slow_read(game_id: int, submitted: float, latencies: list) -> None:
+    await GameLedgerRepository(ScopedSession).find_balances_by_game(game_id)
+    await asyncio.sleep(SLOW_READ_TIME)
+    latencies.append(time.perf_counter() - submitted)
+
+
+async def guarded(coroutine, errors: Counter) -> None:
+    # Как rollback_on_error в боте: ошибка откатывает изменения обновления
+    try:
+        await coroutine
+    except Exception as e:
+        mark_rollback_only()
+        errors[type(e).__name__] += 1
+
+
+async def run(processor: UnitOfWorkUpdateProcessor) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+        engine, tournament_id, game_id = await prepare(url)
+
+        accepted, read_latencies, errors = [], [], Counter()
+        use_case = eliminate_use_case()
+        jobs: List[Tuple[int, str, Callable[[], Awaitable[None]]]] = [
+            (user_id, "/leave_tournament", lambda u=user_id: eliminate(use_case, u))
+            for user_id in range(1, PLAYERS + 1)
+        ]
+        jobs += [
+            (
+                PLAYERS + user_id,
+                f"/quit {CHIP_COUNT}",
+                lambda u=PLAYERS + user_id: quit_game(game_id, u, accepted),
+            )
+            for user_id in range(1, QUITS + 1)
+        ]
+        random.seed(14)
+        random.shuffle(jobs)
+        for index in range(SLOW_READS):
+            position = (index + 1) * len(jobs) // (SLOW_READS + 1)
+            jobs.insert(
+                position,
+                (
+                    10_000 + index,
+                    "/summarygames",
+                    lambda: slow_read(game_id, started, read_latencies),
+                ),
+            )
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *[
+                processor.process_update(
+                    recorded_update(update_id, user_id, text),
+                    guarded(job(), errors),
+                )
+                for update_id, (user_id, text, job) in enumerate(jobs, 1)
+            ]
+        )
+        elapsed = time.perf_counter() - started
+
+        async with AsyncSession() as session:
+            ranks = list(
+                await session.scalars(
+                    select(PlayerTournamentAction.rank).filter_by(
+                        tournament_id=tournament_id
+                    )
+                )
+            )
+            ledger = GameLedgerRepository(session)
+            bank = await ledger.get_bank(game_id)
+            assert bank is not None
+            mismatches = await ledger.verify(game_id)
+        await engine.dispose()
+
+    duplicates = sum(count - 1 for count in Counter(ranks).values() if count > 1)
+    return {
+        "elapsed": elapsed,
+        "read_p50": statistics.median(read_latencies) if read_latencies else 0.0,
+        "ranks_ok": sorted(r for r in ranks if r) == list(range(1, PLAYERS + 1)),
+        "duplicate_ranks": duplicates,
+        "accepted_quits": len(accepted),
+        "bank_chips": bank.get_available_chips(),
+        "ledger_ok": not mismatches,
+        "errors": dict(errors),
+    }
+
+
+def report(name: str, result: dict) -> None:
+    print(
+        f"{name:>10}: {result['elapsed']:5.2f} s, slow read p50 "
+        f"{result['read_p50'] * 1000:6.0f} ms | ranks 1..{PLAYERS} "
+        f"{'ok' if result['ranks_ok'] else 'BROKEN'} "
+        f"(duplicates {result['duplicate_ranks']}), quits accepted "
+        f"{result['accepted_quits']}/{BUYINS}, bank chips {result['bank_chips']}, "
+        f"ledger {'ok' if result['ledger_ok'] else 'BROKEN'}, "
+        f"errors {result['errors'] or 'none'}"
+    )
+
+
+async def main() -> None:
+    print(
+        f"{PLAYERS} eliminations, {QUITS} quits against a bank of {BUYINS} "
+        f"buy-ins, {SLOW_READS} slow reads, all submitted at once"
+    )
+    report("serial", await run(UnitOfWorkUpdateProcessor(max_concurrent_updates=1)))
+    report(
+        "unordered",
+        await run(UnitOfWorkUpdateProcessor(max_concurrent_updates=CONCURRENCY)),
+    )
+    processor = UnitOfWorkUpdateProcessor(
+        max_concurrent_updates=CONCURRENCY, ordering_keys=ordering_keys
+    )
+    result = await run(processor)
+    report("keyed", result)
+
+    assert result["ranks_ok"] and not result["duplicate_ranks"], "ranks are not unique"
+    assert result["bank_chips"] >= 0, "bank went negative"
+    assert result["accepted_quits"] == BUYINS, result["accepted_quits"]
+    assert result["ledger_ok"], "ledger does not match the actions"
+    assert not processor._key_locks, "locks of finished updates are kept"
+    print("keyed: ranks unique, bank never negative, ledger consistent, no locks left")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
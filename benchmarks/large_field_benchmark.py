@@ -0,0 +1,255 @@
+"""
+Large-field benchmark: seating and summary messages for 1000 players.
+
+Runs /shuffle_players, /summary_tournament (both pagination modes, paging
+through the inline one with its buttons) and /end_tournament with 1000
+players still in the game through TournamentManagement, on a temporary
+SQLite database file. Messages go through the outbound queue with the
+bot's rate limits to a recording bot.
+
+Checks that every message fits Telegram's 4096-character limit, that no
+table is split between two messages and that every player is listed.
+
+Run from the project root (config.json is required):
+    python -m benchmarks.large_field_benchmark
+"""
+
+import asyncio
+import os
+import re
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import cast
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+import commands.tournament_management as tournament_management_module
+import db_init  # noqa: F401  registers all models
+from commands.tournament_management import TournamentManagement
+from config import CHANNEL_TOURNAMENT_ID, OUTBOUND_QUEUE
+from di_container import DIContainer
+from domain.entity.player import Player
+from domain.entity.tournament import Tournament
+from domain.repository.player_repository import PlayerRepository
+from domain.repository.player_tournament_action_repository import (
+    PlayerTournamentActionRepository,
+)
+from domain.service.message_builder import MESSAGE_LIMIT, message_length
+from domain.service.outbound_message_queue import outbound_queue
+from engine import AsyncSession, Base, create_async_db_engine
+from unit_of_work import ScopedSession, UnitOfWork
+
+PLAYERS = 1000
+ADMIN_ID = 1
+LATENCY = 0.02
+SEATING_LIMIT = 3.0
+
+
+class RecordingBot:
+    def __init__(self):
+        self.sent = []  # (chat_id, text, reply_markup)
+
+    async def send_message(self, chat_id, text, parse_mode=None, reply_markup=None):
+        await asyncio.sleep(LATENCY)
+        assert message_length(text) <= MESSAGE_LIMIT, message_length(text)
+        self.sent.append((chat_id, text, reply_markup))
+
+
+class FakeMessage:
+    def __init__(self, bot: RecordingBot, chat_id: int):
+        self._bot = bot
+        self.chat_id = chat_id
+        self.chat = SimpleNamespace(id=chat_id)
+
+    async def reply_text(self, text, parse_mode=None, reply_markup=None):
+        await self._bot.send_message(self.chat_id, text, parse_mode, reply_markup)
+
+
+class FakeCallbackQuery:
+    def __init__(self, bot: RecordingBot, chat_id: int, data: str):
+        self._bot = bot
+        self.message = FakeMessage(bot, chat_id)
+        self.data = data
+
+    async def answer(self):
+        pass
+
+    async def edit_message_text(self, text, parse_mode=None, reply_markup=None):
+        await self._bot.send_message(
+            self.message.chat_id, text, parse_mode, reply_markup
+        )
+
+
+class FakeUser:
+    id = ADMIN_ID
+    username = "admin"
+    full_name = "Admin"
+
+
+class FakeUpdate:
+    def __init__(self, bot: RecordingBot, callback_data: str | None = None):
+        self.effective_user = FakeUser()
+        self.message = FakeMessage(bot, ADMIN_ID)
+        self.callback_query = (
+            FakeCallbackQuery(bot, ADMIN_ID, callback_data) if callback_data else None
+        )
+
+
+def fake_update(bot: RecordingBot, callback_data: str | None = None) -> Update:
+    """A FakeUpdate typed as the Update the handlers expect."""
+    return cast(Update, FakeUpdate(bot, callback_data))
+
+
+class FakeContext:
+    def __init__(self, bot: RecordingBot):
+        self.bot = bot
+        self.match = None
+
+
+async def prepare() -> None:
+    async with AsyncSession() as session:
+        players = [
+            Player(telegram_id=i, username=f"player{i}", name=f"Player Number {i}")
+            for i in range(1, PLAYERS + 1)
+        ]
+        tournament = Tournament()
+        session.add_all(players + [tournament])
+        await session.flush()
+        await PlayerTournamentActionRepository(session).register_players(
+            tournament.id, players
+        )
+        await session.commit()
+
+
+async def delivered(bot: RecordingBot, count: int) -> float:
+    """Waits until the bot has received ``count`` messages in total."""
+    started = time.perf_counter()
+    while len(bot.sent) < count:
+        await asyncio.sleep(0.01)
+    return time.perf_counter() - started
+
+
+async def settled(bot: RecordingBot, quiet: float) -> None:
+    """Waits until no message arrived for ``quiet`` seconds."""
+    while True:
+        count = len(bot.sent)
+        await asyncio.sleep(quiet)
+        if len(bot.sent) == count:
+            return
+
+
+def keyboard_data(reply_markup) -> list:
+    if reply_markup is None:
+        return []
+    return [
+        button.callback_data for row in reply_markup.inline_keyboard for button in row
+    ]
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+        engine = create_async_db_engine(url)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        AsyncSession.configure(bind=engine)
+        PlayerRepository.clear_cache()
+        await prepare()
+
+        di = DIContainer(ScopedSession)
+        management = TournamentManagement(
+            start_tournament_use_case=di.get_start_tournament_use_case(),
+            end_tournament_use_case=di.get_end_tournament_use_case(),
+            register_player_use_case=di.get_register_player_use_case(),
+            eliminate_player_use_case=di.get_eliminate_player_use_case(),
+            get_tournament_summary_use_case=di.get_tournament_summary_use_case(),
+            shuffle_players_use_case=di.get_shuffle_players_use_case(),
+            kick_player_use_case=di.get_kick_player_use_case(),
+            rebalance_tables_use_case=di.get_rebalance_tables_use_case(),
+            notification_public_tournament_channel_service=di.get_notification_public_tournament_channel_service(),
+            notification_bot_channel_service=di.get_notification_bot_channel_service(),
+        )
+        bot = RecordingBot()
+        context = cast(ContextTypes.DEFAULT_TYPE, FakeContext(bot))
+        outbound_queue.start()
+
+        # Рассадка
+        started = time.perf_counter()
+        async with UnitOfWork():
+            await management.shuffle_players(fake_update(bot), context)
+        handled = time.perf_counter() - started
+        await delivered(bot, 1)
+        first_page = time.perf_counter() - started
+        # Ответ администратору и все страницы рассадки
+        quiet = 1 / OUTBOUND_QUEUE["group_per_second"] + 1
+        await settled(bot, quiet)
+        seating_done = time.perf_counter() - started - quiet
+
+        seating = [text for chat, text, _ in bot.sent if chat == CHANNEL_TOURNAMENT_ID]
+        tables_per_page = [re.findall(r"<b>Стол №(\d+)</b>", text) for text in seating]
+        table_numbers = [int(t) for page in tables_per_page for t in page]
+        seats = sum(text.count("🪑") for text in seating)
+        assert seats == PLAYERS, seats
+        assert table_numbers == list(range(1, len(table_numbers) + 1)), "table split"
+        for text in seating:
+            # Каждый стол на странице полный: после заголовка идут его места
+            for block in text.split("\n\n")[1:]:
+                if block.startswith("<b>Стол"):
+                    assert block.count("🪑") >= 8, block
+        print(
+            f"Seating {PLAYERS} players: handler {handled:.2f} s, first page after "
+            f"{first_page:.2f} s, {len(seating)} pages, {len(table_numbers)} tables "
+            f"each on one page, all pages delivered after {seating_done:.1f} s "
+            f"(channel limits {OUTBOUND_QUEUE['group_per_second']} per second, "
+            f"{OUTBOUND_QUEUE['group_per_minute']} per minute)"
+        )
+        assert handled < SEATING_LIMIT, f"{handled:.1f} s"
+
+        # Сводка: все страницы сообщениями
+        bot.sent.clear()
+        started = time.perf_counter()
+        async with UnitOfWork():
+            await management.summary_tournament(fake_update(bot), context)
+        handled = time.perf_counter() - started
+        await settled(bot, 1 / OUTBOUND_QUEUE["private_per_second"] + 1)
+        pages = [text for _, text, _ in bot.sent]
+        rows = sum(len(re.findall(r"^\d+\. ", text, re.M)) for text in pages)
+        assert rows == PLAYERS, rows
+        print(
+            f"Summary, messages mode: handler {handled:.2f} s, {len(pages)} pages, "
+            f"{rows} rows, longest page {max(map(message_length, pages))} characters"
+        )
+
+        # Сводка: одна страница с кнопками, листаем до конца
+        tournament_management_module.TOURNAMENT_SUMMARY_PAGINATION = "inline"
+        bot.sent.clear()
+        async with UnitOfWork():
+            await management.summary_tournament(fake_update(bot), context)
+        await delivered(bot, 1)
+        shown = [bot.sent[-1][1]]
+        buttons = keyboard_data(bot.sent[-1][2])
+        while buttons and buttons[-1].endswith(f":{len(shown)}"):
+            async with UnitOfWork():
+                await management.summary_page(fake_update(bot, buttons[-1]), context)
+            await delivered(bot, len(shown) + 1)
+            shown.append(bot.sent[-1][1])
+            buttons = keyboard_data(bot.sent[-1][2])
+        assert shown == pages, "inline pages differ from the messages"
+        print(f"Summary, inline mode: 1 message, paged through {len(shown)} pages")
+
+        # Завершение турнира с 1000 игроками в игре
+        bot.sent.clear()
+        async with UnitOfWork():
+            await management.end_tournament(fake_update(bot), context)
+        await delivered(bot, 1)
+        error = bot.sent[-1][1]
+        print(f"End tournament refused in one message of {len(error)} characters")
+
+        await outbound_queue.stop()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,254 @@
+"""
+Leaderboard benchmark: the statistics table for 60 players.
+
+Fills a temporary SQLite database file with two years of cash games
+(about 10 000 buy-ins and quits) and compares what the statistics page
+needed before (/api/users, then /api/stats/{id}/actions for every user and
+the aggregation in the browser) with one /api/leaderboard request: SQL
+statements, bytes sent and time. Checks that the leaderboard matches the
+per-user statistics of /mystats for the same period, that the minimum
+number of games and the sort order are applied, that blocked users are
+left out and that a new buy-in invalidates the cached leaderboard. Games
+are counted as /mystats always counted them: every game with any action of
+the player, also a game the player only started.
+
+Run from the project root (config.json is required):
+    python -m benchmarks.leaderboard_benchmark
+"""
+
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import Response
+from sqlalchemy import event, func, insert, select
+
+import db_init  # noqa: F401  registers all models
+from api.model.player_stats_schema import PlayerActionListResponse
+from api.model.user_list_schema import UserList
+from api.routes import player_stats_routes, user_routes
+from domain.entity.game import Game
+from domain.entity.player_action import PlayerAction
+from domain.repository.player_action_repository import PlayerActionRepository
+from domain.repository.player_stats_rollup_repository import (
+    PlayerStatsRollupRepository,
+)
+from domain.service.player_statistics_service import PlayerStatisticsService
+from engine import AsyncSession, Base, ReadAsyncSession, create_async_db_engine
+
+USERS = 60
+GAMES = 400
+DAYS = 730
+BLOCKED_USER_ID = 1000 + USERS
+PERIOD = (date.today() - timedelta(days=200), date.today() - timedelta(days=20))
+
+
+def generate_actions(rng: random.Random) -> list:
+    rows = []
+    first_day = datetime.now(timezone.utc) - timedelta(days=DAYS)
+    for game_id in range(1, GAMES + 1):
+        started = first_day + timedelta(days=DAYS * game_id / GAMES)
+        # Игру начинает любой участник группы, не обязательно играющий
+        host = rng.randrange(1001, 1001 + USERS)
+        rows.append((game_id, host, "start_game", None, None, started))
+        for user_id in rng.sample(range(1001, 1001 + USERS), 8):
+            moment = started
+            buyins = rng.choice((1, 1, 2, 3))
+            for _ in range(buyins):
+                moment += timedelta(minutes=rng.randint(1, 40))
+                rows.append((game_id, user_id, "buyin", 1500, 10.0, moment))
+            moment += timedelta(minutes=rng.randint(1, 90))
+            chips = rng.randint(0, 3000 * buyins)
+            rows.append((game_id, user_id, "quit", chips, chips / 150, moment))
+    return [
+        {
+            "game_id": game_id,
+            "user_id": user_id,
+            "username": f"user{user_id}",
+            "action": action,
+            "chips": chips,
+            "amount": amount,
+            "timestamp": timestamp,
+        }
+        for game_id, user_id, action, chips, amount, timestamp in rows
+    ]
+
+
+async def prepare(rng: random.Random) -> int:
+    actions = generate_actions(rng)
+    async with AsyncSession() as session:
+        await session.execute(insert(Game), [{"id": i} for i in range(1, GAMES + 2)])
+        await session.execute(insert(PlayerAction), actions)
+        await PlayerStatsRollupRepository(session).rebuild()
+        await session.commit()
+    return len(actions)
+
+
+async def previous_page(statements: list) -> tuple:
+    """What the page loaded before: the users, then every user's actions."""
+    statements.clear()
+    started = time.perf_counter()
+    users = await user_routes.get_users()
+    assert isinstance(users, UserList)
+    size = len(users.model_dump_json())
+    for user in users.users:
+        actions = await player_stats_routes.get_player_actions(user.user_id, Response())
+        assert isinstance(actions, PlayerActionListResponse)
+        size += len(actions.model_dump_json())
+    return len(statements), size, time.perf_counter() - started
+
+
+async def leaderboard(statements: list, **params) -> tuple:
+    statements.clear()
+    started = time.perf_counter()
+    response = await player_stats_routes.get_leaderboard(**params)
+    elapsed = time.perf_counter() - started
+    return response, len(statements), len(response.model_dump_json()), elapsed
+
+
+async def main() -> None:
+    rng = random.Random(23)
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+        engine = create_async_db_engine(url)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        AsyncSession.configure(bind=engine)
+        ReadAsyncSession.configure(bind=engine)
+        actions = await prepare(rng)
+        player_stats_routes.STATS_BLOCKED_USER_IDS = [BLOCKED_USER_ID]
+        user_routes.STATS_BLOCKED_USER_IDS = [BLOCKED_USER_ID]
+
+        statements = []
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+
+        count, size, elapsed = await previous_page(statements)
+        print(
+            f"Before: {count} statements, {size / 1024:.0f} KiB of raw actions, "
+            f"{elapsed * 1000:.0f} ms for {USERS} users and {actions} actions"
+        )
+
+        response, count, size, elapsed = await leaderboard(
+            statements, date_from=PERIOD[0], date_to=PERIOD[1], sort="-roi"
+        )
+        print(
+            f"/api/leaderboard: {count} statements (version check and the "
+            f"aggregation), {size / 1024:.1f} KiB, "
+            f"{elapsed * 1000:.1f} ms, {len(response.players)} players"
+        )
+        assert count == 2, count
+        assert BLOCKED_USER_ID not in [p.user_id for p in response.players]
+        rois = [p.roi for p in response.players]
+        assert rois == sorted(rois, reverse=True), "not sorted by ROI"
+
+        # Совпадает со статистикой /mystats за тот же период
+        async with ReadAsyncSession() as session:
+            service = PlayerStatisticsService(session)
+            for player in response.players:
+                stats = await service.get_statistics_for_user(player.user_id, *PERIOD)
+                assert (
+                    player.games_played,
+                    player.total_buyin,
+                    player.avg_buyins_per_game,
+                    player.profit,
+                    player.roi,
+                ) == (
+                    stats.games_num,
+                    stats.total_buyin_money,
+                    stats.average_buyin_number,
+                    stats.profit_money,
+                    stats.roi,
+                ), player.user_id
+
+        # Число игр — как раньше считал /mystats: игры с любым действием игрока
+        everyone, _, _, _ = await leaderboard(statements, sort="username")
+        async with ReadAsyncSession() as session:
+            played = dict(
+                (
+                    await session.execute(
+                        select(
+                            PlayerAction.user_id,
+                            func.count(func.distinct(PlayerAction.game_id)),
+                        ).group_by(PlayerAction.user_id)
+                    )
+                )
+                .tuples()
+                .all()
+            )
+        assert {p.user_id: p.games_played for p in everyone.players} == {
+            user_id: games
+            for user_id, games in played.items()
+            if user_id != BLOCKED_USER_ID
+        }, "games differ from the distinct games of the raw actions"
+
+        regulars, count, _, _ = await leaderboard(
+            statements, min_games=45, sort="username"
+        )
+        assert count == 2 and all(p.games_played >= 45 for p in regulars.players)
+        names = [p.username for p in regulars.players]
+        assert names == sorted(names), "not sorted by name"
+        print(
+            f"All time, at least 45 games: {len(regulars.players)} of "
+            f"{USERS - 1} players, sorted by name"
+        )
+
+        cached, count, _, _ = await leaderboard(
+            statements, min_games=45, sort="username"
+        )
+        assert cached is regulars and count == 1
+        print("Repeated request: 1 statement (version check), served from the cache")
+
+        # Новый закуп должен сразу попасть в таблицу лидеров
+        player = regulars.players[0]
+        async with AsyncSession() as session:
+            await PlayerActionRepository(session).record_action(
+                PlayerAction(
+                    game_id=GAMES,
+                    user_id=player.user_id,
+                    username=player.username,
+                    action="buyin",
+                    chips=1500,
+                    amount=10.0,
+                )
+            )
+            await session.commit()
+        fresh, count, _, _ = await leaderboard(
+            statements, min_games=45, sort="username"
+        )
+        assert fresh is not regulars and count == 2, count
+        assert fresh.players[0].total_buyin == player.total_buyin + 10.0
+        print("New buy-in: the cached leaderboard was rebuilt")
+
+        # Начатая игра засчитывается один раз, и без закупа, и с ним
+        games_before = fresh.players[0].games_played
+        for action in ("start_game", "buyin"):
+            async with AsyncSession() as session:
+                await PlayerActionRepository(session).record_action(
+                    PlayerAction(
+                        game_id=GAMES + 1,
+                        user_id=player.user_id,
+                        username=player.username,
+                        action=action,
+                        chips=1500 if action == "buyin" else None,
+                        amount=10.0 if action == "buyin" else None,
+                    )
+                )
+                await session.commit()
+            started, _, _, _ = await leaderboard(
+                statements, min_games=45, sort="username"
+            )
+            assert started.players[0].games_played == games_before + 1, action
+        print("Starting a game counts it once, a later buy-in does not again")
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,266 @@
+"""
+Outbound queue benchmark: a buy-in rush against a simulated Bot API.
+
+Every buy-in sends a reply to the player's private chat and an announcement
+to the group channel. The simulated API answers after a fixed latency and,
+like Telegram, raises RetryAfter when a chat exceeds its limit (20 messages
+per minute for groups, scaled down here so the run stays short).
+
+Compares handlers that call the API directly (the previous behaviour) with
+handlers that only queue the message, and checks that the queue delivers
+every message in order. Then checks that a reply queued after a broadcast
+to the same chat is not sent before it, and that a timed out send is not
+repeated (it may have been delivered) while a timed out edit and a
+connection error are, and that the limits of idle chats are forgotten.
+
+Run from the project root (config.json is required):
+    python -m benchmarks.outbound_queue_benchmark
+"""
+
+import asyncio
+import statistics
+import time
+from collections import defaultdict, deque
+
+from telegram.error import NetworkError, RetryAfter, TimedOut
+
+from domain.service.outbound_message_queue import (
+    PRIORITY_BROADCAST,
+    PRIORITY_REPLY,
+    OutboundMessageQueue,
+)
+
+GROUP_ID = -100
+PLAYERS = 20
+BUYINS_PER_PLAYER = 3
+LATENCY = 0.05
+# Лимит группы в симуляции: 20 сообщений за 2 секунды вместо минуты
+TIME_SCALE = 30
+GROUP_LIMIT = 20
+GROUP_WINDOW = 60 / TIME_SCALE
+
+
+class SimulatedBotApi:
+    def __init__(self):
+        self.delivered = defaultdict(list)
+        self.flood_errors = 0
+        self._group_sends: deque = deque()
+
+    async def send_message(self, chat_id: int, text: str):
+        await asyncio.sleep(LATENCY)
+        if chat_id < 0:
+            now = time.monotonic()
+            while self._group_sends and now - self._group_sends[0] > GROUP_WINDOW:
+                self._group_sends.popleft()
+            if len(self._group_sends) >= GROUP_LIMIT:
+                self.flood_errors += 1
+                retry_after = GROUP_WINDOW - (now - self._group_sends[0])
+                raise RetryAfter(max(int(retry_after + 0.999), 1))
+            self._group_sends.append(now)
+        self.delivered[chat_id].append(text)
+        return text
+
+
+async def _rush(send_buyin) -> list:
+    """Runs all buy-ins (players in parallel) and returns handler latencies."""
+    latencies = []
+
+    async def player(user_id: int):
+        for number in range(BUYINS_PER_PLAYER):
+            started = time.perf_counter()
+            await send_buyin(user_id, number)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*[player(user_id) for user_id in range(1, PLAYERS + 1)])
+    return latencies
+
+
+async def run_direct() -> tuple:
+    api = SimulatedBotApi()
+    lost = 0
+
+    async def send_buyin(user_id: int, number: int):
+        nonlocal lost
+        await api.send_message(user_id, f"buyin {number}")
+        try:
+            await api.send_message(GROUP_ID, f"{user_id}: buyin {number}")
+        except RetryAfter:
+            lost += 1
+
+    started = time.perf_counter()
+    latencies = await _rush(send_buyin)
+    return latencies, time.perf_counter() - started, api, lost
+
+
+async def run_queued() -> tuple:
+    api = SimulatedBotApi()
+    queue = OutboundMessageQueue(
+        {
+            "max_size": 1000,
+            "global_per_second": 30,
+            "private_per_second": 1,
+            "group_per_second": TIME_SCALE,
+            "group_per_minute": GROUP_LIMIT,
+            "group_window": GROUP_WINDOW,
+            "burst": 3,
+            "concurrency": 8,
+            "max_attempts": 5,
+        }
+    )
+    queue.start()
+
+    async def send_buyin(user_id: int, number: int):
+        await queue.send(
+            user_id,
+            lambda: api.send_message(user_id, f"buyin {number}"),
+            PRIORITY_REPLY,
+        )
+        await queue.send(
+            GROUP_ID,
+            lambda: api.send_message(GROUP_ID, f"{user_id}: buyin {number}"),
+            PRIORITY_BROADCAST,
+        )
+
+    started = time.perf_counter()
+    latencies = await _rush(send_buyin)
+    await queue.stop(timeout=60)
+    return latencies, time.perf_counter() - started, api, 0
+
+
+def _report(name: str, latencies: list, elapsed: float, api, lost: int) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    group = api.delivered[GROUP_ID]
+    print(
+        f"{name:>7}: handler p50 {statistics.median(latencies) * 1000:7.1f} ms, "
+        f"p95 {p95 * 1000:7.1f} ms | delivered to group {len(group):3d}, "
+        f"lost {lost:3d}, flood errors {api.flood_errors:3d}, "
+        f"all sent after {elapsed:5.1f} s"
+    )
+
+
+def _check_order(api) -> None:
+    for user_id in range(1, PLAYERS + 1):
+        expected = [f"buyin {number}" for number in range(BUYINS_PER_PLAYER)]
+        assert api.delivered[user_id] == expected, f"replies out of order: {user_id}"
+        announced = [
+            text for text in api.delivered[GROUP_ID] if text.startswith(f"{user_id}:")
+        ]
+        assert announced == [f"{user_id}: {text}" for text in expected]
+
+
+def _small_queue() -> OutboundMessageQueue:
+    return OutboundMessageQueue(
+        {
+            "max_size": 100,
+            "global_per_second": 30,
+            "private_per_second": 30,
+            "group_per_second": 30,
+            "group_per_minute": 1800,
+            "group_window": 60,
+            "burst": 3,
+            "concurrency": 8,
+            "max_attempts": 3,
+        }
+    )
+
+
+async def check_mixed_priorities() -> None:
+    """A reply after broadcasts to the same chat waits for them; other chats'
+    replies still go before the broadcasts."""
+    sent = []
+
+    async def record(chat_id: int, text: str):
+        await asyncio.sleep(0.01)
+        sent.append((chat_id, text))
+
+    queue = _small_queue()
+    queue.start()
+    for number in range(3):
+        await queue.send(GROUP_ID, lambda n=number: record(GROUP_ID, f"broadcast {n}"))
+    await queue.send(GROUP_ID, lambda: record(GROUP_ID, "reply"), PRIORITY_REPLY)
+    await queue.send(1, lambda: record(1, "private reply"), PRIORITY_REPLY)
+    await queue.stop()
+
+    group = [text for chat_id, text in sent if chat_id == GROUP_ID]
+    assert group == ["broadcast 0", "broadcast 1", "broadcast 2", "reply"], group
+    assert sent.index((1, "private reply")) <= 1, sent
+    print("mixed priorities: per-chat order kept, replies to other chats first")
+
+
+async def check_timeouts() -> None:
+    calls = defaultdict(int)
+
+    def failing(name: str, error: Exception):
+        async def send():
+            calls[name] += 1
+            if calls[name] == 1:
+                raise error
+            return name
+
+        return send
+
+    queue = _small_queue()
+    queue.start()
+    message = await queue.send(1, failing("send", TimedOut()))
+    edit = await queue.send(2, failing("edit", TimedOut()), idempotent=True)
+    network = await queue.send(3, failing("network", NetworkError("reset")))
+    await queue.stop()
+
+    assert isinstance(message.exception(), TimedOut) and calls["send"] == 1
+    assert edit.result() == "edit" and calls["edit"] == 2
+    assert network.result() == "network" and calls["network"] == 2
+    print("timeouts: sends are not repeated, edits and connection errors are")
+
+
+async def check_idle_chats() -> None:
+    """The limits of chats that stopped receiving messages are dropped once
+    their bucket refills and their window empties."""
+    queue = OutboundMessageQueue(
+        {
+            "max_size": 1000,
+            "global_per_second": 1000,
+            "private_per_second": 100,
+            "group_per_second": 100,
+            "group_per_minute": 20,
+            "group_window": 0.2,
+            "burst": 3,
+            "concurrency": 8,
+            "max_attempts": 3,
+        }
+    )
+
+    async def noop():
+        return None
+
+    queue.start()
+    for chat_id in range(-100, 100):
+        await queue.send(chat_id, noop, PRIORITY_REPLY)
+    while queue._pending_count or queue._senders:
+        await asyncio.sleep(0.01)
+    seen = len(queue._chat_buckets)
+    await asyncio.sleep(0.3)
+    # Проход очистки выполняет рабочий цикл, когда в очереди что-то есть
+    await (await queue.send(1, noop))
+    await asyncio.sleep(0.05)
+    left = len(queue._chat_buckets) + len(queue._group_windows)
+    await queue.stop()
+    assert left <= 2, left
+    print(f"idle chats: limits of {seen} chats kept while sending, {left} after")
+
+
+async def main() -> None:
+    total = PLAYERS * BUYINS_PER_PLAYER
+    print(f"{PLAYERS} players, {total} buy-ins, {total * 2} messages")
+    _report("direct", *await run_direct())
+    latencies, elapsed, api, lost = await run_queued()
+    _report("queued", latencies, elapsed, api, lost)
+    _check_order(api)
+    print("queued: every message delivered, per-chat order preserved")
+    await check_mixed_priorities()
+    await check_timeouts()
+    await check_idle_chats()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,155 @@
+"""
+Query-count check for the tournament read paths.
+
+Plays one small tournament through the use cases (start, registration,
+summary, seating, elimination with rebalancing, kick, end) and then calls
+the tournament API routes, each on a temporary SQLite database file. Counts
+the SQL statements of every step and fails when a step goes over its
+budget, so a lazy load or a per-row query added later shows up here.
+Participants are loaded with their players in the same SELECT; a lazy load
+of ``PlayerTournamentAction.player`` or ``Tournament.created_player`` /
+``ended_player`` raises instead of issuing a query.
+
+Run from the project root (config.json is required):
+    python -m benchmarks.query_count_check
+"""
+
+import asyncio
+import os
+import tempfile
+
+from fastapi import Response
+from sqlalchemy import event
+
+import db_init  # noqa: F401  registers all models
+from api.routes import tournament_routes
+from di_container import DIContainer
+from domain.repository.player_repository import PlayerRepository
+from domain.scheme.player_data import PlayerData
+from engine import AsyncSession, Base, ReadAsyncSession, create_async_db_engine
+from unit_of_work import ScopedSession, UnitOfWork
+
+PLAYERS = 30
+# Наибольшее допустимое число SQL-запросов на шаг
+BUDGETS = {
+    "start tournament": 4,
+    "register player": 3,
+    "summary, active tournament": 0,
+    "shuffle players": 3,
+    "eliminate player": 2,
+    "rebalance tables": 1,
+    "kick player": 3,
+    "end tournament": 2,
+    "summary, finished tournament": 2,
+    "GET /api/tournaments": 2,
+    "GET /api/tournaments/{id}": 2,
+}
+
+
+def player(number: int) -> PlayerData:
+    return PlayerData(number, f"player{number}", f"Player {number}")
+
+
+ADMIN = player(1)
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+        engine = create_async_db_engine(url)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        AsyncSession.configure(bind=engine)
+        ReadAsyncSession.configure(bind=engine)
+        PlayerRepository.clear_cache()
+
+        statements = []
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+        di = DIContainer(ScopedSession)
+        counts = {}
+
+        async def step(name: str, call, in_unit_of_work: bool = True):
+            statements.clear()
+            if in_unit_of_work:
+                async with UnitOfWork():
+                    result = await call()
+            else:
+                result = await call()
+            # Повторяющиеся шаги оцениваются по худшему случаю
+            counts[name] = max(counts.get(name, 0), len(statements))
+            return result
+
+        tournament = await step(
+            "start tournament",
+            lambda: di.get_start_tournament_use_case().execute(ADMIN),
+        )
+        register = di.get_register_player_use_case()
+        for number in range(1, PLAYERS + 1):
+            await step("register player", lambda: register.execute(player(number)))
+        summary = await step(
+            "summary, active tournament",
+            lambda: di.get_tournament_summary_use_case().execute(),
+        )
+        assert len(summary["players"]) == PLAYERS
+        await step(
+            "shuffle players", lambda: di.get_shuffle_players_use_case().execute()
+        )
+
+        eliminated = await step(
+            "eliminate player",
+            lambda: di.get_eliminate_player_use_case().execute(player(PLAYERS)),
+        )
+        assert eliminated.player.telegram_id == PLAYERS
+        await step(
+            "rebalance tables",
+            lambda: di.get_rebalance_tables_use_case().execute([eliminated.player_id]),
+        )
+        for number in range(PLAYERS - 1, 0, -1):
+            await step(
+                "kick player", lambda: di.get_kick_player_use_case().execute(number)
+            )
+        await step(
+            "end tournament", lambda: di.get_end_tournament_use_case().execute(ADMIN)
+        )
+        summary = await step(
+            "summary, finished tournament",
+            lambda: di.get_tournament_summary_use_case().execute(tournament.id),
+        )
+        assert summary["status"] == "finished"
+        assert [row["player"].name for row in summary["players"][:2]] == [
+            "Player 1",
+            "Player 2",
+        ]
+
+        tournament_routes.tournaments_cache.clear()
+        listed = await step(
+            "GET /api/tournaments",
+            lambda: tournament_routes.get_tournaments(Response()),
+            in_unit_of_work=False,
+        )
+        assert listed[0].winners == ["Player 1", "Player 2", "Player 3"]
+        details = await step(
+            "GET /api/tournaments/{id}",
+            lambda: tournament_routes.get_tournament_details(tournament.id),
+            in_unit_of_work=False,
+        )
+        assert len(details.participants) == PLAYERS
+
+        await engine.dispose()
+
+    failed = []
+    for name, budget in BUDGETS.items():
+        mark = "ok" if counts[name] <= budget else "OVER BUDGET"
+        print(f"{name:45} {counts[name]:3} statements (budget {budget}) {mark}")
+        if counts[name] > budget:
+            failed.append(name)
+    assert not failed, failed
+    print("every step within its query budget")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
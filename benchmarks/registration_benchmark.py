@@ -0,0 +1,159 @@
+"""
+Registration benchmark: 500 players join a tournament at once.
+
+Every join is a /join_tournament update processed by the bot's update
+processor (own unit of work and commit, tournament ordering key); 50 of the
+players press the button twice. Compares the previous registration path
+(find_active_tournament, get_or_create, has_player_joined,
+is_player_eliminated, register_player) with the upsert path of
+RegisterPlayerUseCase. Each run uses its own temporary SQLite database file.
+
+Run from the project root (config.json is required):
+    python -m benchmarks.registration_benchmark
+"""
+
+import asyncio
+import os
+import random
+import tempfile
+import time
+from collections import Counter
+
+from sqlalchemy import event, func, select
+
+import db_init  # noqa: F401  registers all models
+from benchmarks.concurrent_updates_benchmark import recorded_update
+from domain.entity.player_tournament_action import PlayerTournamentAction
+from domain.entity.tournament import Tournament
+from domain.repository.player_repository import PlayerRepository
+from domain.repository.player_tournament_action_repository import (
+    PlayerTournamentActionRepository,
+)
+from domain.repository.tournament_repository import TournamentRepository
+from domain.scheme.player_data import PlayerData
+from domain.service.tournament_engine import TournamentEngine
+from domain.use_cases.Tournament.register_player_use_case import (
+    RegisterPlayerUseCase,
+)
+from engine import AsyncSession, Base, create_async_db_engine
+from unit_of_work import ScopedSession, UnitOfWorkUpdateProcessor, mark_rollback_only
+from update_ordering import ordering_keys
+
+PLAYERS = 500
+REPEATED = 50
+TIME_LIMIT = 10.0
+CONCURRENCY = 4
+
+
+async def register_previous(player_data: PlayerData) -> None:
+    """The registration path before the upsert."""
+    tournament_repository = TournamentRepository(ScopedSession)
+    action_repository = PlayerTournamentActionRepository(ScopedSession)
+
+    tournament = await tournament_repository.find_active_tournament()
+    if not tournament or tournament.is_tournament_started():
+        raise RuntimeError("registration closed")
+    player = await PlayerRepository(ScopedSession).get_or_create(player_data)
+    if await action_repository.has_player_joined(tournament.id, player.id):
+        raise RuntimeError("already joined")
+    if await action_repository.is_player_eliminated(tournament.id, player.id):
+        raise RuntimeError("eliminated")
+    await action_repository.register_player(tournament.id, player)
+
+
+def register_upsert():
+    tournament_repository = TournamentRepository(ScopedSession)
+    action_repository = PlayerTournamentActionRepository(ScopedSession)
+    use_case = RegisterPlayerUseCase(
+        tournament_repository=tournament_repository,
+        player_repository=PlayerRepository(ScopedSession),
+        player_tournament_action_repository=action_repository,
+        tournament_engine=TournamentEngine(tournament_repository, action_repository),
+    )
+    return use_case.execute
+
+
+async def run(register) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+        engine = create_async_db_engine(url)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        AsyncSession.configure(bind=engine)
+        PlayerRepository.clear_cache()
+        async with AsyncSession() as session:
+            session.add(Tournament())
+            await session.commit()
+
+        statements = Counter()
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.update([args[2].split()[0].upper()]),
+        )
+
+        user_ids = list(range(1, PLAYERS + 1))
+        user_ids += random.Random(16).sample(user_ids, REPEATED)
+        random.Random(16).shuffle(user_ids)
+        errors = Counter()
+
+        async def join(user_id: int) -> None:
+            try:
+                await register(PlayerData(user_id, f"player{user_id}", f"P {user_id}"))
+            except RuntimeError as e:
+                mark_rollback_only()
+                errors[str(e)] += 1
+
+        processor = UnitOfWorkUpdateProcessor(
+            max_concurrent_updates=CONCURRENCY, ordering_keys=ordering_keys
+        )
+        started = time.perf_counter()
+        await asyncio.gather(
+            *[
+                processor.process_update(
+                    recorded_update(update_id, user_id, "/join_tournament"),
+                    join(user_id),
+                )
+                for update_id, user_id in enumerate(user_ids, 1)
+            ]
+        )
+        elapsed = time.perf_counter() - started
+
+        async with AsyncSession() as session:
+            registered = await session.scalar(
+                select(func.count(PlayerTournamentAction.id))
+            )
+        await engine.dispose()
+
+    return {
+        "elapsed": elapsed,
+        "per_join": elapsed / len(user_ids),
+        "statements": sum(statements.values()) / len(user_ids),
+        "registered": registered,
+        "rejected": sum(errors.values()),
+    }
+
+
+def report(name: str, result: dict) -> None:
+    print(
+        f"{name:>8}: {result['elapsed']:5.2f} s, {result['per_join'] * 1000:5.1f} ms "
+        f"per join, {result['statements']:4.1f} statements per join, "
+        f"registered {result['registered']}, repeated joins rejected "
+        f"{result['rejected']}"
+    )
+
+
+async def main() -> None:
+    print(f"{PLAYERS} players join at once, {REPEATED} of them twice")
+    report("previous", await run(register_previous))
+    result = await run(register_upsert())
+    report("upsert", result)
+
+    assert result["registered"] == PLAYERS, result["registered"]
+    assert result["rejected"] == REPEATED, result["rejected"]
+    assert result["elapsed"] < TIME_LIMIT, f"{result['elapsed']:.1f} s"
+    print(f"upsert: {PLAYERS} joins in under {TIME_LIMIT:.0f} s, repeats are no-ops")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
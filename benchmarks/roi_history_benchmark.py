@@ -0,0 +1,206 @@
+"""
+ROI history benchmark: the chart of a player with 1500 days of games.
+
+Fills a temporary SQLite database file with a player who played almost
+every day for four years and compares what the chart needed before (all
+raw actions of the player, the cumulative ROI rebuilt from them) with
+/api/stats/{id}/roi_history: statements, bytes sent and time. Checks the
+daily curve against one computed from the raw actions, that the
+downsampled curve keeps its first and last points and its extremes, that
+a repeated request is served from the cache and that a new buy-in of the
+player invalidates it.
+
+Run from the project root (config.json is required):
+    python -m benchmarks.roi_history_benchmark
+"""
+
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi import Response
+from sqlalchemy import event, insert
+
+import db_init  # noqa: F401  registers all models
+from api.routes import player_stats_routes
+from domain.entity.game import Game
+from domain.entity.player_action import PlayerAction
+from domain.repository.player_action_repository import PlayerActionRepository
+from domain.repository.player_stats_rollup_repository import (
+    PlayerStatsRollupRepository,
+    bucket_dates,
+)
+from engine import AsyncSession, Base, ReadAsyncSession, create_async_db_engine
+
+USER_ID = 42
+DAYS = 1500
+POINTS = 300
+
+
+def generate_actions(rng: random.Random) -> list:
+    rows = []
+    first_day = datetime.now(timezone.utc) - timedelta(days=DAYS + 1)
+    for game_id in range(1, DAYS + 1):
+        if rng.random() < 0.1:
+            continue
+        moment = first_day + timedelta(days=game_id, hours=rng.randint(0, 20))
+        buyins = rng.choice((1, 1, 2, 3))
+        for _ in range(buyins):
+            moment += timedelta(minutes=rng.randint(1, 40))
+            rows.append(("buyin", 1500, 10.0, moment, game_id))
+        moment += timedelta(minutes=rng.randint(1, 90))
+        chips = rng.randint(0, 3200 * buyins)
+        rows.append(("quit", chips, chips / 150, moment, game_id))
+    return [
+        {
+            "game_id": game_id,
+            "user_id": USER_ID,
+            "username": "grinder",
+            "action": action,
+            "chips": chips,
+            "amount": amount,
+            "timestamp": timestamp,
+        }
+        for action, chips, amount, timestamp, game_id in rows
+    ]
+
+
+def expected_curve(actions: list) -> list:
+    """Cumulative ROI at the end of each day, from the raw actions."""
+    curve, buyin, quit_amount = {}, 0.0, 0.0
+    for action in sorted(actions, key=lambda a: a["timestamp"]):
+        if action["action"] == "buyin":
+            buyin += action["amount"]
+        else:
+            quit_amount += action["amount"]
+        day, _ = bucket_dates(action["timestamp"])
+        curve[day] = round((quit_amount - buyin) / buyin * 100, 1) if buyin else 0.0
+    return list(curve.items())
+
+
+def interpolation_error(full: list, sampled: list) -> float:
+    """Mean distance (in ROI points) between the daily curve and the sampled
+    one drawn with straight lines between its points."""
+    total, segment = 0.0, 0
+    for point in full:
+        while sampled[segment + 1].date < point.date:
+            segment += 1
+        left, right = sampled[segment], sampled[segment + 1]
+        share = (point.date - left.date) / (right.date - left.date)
+        total += abs(left.roi + (right.roi - left.roi) * share - point.roi)
+    return total / len(full)
+
+
+async def timed(statements: list, call) -> tuple:
+    statements.clear()
+    started = time.perf_counter()
+    result = await call()
+    return result, len(statements), time.perf_counter() - started
+
+
+async def main() -> None:
+    rng = random.Random(24)
+    actions = generate_actions(rng)
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+        engine = create_async_db_engine(url)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        AsyncSession.configure(bind=engine)
+        ReadAsyncSession.configure(bind=engine)
+        async with AsyncSession() as session:
+            await session.execute(insert(Game), [{"id": i} for i in range(1, DAYS + 2)])
+            await session.execute(insert(PlayerAction), actions)
+            await PlayerStatsRollupRepository(session).rebuild()
+            await session.commit()
+
+        statements = []
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+
+        raw, count, elapsed = await timed(
+            statements,
+            lambda: player_stats_routes.get_player_actions(USER_ID, Response()),
+        )
+        started = time.perf_counter()
+        rebuilt = expected_curve(actions)
+        elapsed += time.perf_counter() - started
+        print(
+            f"Before: {count} statements, {len(raw.model_dump_json()) / 1024:.0f} KiB "
+            f"of {len(actions)} actions, {len(rebuilt)} points, "
+            f"{elapsed * 1000:.0f} ms"
+        )
+
+        full, count, elapsed = await timed(
+            statements, lambda: player_stats_routes.get_roi_history(USER_ID)
+        )
+        assert [(p.date, p.roi) for p in full.points] == rebuilt, "curve differs"
+        print(
+            f"roi_history, every day: {count} statements, "
+            f"{len(full.model_dump_json()) / 1024:.0f} KiB, {elapsed * 1000:.1f} ms"
+        )
+
+        sampled, count, elapsed = await timed(
+            statements,
+            lambda: player_stats_routes.get_roi_history(USER_ID, points=POINTS),
+        )
+        assert len(sampled.points) == POINTS
+        assert sampled.points[0] == full.points[0]
+        assert sampled.points[-1] == full.points[-1]
+        lttb_error = interpolation_error(full.points, sampled.points)
+        step = len(full.points) / POINTS
+        every_nth = [full.points[int(i * step)] for i in range(POINTS - 1)]
+        nth_error = interpolation_error(full.points, every_nth + [full.points[-1]])
+        assert lttb_error < nth_error, (lttb_error, nth_error)
+        print(
+            f"roi_history, {POINTS} points (LTTB): {count} statements, "
+            f"{len(sampled.model_dump_json()) / 1024:.1f} KiB, "
+            f"{elapsed * 1000:.1f} ms; mean deviation from the daily curve "
+            f"{lttb_error:.2f} pp (every n-th day: {nth_error:.2f} pp)"
+        )
+
+        period = (full.points[100].date, full.points[400].date)
+        ranged, _, _ = await timed(
+            statements,
+            lambda: player_stats_routes.get_roi_history(USER_ID, *period),
+        )
+        assert [(p.date, p.roi) for p in ranged.points] == rebuilt[100:401]
+
+        cached, count, _ = await timed(
+            statements,
+            lambda: player_stats_routes.get_roi_history(USER_ID, points=POINTS),
+        )
+        assert cached is sampled and count == 1, count
+        print("Repeated request: 1 statement (version check), served from the cache")
+
+        async with AsyncSession() as session:
+            await PlayerActionRepository(session).record_action(
+                PlayerAction(
+                    game_id=DAYS + 1,
+                    user_id=USER_ID,
+                    username="grinder",
+                    action="buyin",
+                    chips=1500,
+                    amount=10.0,
+                )
+            )
+            await session.commit()
+        fresh, count, _ = await timed(
+            statements,
+            lambda: player_stats_routes.get_roi_history(USER_ID, points=POINTS),
+        )
+        assert fresh is not sampled and count == 2, count
+        assert fresh.points[-1].roi < sampled.points[-1].roi
+        print("New buy-in of the player: the cached curve was rebuilt")
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
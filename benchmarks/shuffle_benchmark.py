@@ -0,0 +1,114 @@
+"""
+Shuffle benchmark: seating time for 10/100/1000 players.
+
+Compares the previous seating path (a lookup and a commit per player) with
+the bulk seat assignment committed once by the unit of work. Each run uses
+its own temporary SQLite database file.
+
+Run from the project root (config.json is required):
+    python -m benchmarks.shuffle_benchmark
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import db_init  # noqa: F401  registers all models
+from engine import Base
+from domain.entity.player import Player
+from domain.entity.tournament import Tournament
+from domain.repository.player_tournament_action_repository import (
+    PlayerTournamentActionRepository,
+)
+from domain.repository.tournament_repository import TournamentRepository
+from domain.service.tournament_engine import TournamentEngine
+from domain.use_cases.Tournament.shuffle_players_use_case import ShufflePlayersUseCase
+
+PLAYER_COUNTS = (10, 100, 1000)
+
+
+async def _prepare(url: str, num_players: int) -> async_sessionmaker:
+    engine = create_async_engine(url)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with session_factory() as session:
+        players = [
+            Player(telegram_id=i, username=f"player{i}", name=f"Player {i}")
+            for i in range(1, num_players + 1)
+        ]
+        tournament = Tournament()
+        session.add_all(players + [tournament])
+        await session.flush()
+        await PlayerTournamentActionRepository(session).register_players(
+            tournament.id, players
+        )
+        await session.commit()
+    return session_factory
+
+
+async def _seat_per_player(session_factory: async_sessionmaker) -> float:
+    """Previous behaviour: find_action and a commit for every seated player."""
+    async with session_factory() as session:
+        tournament_repository = TournamentRepository(session)
+        action_repository = PlayerTournamentActionRepository(session)
+        started = time.perf_counter()
+
+        tournament = await tournament_repository.find_active_tournament()
+        players = await action_repository.find_active_player_entities(tournament.id)
+        tournament.make_tournament_started()
+        await session.commit()
+        for index, player in enumerate(players):
+            action = await action_repository.find_action(tournament.id, player.id)
+            assert action is not None
+            action.table_number = index // 9 + 1
+            action.position_number = index % 9 + 1
+            await session.commit()
+
+        return time.perf_counter() - started
+
+
+async def _seat_bulk(session_factory: async_sessionmaker) -> float:
+    async with session_factory() as session:
+        tournament_repository = TournamentRepository(session)
+        action_repository = PlayerTournamentActionRepository(session)
+        use_case = ShufflePlayersUseCase(
+            tournament_repository=tournament_repository,
+            player_tournament_action_repository=action_repository,
+            tournament_engine=TournamentEngine(
+                tournament_repository, action_repository
+            ),
+        )
+        started = time.perf_counter()
+        await use_case.execute()
+        await session.commit()
+        return time.perf_counter() - started
+
+
+async def _measure(strategy, num_players: int) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite+aiosqlite:///{os.path.join(directory, 'benchmark.db')}"
+        session_factory = await _prepare(url, num_players)
+        try:
+            return await strategy(session_factory)
+        finally:
+            await session_factory.kw["bind"].dispose()
+
+
+async def main() -> None:
+    print(f"{'players':>8} {'per-player, ms':>16} {'bulk, ms':>10} {'speedup':>8}")
+    for num_players in PLAYER_COUNTS:
+        before = await _measure(_seat_per_player, num_players)
+        after = await _measure(_seat_bulk, num_players)
+        print(
+            f"{num_players:>8} {before * 1000:>16.1f} {after * 1000:>10.1f} "
+            f"{before / after:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,231 @@
+"""
+Table rebalancing benchmark: 1000-player fields played down to heads-up.
+
+Planner: players are seated like /shuffle_players does, then eliminated
+one by one (sometimes several in one hand) until two are left; after every
+hand the tables are rebalanced. Checks that the field always sits on
+ceil(players / 9) tables within one player of each other with no two
+players on one seat, and compares the number of moves with reseating the
+whole field after every hand.
+
+End to end: the same through EliminatePlayerUseCase and
+RebalanceTablesUseCase, one unit of work per elimination, on a temporary
+SQLite database file; the seats in the database must match the engine.
+
+Run from the project root (config.json is required):
+    python -m benchmarks.table_rebalance_benchmark
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter
+
+from sqlalchemy import event, select
+
+import db_init  # noqa: F401  registers all models
+from domain.entity.player import Player
+from domain.entity.player_tournament_action import PlayerTournamentAction
+from domain.entity.tournament import Tournament
+from domain.repository.player_repository import PlayerRepository
+from domain.repository.player_tournament_action_repository import (
+    PlayerTournamentActionRepository,
+)
+from domain.repository.tournament_repository import TournamentRepository
+from domain.scheme.player_data import PlayerData
+from domain.service.table_rebalancer import MAX_PLAYERS_PER_TABLE, plan_rebalance
+from domain.service.tournament_engine import TournamentEngine
+from domain.use_cases.Tournament.eliminate_player_use_case import (
+    EliminatePlayerUseCase,
+)
+from domain.use_cases.Tournament.rebalance_tables_use_case import (
+    RebalanceTablesUseCase,
+)
+from domain.use_cases.Tournament.shuffle_players_use_case import ShufflePlayersUseCase
+from engine import AsyncSession, Base, create_async_db_engine
+from unit_of_work import ScopedSession, UnitOfWork
+
+PLAYERS = 1000
+SEEDS = (1, 2, 3)
+
+
+def initial_seats(player_ids, rng: random.Random) -> dict:
+    """Seats the players the way ShufflePlayersUseCase does."""
+    player_ids = list(player_ids)
+    rng.shuffle(player_ids)
+    num_tables = -(-len(player_ids) // MAX_PLAYERS_PER_TABLE)
+    base_size, remainder = divmod(len(player_ids), num_tables)
+    seats, index = {}, 0
+    for table in range(1, num_tables + 1):
+        for position in range(1, base_size + (table <= remainder) + 1):
+            seats[player_ids[index]] = (table, position)
+            index += 1
+    return seats
+
+
+def check_balanced(seats: dict) -> None:
+    sizes = Counter(table for table, _ in seats.values())
+    assert len(sizes) == -(-len(seats) // MAX_PLAYERS_PER_TABLE), sizes
+    assert max(sizes.values()) - min(sizes.values()) <= 1, sizes
+    assert len(set(seats.values())) == len(seats), "two players on one seat"
+
+
+def hands(player_ids, rng: random.Random):
+    """Yields the players busted in each hand until two are left."""
+    remaining = list(player_ids)
+    while len(remaining) > 2:
+        busted = rng.sample(
+            remaining, min(rng.choice((1, 1, 1, 2, 3)), len(remaining) - 2)
+        )
+        for player_id in busted:
+            remaining.remove(player_id)
+        yield busted
+
+
+def simulate(seed: int) -> dict:
+    rng = random.Random(seed)
+    seats = initial_seats(range(1, PLAYERS + 1), rng)
+    moves, reseated, broken, timings = 0, 0, 0, []
+
+    for busted in hands(list(seats), rng):
+        for player_id in busted:
+            del seats[player_id]
+
+        started = time.perf_counter()
+        plan = plan_rebalance(seats)
+        timings.append(time.perf_counter() - started)
+        for player_id, table, position in plan.seats():
+            seats[player_id] = (table, position)
+        check_balanced(seats)
+        moves += len(plan.moves)
+        broken += len(plan.broken_tables)
+
+        # Пересадка всего поля после каждой раздачи
+        fresh = initial_seats(seats, rng)
+        reseated += sum(1 for p in seats if fresh[p] != seats[p])
+
+    return {
+        "moves": moves,
+        "reseated": reseated,
+        "broken": broken,
+        "plan_p50": statistics.median(timings),
+        "plan_max": max(timings),
+        "final_tables": len({table for table, _ in seats.values()}),
+    }
+
+
+async def end_to_end() -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+        engine = create_async_db_engine(url)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        AsyncSession.configure(bind=engine)
+        PlayerRepository.clear_cache()
+
+        async with AsyncSession() as session:
+            players = [
+                Player(telegram_id=i, username=f"player{i}", name=f"Player {i}")
+                for i in range(1, PLAYERS + 1)
+            ]
+            tournament = Tournament()
+            session.add_all(players + [tournament])
+            await session.flush()
+            await PlayerTournamentActionRepository(session).register_players(
+                tournament.id, players
+            )
+            await session.commit()
+
+        tournament_repository = TournamentRepository(ScopedSession)
+        action_repository = PlayerTournamentActionRepository(ScopedSession)
+        tournament_engine = TournamentEngine(tournament_repository, action_repository)
+        shuffle = ShufflePlayersUseCase(
+            tournament_repository, action_repository, tournament_engine
+        )
+        eliminate = EliminatePlayerUseCase(action_repository, tournament_engine)
+        rebalance = RebalanceTablesUseCase(action_repository, tournament_engine)
+        async with UnitOfWork():
+            await shuffle.execute()
+
+        statements = Counter()
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.update([args[2].split()[0].upper()]),
+        )
+
+        rng = random.Random(19)
+        moves, hand_count = 0, 0
+        started = time.perf_counter()
+        for busted in hands(range(1, PLAYERS + 1), rng):
+            async with UnitOfWork():
+                if len(busted) == 1:
+                    action = await eliminate.execute(PlayerData(busted[0], None, None))
+                    actions = [action] if action else []
+                else:
+                    actions = await eliminate.execute_bulk(busted)
+                result = await rebalance.execute([a.player_id for a in actions])
+            moves += len(result["moves"])
+            hand_count += 1
+        elapsed = time.perf_counter() - started
+
+        state = await tournament_engine.get_active()
+        assert state is not None
+        async with AsyncSession() as session:
+            rows = (
+                await session.execute(
+                    select(
+                        PlayerTournamentAction.player_id,
+                        PlayerTournamentAction.table_number,
+                        PlayerTournamentAction.position_number,
+                    ).where(PlayerTournamentAction.rank.is_(None))
+                )
+            ).all()
+        await engine.dispose()
+
+    db_seats = {player_id: (table, position) for player_id, table, position in rows}
+    engine_seats = {
+        player_id: (entry.table_number, entry.position_number)
+        for player_id, entry in state.entries.items()
+        if entry.rank is None
+    }
+    check_balanced(db_seats)
+    return {
+        "elapsed": elapsed,
+        "hands": hand_count,
+        "moves": moves,
+        "statements": sum(statements.values()) / hand_count,
+        "in_sync": db_seats == engine_seats,
+        "left": len(db_seats),
+    }
+
+
+async def main() -> None:
+    print(f"Planner, {PLAYERS} players down to heads-up")
+    for seed in SEEDS:
+        result = simulate(seed)
+        print(
+            f"  seed {seed}: {result['moves']:5} moves "
+            f"(reseating everyone: {result['reseated']}), "
+            f"{result['broken']} tables broken, final tables {result['final_tables']}, "
+            f"plan p50 {result['plan_p50'] * 1e6:.0f} µs, "
+            f"max {result['plan_max'] * 1e6:.0f} µs"
+        )
+        assert result["final_tables"] == 1
+
+    result = await end_to_end()
+    print(
+        f"End to end: {result['hands']} hands in {result['elapsed']:.2f} s "
+        f"({result['elapsed'] / result['hands'] * 1000:.1f} ms per hand), "
+        f"{result['moves']} moves, {result['statements']:.1f} statements per hand, "
+        f"database and engine {'in sync' if result['in_sync'] else 'DIFFER'}"
+    )
+    assert result["in_sync"] and result["left"] == 2
+    print("tables stay balanced within one player down to heads-up")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""
+Tournament digest benchmark: channel API calls for registration and
+elimination bursts.
+
+Feeds 60 registrations and then 59 eliminations, arriving 50 ms apart, into
+the tournament channel notifier with coalescing disabled (the previous
+behaviour: one message per event) and with a 3 second window.
+
+Run from the project root (config.json is required):
+    python -m benchmarks.tournament_digest_benchmark
+"""
+
+import asyncio
+import time
+from typing import cast
+
+from telegram import Bot
+
+from domain.service.coalescing_notification_service import (
+    CoalescingNotificationService,
+)
+from domain.service.message_builder import MESSAGE_LIMIT, message_length
+from domain.service.notification_public_channel_service import (
+    NotificationPublicChannelService,
+)
+
+PLAYERS = 60
+EVENT_INTERVAL = 0.05
+WINDOW = 3.0
+
+
+class CountingBot:
+    def __init__(self):
+        self.messages = []
+
+    async def send_message(self, chat_id, text, parse_mode=None):
+        assert message_length(text) <= MESSAGE_LIMIT
+        self.messages.append(text)
+
+
+def _events():
+    for i in range(1, PLAYERS + 1):
+        yield f"✅ Игрок <b>Player {i}</b> (@player{i}) зарегистрирован в турнире!"
+    for rank in range(PLAYERS, 1, -1):
+        yield (
+            f"☠️ Игрок <b>Player {rank}</b> (@player{rank}) выбыл из турнира.\n"
+            f"🏅 Место: {rank}\n"
+            f"⏱️ Время в игре: 01:23:45"
+        )
+
+
+async def run(window: float) -> tuple:
+    bot = CountingBot()
+    notifier = CoalescingNotificationService(
+        NotificationPublicChannelService(-100), window=window
+    )
+    started = time.perf_counter()
+    for event in _events():
+        await notifier.notify_coalesced(cast(Bot, bot), event)
+        await asyncio.sleep(EVENT_INTERVAL)
+    await notifier.flush()
+    return notifier.events_count, len(bot.messages), time.perf_counter() - started
+
+
+async def main() -> None:
+    for name, window in (("per event", 0), (f"{WINDOW:.0f} s window", WINDOW)):
+        events, calls, elapsed = await run(window)
+        print(f"{name:>12}: {events} events -> {calls:3d} send_message calls")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,216 @@
+"""
+Tournament list benchmark: /api/tournaments with 300 tournaments.
+
+Fills a temporary SQLite database file with 300 finished tournaments of
+20 players each and compares the statements of the old per-tournament
+loop (winners and participant count queried for every tournament) with
+the grouped query of the route. Pages through the list with
+``limit``/``cursor`` and checks it matches the full list, then checks that
+a repeated request is served from the cache and that the cache notices a
+new elimination, swapped places and a renamed winner.
+
+Run from the project root (config.json is required):
+    python -m benchmarks.tournament_list_benchmark
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi import Response
+from sqlalchemy import event, select, update
+
+import db_init  # noqa: F401  registers all models
+from api.routes import tournament_routes
+from domain.entity.player import Player
+from domain.entity.player_tournament_action import PlayerTournamentAction
+from domain.entity.tournament import Tournament
+from domain.repository.player_tournament_action_repository import (
+    PlayerTournamentActionRepository,
+)
+from domain.repository.player_repository import PlayerRepository
+from domain.repository.tournament_repository import TournamentRepository
+from domain.scheme.player_data import PlayerData
+from engine import AsyncSession, Base, ReadAsyncSession, create_async_db_engine
+
+TOURNAMENTS = 300
+PLAYERS_PER_TOURNAMENT = 20
+PLAYERS = 60
+PAGE_SIZE = 50
+
+
+async def prepare() -> None:
+    started = datetime.now(timezone.utc) - timedelta(days=TOURNAMENTS)
+    async with AsyncSession() as session:
+        players = [
+            Player(telegram_id=i, username=f"player{i}", name=f"Player {i}")
+            for i in range(1, PLAYERS + 1)
+        ]
+        session.add_all(players)
+        for number in range(TOURNAMENTS):
+            start = started + timedelta(days=number)
+            session.add(
+                Tournament(
+                    created_at=start,
+                    start_time=start,
+                    end_time=start + timedelta(hours=3),
+                    is_shuffled=True,
+                )
+            )
+        await session.flush()
+        for tournament_id in range(1, TOURNAMENTS + 1):
+            field = [
+                players[(tournament_id + i) % PLAYERS]
+                for i in range(PLAYERS_PER_TOURNAMENT)
+            ]
+            session.add_all(
+                PlayerTournamentAction(
+                    tournament_id=tournament_id, player_id=player.id, rank=rank
+                )
+                for rank, player in enumerate(field, 1)
+            )
+        await session.commit()
+
+
+async def old_list() -> list:
+    """The list as the route built it before: two queries per tournament."""
+    async with ReadAsyncSession() as session:
+        tournaments = await TournamentRepository(session).get_all_tournaments()
+        action_repo = PlayerTournamentActionRepository(session)
+        result = []
+        for t in tournaments:
+            winners = await action_repo.get_winners(t.id)
+            result.append(
+                (
+                    t.id,
+                    [f"{w.player.name or w.player.username}" for w in winners],
+                    await action_repo.count_total_players(t.id),
+                )
+            )
+        return result
+
+
+def summary(models) -> list:
+    return [(m.id, m.winners, m.total_players) for m in models]
+
+
+async def timed(statements: list, call):
+    statements.clear()
+    started = time.perf_counter()
+    result = await call()
+    return result, len(statements), time.perf_counter() - started
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+        engine = create_async_db_engine(url)
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        AsyncSession.configure(bind=engine)
+        ReadAsyncSession.configure(bind=engine)
+        await prepare()
+
+        statements = []
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+
+        expected, count, elapsed = await timed(statements, old_list)
+        print(
+            f"Per-tournament loop: {count} statements, {elapsed * 1000:.0f} ms "
+            f"for {TOURNAMENTS} tournaments"
+        )
+
+        tournament_routes.tournaments_cache.clear()
+        full, count, elapsed = await timed(
+            statements, lambda: tournament_routes.get_tournaments(Response())
+        )
+        print(f"Grouped query: {count} statements, {elapsed * 1000:.0f} ms")
+        assert summary(full) == expected, "grouped list differs"
+        assert count == 2, count
+
+        pages, cursor, page_statements = [], None, 0
+        while True:
+            response = Response()
+            page, count, _ = await timed(
+                statements,
+                lambda: tournament_routes.get_tournaments(response, PAGE_SIZE, cursor),
+            )
+            pages.extend(page)
+            page_statements += count
+            header = response.headers.get(tournament_routes.NEXT_CURSOR_HEADER)
+            if header is None:
+                break
+            cursor = int(header)
+        assert summary(pages) == expected, "pages differ from the full list"
+        print(
+            f"Keyset pages of {PAGE_SIZE}: {len(pages)} tournaments, "
+            f"{page_statements} statements"
+        )
+
+        cached, count, elapsed = await timed(
+            statements, lambda: tournament_routes.get_tournaments(Response())
+        )
+        assert cached is full and count == 1, count
+        print(f"Cached: {count} statement (version check), {elapsed * 1000:.1f} ms")
+
+        # Игрок выбывает из последнего турнира: кэш должен это заметить
+        async with AsyncSession() as session:
+            await session.execute(
+                update(PlayerTournamentAction)
+                .where(
+                    PlayerTournamentAction.tournament_id == TOURNAMENTS,
+                    PlayerTournamentAction.rank == 1,
+                )
+                .values(rank=None)
+            )
+            await session.commit()
+        fresh, count, _ = await timed(
+            statements, lambda: tournament_routes.get_tournaments(Response())
+        )
+        assert fresh is not full and count == 2, count
+        assert len(fresh[0].winners) == 2, fresh[0].winners
+        print("Change detected: the list was rebuilt")
+
+        # Второе и третье места меняются местами: число мест то же
+        async with AsyncSession() as session:
+            actions = list(
+                await session.scalars(
+                    select(PlayerTournamentAction)
+                    .where(
+                        PlayerTournamentAction.tournament_id == TOURNAMENTS,
+                        PlayerTournamentAction.rank.in_([2, 3]),
+                    )
+                    .order_by(PlayerTournamentAction.rank)
+                )
+            )
+            second, third = actions
+            second.rank, third.rank = 3, 2
+            await session.commit()
+        swapped = await tournament_routes.get_tournaments(Response())
+        assert swapped[0].winners == fresh[0].winners[::-1], swapped[0].winners
+
+        # Призёр меняет имя в Telegram
+        async with AsyncSession() as session:
+            winner = await session.get(Player, second.player_id)
+            assert winner is not None
+            await PlayerRepository(session).upsert(
+                PlayerData(
+                    telegram_id=winner.telegram_id, username=None, name="Renamed winner"
+                )
+            )
+            await session.commit()
+        renamed = await tournament_routes.get_tournaments(Response())
+        assert "Renamed winner" in renamed[0].winners, renamed[0].winners
+        print("Swapped places and a renamed winner are detected as well")
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
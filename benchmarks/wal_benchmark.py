@@ -0,0 +1,187 @@
+"""
+Concurrency benchmark: API reads while the bot writes.
+
+A writer process records buy-ins one transaction at a time, the way the bot
+does, while reader processes run the per-user aggregate behind /mystats. The
+run is repeated with SQLite defaults and with the production profile from
+config.py (WAL, synchronous=NORMAL, busy_timeout, mmap and cache size).
+
+The bot and the API are separate processes, so the benchmark uses processes
+too: with threads the readers mostly measured waiting for the GIL. The
+writer commits at a fixed rate, so both profiles do the same amount of
+work; unthrottled, the faster WAL writer simply took CPU time from the
+readers. Writer throughput is measured by a separate unthrottled run.
+
+Run from the project root (config.json is required):
+    python -m benchmarks.wal_benchmark
+"""
+
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+import db_init  # noqa: F401  registers all models
+from config import DATABASE_PRAGMAS
+from engine import Base, create_db_engine
+from domain.entity.game import Game
+from domain.entity.player_action import PlayerAction
+
+DURATION_SECONDS = 5
+ROUNDS = 3
+READER_PROCESSES = 4
+# Записей в секунду при замере читателей — с запасом больше, чем пишет бот
+WRITE_RATE = 100
+SEED_USERS = 50
+SEED_ACTIONS = 50_000
+
+PROFILES = {
+    "sqlite defaults": {},
+    "production profile": DATABASE_PRAGMAS,
+}
+
+
+def _seed(url: str) -> None:
+    engine = create_db_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Game), [{"id": 1}])
+        connection.execute(
+            insert(PlayerAction),
+            [
+                {
+                    "game_id": 1,
+                    "user_id": i % SEED_USERS,
+                    "action": "buyin" if i % 3 else "quit",
+                    "chips": 1500,
+                    "amount": 10.0,
+                    "timestamp": datetime.now(timezone.utc),
+                }
+                for i in range(SEED_ACTIONS)
+            ],
+        )
+    engine.dispose()
+
+
+def _writer(url: str, pragmas: dict, rate: float, stop, results) -> None:
+    Session = sessionmaker(bind=create_db_engine(url, "writer", pragmas))
+    writes = errors = 0
+    started = time.perf_counter()
+    while not stop.is_set():
+        if rate:
+            delay = started + writes / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        try:
+            with Session.begin() as session:
+                session.add(
+                    PlayerAction(
+                        game_id=1,
+                        user_id=writes % SEED_USERS,
+                        action="buyin",
+                        chips=1500,
+                        amount=10.0,
+                    )
+                )
+            writes += 1
+        except Exception:
+            errors += 1
+    results.put({"writes": writes, "write_errors": errors})
+
+
+def _reader(url: str, pragmas: dict, stop, results) -> None:
+    Session = sessionmaker(bind=create_db_engine(url, "reader", pragmas))
+    latencies = []
+    errors = 0
+    user_id = 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            with Session() as session:
+                session.execute(
+                    select(
+                        func.count(PlayerAction.id), func.sum(PlayerAction.amount)
+                    ).where(PlayerAction.user_id == user_id % SEED_USERS)
+                ).one()
+            latencies.append(time.perf_counter() - started)
+        except Exception:
+            errors += 1
+        user_id += 1
+    results.put({"latencies": latencies, "read_errors": errors})
+
+
+def _run_profile(pragmas: dict, write_rate: float, readers: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'benchmark.db')}"
+        _seed(url)
+
+        stop = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=_writer, args=(url, pragmas, write_rate, stop, results)
+            )
+        ] + [
+            multiprocessing.Process(target=_reader, args=(url, pragmas, stop, results))
+            for _ in range(readers)
+        ]
+        for process in processes:
+            process.start()
+        time.sleep(DURATION_SECONDS)
+        stop.set()
+
+        result = {"latencies": [], "read_errors": 0}
+        for _ in processes:
+            part = results.get()
+            result["latencies"] += part.pop("latencies", [])
+            result["read_errors"] += part.pop("read_errors", 0)
+            result.update(part)
+        for process in processes:
+            process.join()
+        return result
+
+
+def main() -> None:
+    print(
+        f"{'profile':>20} {'max writes/s':>13} {'reads/s':>8} "
+        f"{'read p50, ms':>13} {'read p99, ms':>13} {'errors':>7}"
+    )
+    runs = {name: [] for name in PROFILES}
+    # Профили чередуются, чтобы фоновая нагрузка машины делилась между ними поровну
+    for _ in range(ROUNDS):
+        for name, pragmas in PROFILES.items():
+            writer = _run_profile(pragmas, write_rate=0, readers=0)
+            readers = _run_profile(
+                pragmas, write_rate=WRITE_RATE, readers=READER_PROCESSES
+            )
+            runs[name].append((writer, readers))
+
+    for name, results in runs.items():
+        latencies = sorted(
+            latency for _, readers in results for latency in readers["latencies"]
+        ) or [0.0]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        writes = statistics.median(writer["writes"] for writer, _ in results)
+        reads = statistics.median(len(readers["latencies"]) for _, readers in results)
+        errors = sum(
+            readers["write_errors"] + readers["read_errors"] for _, readers in results
+        )
+        print(
+            f"{name:>20} {writes / DURATION_SECONDS:>13.0f} "
+            f"{reads / DURATION_SECONDS:>8.0f} "
+            f"{statistics.median(latencies) * 1000:>13.1f} {p99 * 1000:>13.1f} "
+            f"{errors:>7}"
+        )
+    print(
+        f"(medians of {ROUNDS} rounds; reads measured while the writer commits "
+        f"{WRITE_RATE} buy-ins per second)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Webhook latency benchmark: polling vs. the webhook endpoint of the ASGI app.
+
+A local stand-in of the Bot API (served by uvicorn on 127.0.0.1) hands out
+recorded ``/ping`` updates either through ``getUpdates`` (polling) or by
+posting them to ``WEBHOOK_PATH`` (webhook). The bot answers every ping with
+``sendMessage``; latency is measured from the moment the stand-in has the
+update until the answer reaches it. Each hop between the stand-in and the
+bot takes ``HOP_DELAY``, as the network to Telegram would.
+
+Handing the update to ``Application.process_update`` directly instead of
+``update_queue`` was measured too and made no difference: the queue hop
+costs microseconds. What the webhook mode saves is the getUpdates round
+trip; the bot still pays for one HTTP request per update.
+
+Run from the project root (config.json is required):
+    python -m benchmarks.webhook_latency_benchmark
+"""
+
+import asyncio
+import json
+import multiprocessing
+import random
+import statistics
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from telegram import Update
+from telegram.ext import Application, CommandHandler
+
+from webhook import (
+    SECRET_HEADER,
+    WEBHOOK_PATH,
+    create_webhook_router,
+    start_application,
+    stop_application,
+)
+
+TOKEN = "123456:benchmark"
+SECRET = "benchmark-secret"
+API_PORT = 8771
+WEBHOOK_PORT = 8772
+HOP_DELAY = 0.02
+UPDATES = 100
+# Средний интервал между обновлениями; часть приходит пачками
+MEAN_INTERVAL = 0.1
+BURST_SIZE = 10
+
+
+def recorded_update(update_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": 1000 + update_id % 20, "type": "private"},
+            "from": {"id": 1000 + update_id % 20, "is_bot": False, "first_name": "P"},
+            "text": "/ping",
+            "entities": [{"type": "bot_command", "offset": 0, "length": 5}],
+        },
+    }
+
+
+class StandInBotApi:
+    """Answers the Bot API methods used here and records the replies."""
+
+    def __init__(self):
+        self.updates: list = []
+        self.new_update = asyncio.Condition()
+        self.received_at: dict = {}
+        self.replied_at: dict = {}
+        self.get_updates_calls = 0
+        self.app = Starlette(
+            routes=[Route("/bot{token}/{method}", self.handle, methods=["POST", "GET"])]
+        )
+
+    async def _params(self, request: Request) -> dict:
+        if request.headers.get("content-type", "").startswith("application/json"):
+            return await request.json()
+        return dict(await request.form())
+
+    async def handle(self, request: Request) -> JSONResponse:
+        method = request.path_params["method"]
+        params = await self._params(request)
+        if method == "getMe":
+            result = {
+                "id": 1,
+                "is_bot": True,
+                "first_name": "Bench",
+                "username": "bench_bot",
+            }
+        elif method == "getUpdates":
+            result = await self._get_updates(params)
+        elif method == "sendMessage":
+            await asyncio.sleep(HOP_DELAY)
+            update_id = int(params["text"])
+            self.replied_at[update_id] = time.perf_counter()
+            result = {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": int(params["chat_id"]), "type": "private"},
+                "text": params["text"],
+            }
+        else:
+            result = True
+        return JSONResponse({"ok": True, "result": result})
+
+    async def _get_updates(self, params: dict) -> list:
+        self.get_updates_calls += 1
+        # Запрос идёт до Telegram, ответ с обновлениями — обратно
+        await asyncio.sleep(HOP_DELAY)
+        offset = int(params.get("offset") or 0)
+        timeout = float(params.get("timeout") or 0)
+        async with self.new_update:
+            try:
+                await asyncio.wait_for(
+                    self.new_update.wait_for(
+                        lambda: any(u["update_id"] >= offset for u in self.updates)
+                    ),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                return []
+        await asyncio.sleep(HOP_DELAY)
+        return [u for u in self.updates if u["update_id"] >= offset]
+
+    async def publish(self, update: dict) -> None:
+        self.received_at[update["update_id"]] = time.perf_counter()
+        async with self.new_update:
+            self.updates.append(update)
+            self.new_update.notify_all()
+
+
+async def ping(update: Update, context) -> None:
+    if update.message:
+        await update.message.reply_text(str(update.update_id))
+
+
+def build_bot() -> Application:
+    application = (
+        Application.builder()
+        .token(TOKEN)
+        .base_url(f"http://127.0.0.1:{API_PORT}/bot")
+        .concurrent_updates(True)
+        .build()
+    )
+    application.add_handler(CommandHandler("ping", ping))
+    return application
+
+
+class BackgroundServer(uvicorn.Server):
+    """A uvicorn server running as a task of the current event loop."""
+
+    task: asyncio.Task
+
+
+async def serve(app, port: int) -> BackgroundServer:
+    server = BackgroundServer(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    server.task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server
+
+
+async def shutdown(server: BackgroundServer) -> None:
+    server.should_exit = True
+    await server.task
+
+
+async def feed(deliver) -> None:
+    """Hands the recorded updates to ``deliver`` with random gaps and bursts."""
+    random.seed(13)
+    update_id = 1
+    pending = []
+    while update_id <= UPDATES:
+        burst = BURST_SIZE if random.random() < 0.1 else 1
+        for _ in range(min(burst, UPDATES - update_id + 1)):
+            pending.append(asyncio.create_task(deliver(recorded_update(update_id))))
+            update_id += 1
+        await asyncio.sleep(random.expovariate(1 / MEAN_INTERVAL))
+    await asyncio.gather(*pending)
+
+
+class WebhookSender:
+    """Posts updates over kept-alive connections with plain HTTP/1.1 writes.
+
+    Telegram's sender is not a Python HTTP client: with httpx the stand-in
+    spent more CPU time per update than the bot, and that time was counted
+    as webhook latency.
+    """
+
+    def __init__(self, port: int):
+        self._port = port
+        self._idle: list = []
+
+    async def post(self, path: str, body: bytes, headers: dict) -> int:
+        if self._idle:
+            reader, writer = self._idle.pop()
+        else:
+            reader, writer = await asyncio.open_connection("127.0.0.1", self._port)
+        head = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"{head}\r\n".encode() + body
+        )
+        status = int((await reader.readline()).split()[1])
+        length = 0
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        await reader.readexactly(length)
+        self._idle.append((reader, writer))
+        return status
+
+
+async def run_stand_in(mode: str, results, ready, done) -> None:
+    """Plays Telegram: serves the Bot API and delivers the recorded updates."""
+    api = StandInBotApi()
+    api_server = await serve(api.app, API_PORT)
+    ready.set()
+    url = f"http://127.0.0.1:{WEBHOOK_PORT}{WEBHOOK_PATH}"
+
+    async with httpx.AsyncClient() as client:
+        if mode == "polling":
+            while not api.get_updates_calls:
+                await asyncio.sleep(0.01)
+            deliver = api.publish
+        else:
+            while True:
+                try:
+                    # Чужой запрос без секрета должен быть отклонён
+                    rejected = await client.post(url, json=recorded_update(0))
+                    break
+                except httpx.ConnectError:
+                    await asyncio.sleep(0.05)
+            assert rejected.status_code == 403, rejected.status_code
+
+            sender = WebhookSender(WEBHOOK_PORT)
+
+            async def deliver(update: dict) -> None:
+                api.received_at[update["update_id"]] = time.perf_counter()
+                await asyncio.sleep(HOP_DELAY)
+                status = await sender.post(
+                    WEBHOOK_PATH,
+                    json.dumps(update).encode(),
+                    {SECRET_HEADER: SECRET},
+                )
+                assert status == 200, status
+
+        await feed(deliver)
+        while len(api.replied_at) < UPDATES:
+            await asyncio.sleep(0.01)
+
+    latencies = [
+        (api.replied_at[i] - api.received_at[i]) * 1000 for i in api.replied_at
+    ]
+    results.put((latencies, api.get_updates_calls))
+    # Бот ещё обращается к API при остановке
+    while not done.is_set():
+        await asyncio.sleep(0.05)
+    await shutdown(api_server)
+
+
+def stand_in_process(mode: str, results, ready, done) -> None:
+    asyncio.run(run_stand_in(mode, results, ready, done))
+
+
+async def wait_result(results: multiprocessing.Queue):
+    while results.empty():
+        await asyncio.sleep(0.05)
+    return results.get()
+
+
+async def run_polling(results: multiprocessing.Queue):
+    application = build_bot()
+    await application.initialize()
+    await application.start()
+    updater = application.updater
+    assert updater is not None
+    await updater.start_polling(poll_interval=0, timeout=10)
+
+    result = await wait_result(results)
+
+    await updater.stop()
+    await application.stop()
+    await application.shutdown()
+    return result
+
+
+async def run_webhook(results: multiprocessing.Queue):
+    application = build_bot()
+    await start_application(application, f"http://127.0.0.1:{WEBHOOK_PORT}", SECRET)
+
+    web_app = FastAPI()
+    web_app.include_router(create_webhook_router(SECRET))
+    web_app.state.telegram_application = application
+    web_server = await serve(web_app, WEBHOOK_PORT)
+
+    result = await wait_result(results)
+
+    await shutdown(web_server)
+    await stop_application(application)
+    return result
+
+
+def run(mode: str, bot) -> None:
+    """Runs the stand-in in its own process so it does not share the bot's loop."""
+    results = multiprocessing.Queue()
+    ready, done = multiprocessing.Event(), multiprocessing.Event()
+    stand_in = multiprocessing.Process(
+        target=stand_in_process, args=(mode, results, ready, done)
+    )
+    stand_in.start()
+    ready.wait()
+    latencies, get_updates_calls = asyncio.run(bot(results))
+    done.set()
+    stand_in.join()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{mode:>7}: p50 {statistics.median(latencies):6.1f} ms, "
+        f"p95 {p95:6.1f} ms, max {latencies[-1]:6.1f} ms, "
+        f"getUpdates calls {get_updates_calls}"
+    )
+
+
+def main() -> None:
+    print(
+        f"{UPDATES} updates, {HOP_DELAY * 1000:.0f} ms per hop, "
+        f"floor {2 * HOP_DELAY * 1000:.0f} ms (update in, reply out)"
+    )
+    run("polling", run_polling)
+    run("webhook", run_webhook)
+
+
+if __name__ == "__main__":
+    main()
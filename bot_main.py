@@ -1,13 +1,37 @@
 import asyncio
-from telegram.ext import Application, MessageHandler, filters
+import logging
+from telegram import Update
+from telegram.ext import (
+    Application,
+    CallbackQueryHandler,
+    ChatMemberHandler,
+    MessageHandler,
+    filters,
+)
 from telegram import BotCommandScopeChat, BotCommandScopeAllPrivateChats
 from commands.game_management import GameManagement
 from commands.player_actions import PlayerActions
-from commands.tournament_management import TournamentManagement
-from config import BOT_TOKEN, CHANNEL_ID
+from commands.tournament_management import (
+    SUMMARY_PAGE_CALLBACK,
+    TournamentManagement,
+)
+from config import BOT_TOKEN, CHANNEL_ID, MAX_CONCURRENT_UPDATES
 from di_container import DIContainer
-from engine import session, Session
+from engine import AsyncSession
+from unit_of_work import (
+    ScopedSession,
+    UnitOfWorkUpdateProcessor,
+    rollback_on_error,
+)
+from update_ordering import ordering_keys
+from domain.repository.player_repository import PlayerRepository
 from domain.repository.tournament_repository import TournamentRepository
+from domain.service.coalescing_notification_service import (
+    CoalescingNotificationService,
+)
+from domain.service.live_game_summary_service import live_game_summary
+from domain.service.outbound_message_queue import outbound_queue
+from domain.service.permission_checker import PermissionChecker
 from telegram import BotCommandScopeChat, BotCommandScopeAllPrivateChats
 
 # Initialize database tables
@@ -15,13 +39,15 @@ from db_init import init_db
 
 init_db()
 
+logger = logging.getLogger(__name__)
+
 
 async def setup_bot_commands(bot) -> None:
     """Sets bot commands based on the current state (e.g., active tournament)."""
-    db_session = Session()
+    db_session = AsyncSession()
     try:
         has_active_tournament = (
-            TournamentRepository(db_session).find_active_tournament() is not None
+            await TournamentRepository(db_session).find_active_tournament() is not None
         )
 
         commands = [
@@ -44,7 +70,7 @@ async def setup_bot_commands(bot) -> None:
             scope=BotCommandScopeAllPrivateChats(),
         )
     finally:
-        db_session.close()
+        await db_session.close()
 
 
 async def post_init(application: Application) -> None:
@@ -52,8 +78,8 @@ async def post_init(application: Application) -> None:
     bot_info = await application.bot.get_me()
     bn = bot_info.username
 
-    # Initialize DI container
-    di_container = DIContainer(db_session=session)
+    # Initialize DI container: repositories resolve the session of the current update
+    di_container = DIContainer(db_session=ScopedSession)
     tournament_management = TournamentManagement(
         start_tournament_use_case=di_container.get_start_tournament_use_case(),
         end_tournament_use_case=di_container.get_end_tournament_use_case(),
@@ -62,6 +88,7 @@ async def post_init(application: Application) -> None:
         get_tournament_summary_use_case=di_container.get_tournament_summary_use_case(),
         shuffle_players_use_case=di_container.get_shuffle_players_use_case(),
         kick_player_use_case=di_container.get_kick_player_use_case(),
+        rebalance_tables_use_case=di_container.get_rebalance_tables_use_case(),
         notification_public_tournament_channel_service=di_container.get_notification_public_tournament_channel_service(),
         notification_bot_channel_service=di_container.get_notification_bot_channel_service(),
     )
@@ -77,6 +104,22 @@ async def post_init(application: Application) -> None:
     # Initial setup of private commands
     await setup_bot_commands(application.bot)
 
+    # Исходящие сообщения отправляются фоновым обработчиком очереди
+    outbound_queue.start()
+
+    # Справочник имён игроков обновляется из команд, прошедших проверку прав
+    application.bot_data["player_name_directory"] = (
+        di_container.get_player_name_directory()
+    )
+
+    # Кэш членства в группах сбрасывается при вступлении и выходе из них
+    application.add_handler(
+        ChatMemberHandler(
+            PermissionChecker.handle_chat_member_update,
+            ChatMemberHandler.CHAT_MEMBER,
+        )
+    )
+
     # Регистрация обработчиков
     application.add_handler(
         MessageHandler(filters.Regex(rf"^\s*/menu(@{bn})?$"), PlayerActions.show_menu)
@@ -164,6 +207,12 @@ async def post_init(application: Application) -> None:
             tournament_management.summary_tournament,
         )
     )
+    application.add_handler(
+        CallbackQueryHandler(
+            tournament_management.summary_page,
+            pattern=rf"^{SUMMARY_PAGE_CALLBACK}:\d+:\d+$",
+        )
+    )
     application.add_handler(
         MessageHandler(
             filters.Regex(rf"^\s*/shuffle_players(@{bn})?$"),
@@ -182,20 +231,49 @@ async def post_init(application: Application) -> None:
             tournament_management.kick_player,
         )
     )
+    application.add_handler(
+        MessageHandler(
+            filters.Regex(rf"^\s*/bust(_tie)?(@{bn})?((?:\s+\d+)+)\s*$"),
+            tournament_management.kick_players,
+        )
+    )
 
 
 def build_application() -> Application:
     """Создаёт и настраивает экземпляр Telegram Application."""
-    application = Application.builder().token(BOT_TOKEN).build()
+    application = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .concurrent_updates(
+            UnitOfWorkUpdateProcessor(
+                max_concurrent_updates=MAX_CONCURRENT_UPDATES,
+                ordering_keys=ordering_keys,
+            )
+        )
+        .build()
+    )
+    application.add_error_handler(rollback_on_error)
 
     # Назначение функции инициализации после запуска
     application.post_init = post_init
+    application.post_stop = post_stop
     return application
 
 
+async def post_stop(application: Application) -> None:
+    """Досылает накопленные сообщения, пока бот ещё может отправлять запросы."""
+    await CoalescingNotificationService.flush_all()
+    await live_game_summary.flush_all()
+    await outbound_queue.stop()
+    logger.info("Membership cache: %s", PermissionChecker.get_membership_cache_stats())
+    logger.info("Player cache: %s", PlayerRepository.get_cache_stats())
+
+
 def run_bot():
+    """Режим polling; в режиме webhook бот запускается вместе с asgi.py."""
     app = build_application()
-    app.run_polling()
+    # chat_member обновления приходят только если их запросить явно
+    app.run_polling(allowed_updates=Update.ALL_TYPES)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from engine import Session
+from unit_of_work import ScopedSession, call_after_commit
 from telegram import Update, KeyboardButton, ReplyKeyboardMarkup, ReplyKeyboardRemove
 from domain.entity.game import Game
 from domain.entity.player_action import PlayerAction
@@ -8,7 +8,6 @@ from domain.repository.player_action_repository import PlayerActionRepository
 from domain.service.message_sender import MessageSender
 from telegram.ext import ContextTypes
 from decorators import restrict_to_members_and_private
-from config import CHANNEL_ID
 import re
 from commands.player_actions import PlayerActions
 from utils import get_user_info
@@ -19,31 +18,32 @@ class GameManagement:
     @staticmethod
     @restrict_to_members_and_private
     async def start_game(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        session = Session()
+        session = ScopedSession()
 
         # Проверяем, есть ли незавершённая игра в базе данных
         if "current_game_id" in context.bot_data:
             if update.message:
-                await update.message.reply_text("Игра уже начата!")
-            session.close()
+                await MessageSender.send_to_current_channel(
+                    update, context, "Игра уже начата!"
+                )
             return
 
-        current_game = GameRepository(session).find_active_game()
+        current_game = await GameRepository(session).find_active_game()
 
         if current_game:
             context.bot_data["current_game_id"] = current_game.id
             if update.message:
-                await update.message.reply_text(
-                    "Игра уже начата! Это восстановленная игра."
+                await MessageSender.send_to_current_channel(
+                    update, context, "Игра уже начата! Это восстановленная игра."
                 )
-            session.close()
             return
 
         new_game = Game(start_time=datetime.now(timezone.utc))
-        GameRepository(session).save(new_game)
+        await GameRepository(session).save(new_game)
 
-        # Сохраняем game_id в контексте бота
-        context.bot_data["current_game_id"] = new_game.id
+        # game_id попадает в контекст бота, только когда игра сохранена
+        game_id = new_game.id
+        call_after_commit(lambda: context.bot_data.update(current_game_id=game_id))
 
         # Логируем старт игры
         if update.effective_user:
@@ -56,29 +56,37 @@ class GameManagement:
                 timestamp=datetime.now(timezone.utc),
             )
 
-            PlayerActionRepository(session).save(action)
+            await PlayerActionRepository(session).record_action(action)
 
-        session.close()
         if update.message:
-            await update.message.reply_text("Игра начата! Закупки открыты.")
-        await context.bot.send_message(CHANNEL_ID, "Игра начата! Закупки открыты.")
+            call_after_commit(
+                lambda: MessageSender.send_to_current_channel(
+                    update, context, "Игра начата! Закупки открыты."
+                )
+            )
+        call_after_commit(
+            lambda: MessageSender.send_to_channel(
+                update, context, "Игра начата! Закупки открыты."
+            )
+        )
 
     @staticmethod
     @restrict_to_members_and_private
     async def end_game(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        session = Session()
-        current_game = GameRepository(session).find_active_game()
+        session = ScopedSession()
+        current_game = await GameRepository(session).find_active_game()
         if not current_game:
             if update.message:
-                await update.message.reply_text("Игра не начата.")
-            session.close()
+                await MessageSender.send_to_current_channel(
+                    update, context, "Игра не начата."
+                )
             return
 
         current_game.end_time = datetime.now(timezone.utc)  # type: ignore
-        GameRepository(session).save(current_game)
+        await GameRepository(session).save(current_game)
 
-        # Удаляем текущий game_id из контекста
-        context.bot_data.pop("current_game_id", None)
+        # game_id удаляется из контекста, только когда завершение сохранено
+        call_after_commit(lambda: context.bot_data.pop("current_game_id", None))
 
         # Логируем завершение игры
         if update.effective_user:
@@ -90,13 +98,17 @@ class GameManagement:
                 action="end_game",
                 timestamp=datetime.now(timezone.utc),
             )
-            PlayerActionRepository(session).save(action)
+            await PlayerActionRepository(session).record_action(action)
 
-        session.close()
         if update.message:
-            await update.message.reply_text("Игра завершена.")
-
-        await context.bot.send_message(CHANNEL_ID, "Игра завершена.")
+            call_after_commit(
+                lambda: MessageSender.send_to_current_channel(
+                    update, context, "Игра завершена."
+                )
+            )
+        call_after_commit(
+            lambda: MessageSender.send_to_channel(update, context, "Игра завершена.")
+        )
 
     @staticmethod
     @restrict_to_members_and_private
@@ -141,5 +153,5 @@ class GameManagement:
                 update, context, "Не найдено ожидающих подтверждения действий."
             )
 
-        # Возвращаем основное меню
-        await PlayerActions.close_menu(update, context)
+        # Возвращаем основное меню — после ответов о завершении игры
+        call_after_commit(lambda: PlayerActions.send_menu_closed(update, context))
@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
 from domain.entity.game import Game
 from domain.entity.player_action import PlayerAction
+from domain.service.live_game_summary_service import live_game_summary
 from domain.service.message_sender import MessageSender
 from domain.service.permission_checker import PermissionChecker
 from telegram import (
@@ -10,18 +11,24 @@ from telegram import (
     ReplyKeyboardRemove,
 )
 from telegram.ext import ContextTypes
-from sqlalchemy.sql import func
-from engine import Session
+from unit_of_work import ScopedSession, call_after_commit
+from domain.repository.game_ledger_repository import GameLedgerRepository
 from domain.repository.game_repository import GameRepository
 from domain.repository.player_action_repository import PlayerActionRepository
 from domain.repository.tournament_repository import TournamentRepository
-from utils import format_datetime, format_datetime_to_date, get_user_info
+from utils import (
+    format_datetime,
+    format_datetime_to_date,
+    get_user_info,
+    get_user_infos,
+)
 from config import (
     CHIP_VALUE,
     CHIP_COUNT,
     CURRENCY,
     SHOW_SUMMARY_ON_BUYIN,
     SHOW_SUMMARY_ON_QUIT,
+    SUMMARY_MODE,
     LOG_AMOUNT_LAST_GAMES,
     LOG_AMOUNT_LAST_ACTIONS,
     STATS_BLOCKED_USER_IDS,
@@ -40,7 +47,7 @@ class PlayerActions:
     @staticmethod
     @restrict_to_members_and_private
     async def buyin(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        session = Session()
+        session = ScopedSession()
         current_game_id = context.bot_data.get("current_game_id")
 
         if current_game_id is None:
@@ -48,7 +55,6 @@ class PlayerActions:
                 update, context, "Сначала начните игру командой /startgame."
             )
 
-            session.close()
             return
 
         if not update.effective_user:
@@ -69,50 +75,48 @@ class PlayerActions:
             amount=CHIP_VALUE,
             timestamp=datetime.now(timezone.utc),
         )
-        PlayerActionRepository(session).save(action)
-
-        # Подсчитываем общее количество закупов и сумму
-        total_buyins = (
-            session.query(PlayerAction)
-            .filter_by(game_id=current_game_id, user_id=user.id, action="buyin")
-            .with_entities(func.count(PlayerAction.id), func.sum(PlayerAction.amount))
-            .first()
-        )
+        await PlayerActionRepository(session).record_action(action)
 
-        buyin_count = total_buyins[0] if total_buyins else 0
-        buyin_total = total_buyins[1] if total_buyins else 0.0
-
-        session.close()
+        # Общее количество закупов и сумма берутся из леджера игры
+        balance = await GameLedgerRepository(session).get_balance(
+            current_game_id, user.id
+        )
+        buyin_count = balance.buyin_count if balance else 0
+        buyin_total = balance.buyin_amount if balance else 0.0
 
         buyin_text = (
             f"Закуп на {CHIP_COUNT} фишек ({CHIP_VALUE} {CURRENCY}) записан.\n"
             f"Вы уже закупились {buyin_count} раз(а) на общую сумму {buyin_total:.2f} {CURRENCY} в этой игре."
         )
 
-        await MessageSender.send_to_current_channel(update, context, buyin_text)
-
-        await MessageSender.send_to_channel(
-            update,
-            context,
-            f"<b>{user_info or str(user.id)} (@{update.effective_user.username})</b>: "
-            + buyin_text,
-            parse_mode="HTML",
+        channel_text = (
+            f"<b>{user_info or str(user.id)} (@{user.username})</b>: " + buyin_text
+        )
+        # Ответы отправляются, только когда закуп сохранён
+        call_after_commit(
+            lambda: MessageSender.send_to_current_channel(update, context, buyin_text)
+        )
+        call_after_commit(
+            lambda: MessageSender.send_to_channel(
+                update, context, channel_text, parse_mode="HTML"
+            )
         )
 
         if SHOW_SUMMARY_ON_BUYIN:
-            await PlayerActions.summary(update, context)
+            await PlayerActions.show_summary_after_action(
+                update, context, current_game_id
+            )
 
     @staticmethod
     @restrict_to_members_and_private
     async def quit(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        session = Session()
+        session = ScopedSession()
         current_game_id = context.bot_data.get("current_game_id")
 
         if current_game_id is None:
             await MessageSender.send_to_current_channel(
                 update, context, "Сначала начните игру командой /startgame."
             )
-            session.close()
             return
 
         if not context.args:
@@ -121,7 +125,6 @@ class PlayerActions:
                 context,
                 "Ошибка: Вы не указали количество фишек. Пример: /quit 1500",
             )
-            session.close()
             return
 
         chips_left = int(context.args[0])
@@ -138,33 +141,17 @@ class PlayerActions:
                 context,
                 f"Ошибка: Количество фишек должно быть кратно {int(step)}.",
             )
-            session.close()
             return
 
-        total_buyins = (
-            session.query(PlayerAction)
-            .filter_by(game_id=current_game_id, action="buyin")
-            .with_entities(func.sum(PlayerAction.chips))
-            .scalar()
-            or 0
-        )
-
-        total_quits = (
-            session.query(PlayerAction)
-            .filter_by(game_id=current_game_id, action="quit")
-            .with_entities(func.sum(PlayerAction.chips))
-            .scalar()
-            or 0
-        )
-
-        max_chips = total_buyins - total_quits
+        ledger_repository = GameLedgerRepository(session)
+        bank = await ledger_repository.get_bank(current_game_id)
+        max_chips = bank.get_available_chips() if bank else 0
 
         if chips_left < 0:
             await MessageSender.send_to_current_channel(
                 update, context, "Ошибка: Количество фишек не может быть меньше 0."
             )
 
-            session.close()
             return
 
         if chips_left > max_chips:
@@ -173,28 +160,15 @@ class PlayerActions:
                 context,
                 f"Ошибка: Количество фишек не может быть больше доступных в банке: {max_chips}.",
             )
-            session.close()
             return
 
         amount = (chips_left / CHIP_COUNT) * CHIP_VALUE
 
         # Подсчитываем баланс пользователя
         user = update.effective_user
-        user_buyins = (
-            session.query(PlayerAction)
-            .filter_by(game_id=current_game_id, user_id=user.id, action="buyin")
-            .with_entities(func.sum(PlayerAction.amount))
-            .scalar()
-            or 0
-        )
-
-        user_quits = (
-            session.query(PlayerAction)
-            .filter_by(game_id=current_game_id, user_id=user.id, action="quit")
-            .with_entities(func.sum(PlayerAction.amount))
-            .scalar()
-            or 0
-        )
+        balance = await ledger_repository.get_balance(current_game_id, user.id)
+        user_buyins = balance.buyin_amount if balance else 0.0
+        user_quits = balance.quit_amount if balance else 0.0
 
         user_balance = user_buyins - (user_quits + amount)
         if user_balance > 0:
@@ -215,33 +189,35 @@ class PlayerActions:
             amount=amount,
             timestamp=datetime.now(timezone.utc),
         )
-        session.add(action)
-        session.commit()
-        session.close()
+        await PlayerActionRepository(session).record_action(action)
 
-        quit_text = (
-            f"@{update.effective_user.username} - Выход записан. У вас осталось {chips_left} фишек, что эквивалентно {amount} {CURRENCY}.\n"
+        reply_text = (
+            f"@{user.username} - Выход записан. У вас осталось {chips_left} фишек, что эквивалентно {amount} {CURRENCY}.\n"
             f"До этого закупов от вас было на {user_buyins} {CURRENCY}, выходов - на {user_quits} {CURRENCY}.\n{balance_message}\n\n"
         )
-        await MessageSender.send_to_current_channel(
-            update, context, quit_text, reply_markup=ReplyKeyboardRemove()
-        )
-
         quit_text = (
             f"Выход записан. У вас осталось {chips_left} фишек, что эквивалентно {amount} {CURRENCY}.\n"
             f"До этого закупов от вас было на {user_buyins} {CURRENCY}, выходов - на {user_quits} {CURRENCY}.\n{balance_message}\n\n"
         )
-
-        await MessageSender.send_to_channel(
-            update,
-            context,
-            f"<b>{user_info or str(user.id)} (@{update.effective_user.username})</b>: "
-            + quit_text,
-            parse_mode="HTML",
+        channel_text = (
+            f"<b>{user_info or str(user.id)} (@{user.username})</b>: " + quit_text
+        )
+        # Ответы отправляются, только когда выход сохранён
+        call_after_commit(
+            lambda: MessageSender.send_to_current_channel(
+                update, context, reply_text, reply_markup=ReplyKeyboardRemove()
+            )
+        )
+        call_after_commit(
+            lambda: MessageSender.send_to_channel(
+                update, context, channel_text, parse_mode="HTML"
+            )
         )
 
         if SHOW_SUMMARY_ON_QUIT:
-            await PlayerActions.summary(update, context)
+            await PlayerActions.show_summary_after_action(
+                update, context, current_game_id
+            )
 
     @staticmethod
     @restrict_to_members
@@ -279,16 +255,11 @@ class PlayerActions:
     @staticmethod
     @restrict_to_members
     async def log(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        session = Session()
+        session = ScopedSession()
 
         # Получаем последние записи, ограниченные конфигом
-        actions = (
-            session.query(PlayerAction)
-            .order_by(
-                PlayerAction.timestamp.desc()
-            )  # Сортируем по времени (последние сначала)
-            .limit(LOG_AMOUNT_LAST_ACTIONS)  # Ограничиваем количество записей
-            .all()
+        actions = await PlayerActionRepository(session).find_last_actions(
+            LOG_AMOUNT_LAST_ACTIONS
         )
 
         log_text = f"Лог последних {LOG_AMOUNT_LAST_ACTIONS} действий:\n"
@@ -300,44 +271,72 @@ class PlayerActions:
                 f"({action.chips} фишек, {amount} {CURRENCY})\n"
             )
 
-        session.close()
-
         # Отправляем сообщение
         await MessageSender.send_to_current_channel(update, context, log_text)
 
     @staticmethod
     @restrict_to_members
     async def summary(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        session = Session()
         current_game_id = context.bot_data.get("current_game_id")
         if current_game_id is None:
             await MessageSender.send_to_current_channel(
                 update, context, "Игра не начата."
             )
-            session.close()
             return
 
-        game = session.query(Game).filter_by(id=current_game_id).one()
-        actions = PlayerActionRepository(session).find_actions_by_game(game.id)
-        summary_text = await PlayerActions.summary_formatter(actions, game, context)
+        summary_text = await PlayerActions.render_summary(current_game_id, context)
 
         await MessageSender.send_to_current_channel(
             update, context, summary_text, parse_mode="HTML"
         )
 
-        session.close()
+    @staticmethod
+    async def show_summary_after_action(
+        update: Update, context: ContextTypes.DEFAULT_TYPE, game_id: int
+    ):
+        """
+        Показывает сводку после закупа или выхода: новым сообщением или
+        правкой закреплённой сводки игры в этом чате (SUMMARY_MODE = "pinned").
+        """
+        if SUMMARY_MODE != "pinned" or not update.effective_chat:
+            # Сводка строится в этой транзакции, а отправляется после её коммита
+            summary_text = await PlayerActions.render_summary(game_id, context)
+            call_after_commit(
+                lambda: MessageSender.send_to_current_channel(
+                    update, context, summary_text, parse_mode="HTML"
+                )
+            )
+            return
+
+        chat_id = update.effective_chat.id
+        call_after_commit(
+            lambda: live_game_summary.schedule(
+                context.bot,
+                game_id,
+                chat_id,
+                lambda: PlayerActions.render_summary(game_id, context),
+            )
+        )
+
+    @staticmethod
+    async def render_summary(game_id: int, context: ContextTypes.DEFAULT_TYPE) -> str:
+        session = ScopedSession()
+        game = await GameRepository(session).find_by_id(game_id)
+        balances = await GameLedgerRepository(session).find_balances_by_game(game.id)
+        return await PlayerActions.summary_formatter(balances, game, context)
 
     @staticmethod
     @restrict_to_members
     async def summarygames(update: Update, context: ContextTypes.DEFAULT_TYPE):
-        session = Session()
-        games = GameRepository(session).get_games_by_limit(LOG_AMOUNT_LAST_GAMES)
+        session = ScopedSession()
+        games = await GameRepository(session).get_games_by_limit(LOG_AMOUNT_LAST_GAMES)
 
         summary_text = f"<pre>Сводка последних {LOG_AMOUNT_LAST_GAMES} игр</pre>"
+        ledger_repository = GameLedgerRepository(session)
         for game in games:
-            actions = PlayerActionRepository(session).find_actions_by_game(game.id)
+            balances = await ledger_repository.find_balances_by_game(game.id)
             summary_text += await PlayerActions.summary_formatter(
-                actions, game, context
+                balances, game, context
             )
 
             summary_text += "\n\n"
@@ -345,7 +344,6 @@ class PlayerActions:
         await MessageSender.send_to_current_channel(
             update, context, summary_text, parse_mode="HTML"
         )
-        session.close()
 
     @staticmethod
     @restrict_to_members
@@ -371,7 +369,7 @@ class PlayerActions:
 
     @staticmethod
     async def summary_formatter(
-        actions, game, context: ContextTypes.DEFAULT_TYPE
+        balances, game, context: ContextTypes.DEFAULT_TYPE
     ) -> str:
         """
         Форматирует сводку игры, группируя игроков по их балансу:
@@ -383,22 +381,21 @@ class PlayerActions:
         total_buyin = 0
         total_quit = 0
 
-        # Собираем статистику по игрокам
-        for action in actions:
-            user_info = await get_user_info(action.user_id, context) or str(
-                action.user_id
-            )
+        user_infos = await get_user_infos(
+            [balance.user_id for balance in balances], context
+        )
+
+        # Собираем статистику по игрокам из леджера игры
+        for balance in balances:
+            user_info = user_infos[balance.user_id] or str(balance.user_id)
 
             if user_info not in player_stats:
                 player_stats[user_info] = {"buyin": 0, "quit": 0}
 
-            if action.action == "buyin":
-                player_stats[user_info]["buyin"] += action.amount
-                total_buyin += action.amount
-
-            elif action.action == "quit":
-                player_stats[user_info]["quit"] += action.amount
-                total_quit += action.amount
+            player_stats[user_info]["buyin"] += balance.buyin_amount
+            player_stats[user_info]["quit"] += balance.quit_amount
+            total_buyin += balance.buyin_amount
+            total_quit += balance.quit_amount
 
         # Рассчитываем баланс для каждого игрока
         players_with_balance = []
@@ -508,6 +505,10 @@ class PlayerActions:
     @staticmethod
     @restrict_to_members
     async def close_menu(update, context):
+        await PlayerActions.send_menu_closed(update, context)
+
+    @staticmethod
+    async def send_menu_closed(update, context):
         await MessageSender.send_to_current_channel(
             update, context, "Меню закрыто", reply_markup=ReplyKeyboardRemove()
         )
@@ -572,8 +573,10 @@ class PlayerActions:
                 # Очищаем временные данные
                 del context.user_data["pending_quit_amount"]
 
-                # Возвращаем основное меню
-                await PlayerActions.close_menu(update, context)
+                # Возвращаем основное меню — после ответов о выходе
+                call_after_commit(
+                    lambda: PlayerActions.send_menu_closed(update, context)
+                )
             elif "Нет, отменить" in update.message.text:
                 await MessageSender.send_to_current_channel(
                     update,
@@ -602,10 +605,9 @@ class PlayerActions:
 
         user_id = update.effective_user.id
 
-        session = Session()
+        session = ScopedSession()
         stats_service = PlayerStatisticsService(session)
-        stats: PlayerStatistics = stats_service.get_statistics_for_user(user_id)
-        session.close()
+        stats: PlayerStatistics = await stats_service.get_statistics_for_user(user_id)
 
         # Форматируем статистику
         stats_text = (
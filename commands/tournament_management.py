@@ -1,7 +1,8 @@
 """Tournament management commands for the Telegram bot."""
 
 from datetime import datetime, timezone
-from telegram import Update
+from typing import Any, Dict, List
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
 
 
@@ -14,15 +15,24 @@ from domain.use_cases.Tournament.get_tournament_summary_use_case import (
 )
 from domain.use_cases.Tournament.shuffle_players_use_case import ShufflePlayersUseCase
 from domain.use_cases.Tournament.kick_player_use_case import KickPlayerUseCase
-from domain.service.notification_public_channel_service import (
-    NotificationPublicChannelService,
+from domain.use_cases.Tournament.rebalance_tables_use_case import (
+    RebalanceTablesUseCase,
+)
+from domain.service.coalescing_notification_service import (
+    CoalescingNotificationService,
 )
 from domain.service.notification_bot_channel_service import (
     NotificationBotChannelService,
 )
+from domain.service.message_builder import MESSAGE_LIMIT, MessageBuilder
+from domain.service.outbound_message_queue import PRIORITY_REPLY, outbound_queue
 from domain.scheme.player_data import PlayerData
 from utils import get_user_info, setup_bot_commands
-from config import CHANNEL_TOURNAMENT_ID, ADMIN_IDS
+from config import CHANNEL_TOURNAMENT_ID, ADMIN_IDS, TOURNAMENT_SUMMARY_PAGINATION
+
+SUMMARY_PAGE_CALLBACK = "tournament_summary"
+# Запас под заголовок страницы сводки
+SUMMARY_HEADER_RESERVE = 128
 
 
 class TournamentManagement:
@@ -35,7 +45,8 @@ class TournamentManagement:
         get_tournament_summary_use_case: GetTournamentSummaryUseCase,
         shuffle_players_use_case: ShufflePlayersUseCase,
         kick_player_use_case: KickPlayerUseCase,
-        notification_public_tournament_channel_service: NotificationPublicChannelService,
+        rebalance_tables_use_case: RebalanceTablesUseCase,
+        notification_public_tournament_channel_service: CoalescingNotificationService,
         notification_bot_channel_service: NotificationBotChannelService,
     ) -> None:
         self._start_tournament_use_case = start_tournament_use_case
@@ -45,6 +56,7 @@ class TournamentManagement:
         self._get_tournament_summary_use_case = get_tournament_summary_use_case
         self._shuffle_players_use_case = shuffle_players_use_case
         self._kick_player_use_case = kick_player_use_case
+        self._rebalance_tables_use_case = rebalance_tables_use_case
         self._notification_public_tournament_channel_service = (
             notification_public_tournament_channel_service
         )
@@ -57,21 +69,25 @@ class TournamentManagement:
             result = await self._shuffle_players_use_case.execute()
             tables = result["tables"]
 
-            message = [
-                f"⏳ <b>Турнир начался! Регистрация закрыта.</b>\n",
-                f"🎲 <b>Рассадка игроков (Турнир #{result['tournament_id']})</b>\n",
+            # Каждый стол — отдельный блок: в длинной рассадке стол не разрывается
+            # между сообщениями
+            blocks = [
+                f"⏳ <b>Турнир начался! Регистрация закрыта.</b>\n\n"
+                f"🎲 <b>Рассадка игроков (Турнир #{result['tournament_id']})</b>"
             ]
-
             for i, table_players in enumerate(tables, 1):
-                message.append(f"<b>Стол №{i}</b>")
-                for j, player in enumerate(table_players, 1):
-                    message.append(
-                        f"🪑 {j}: <b>{player.get_name()}</b> (@{player.get_user_name()})"
+                blocks.append(
+                    "\n".join(
+                        [f"<b>Стол №{i}</b>"]
+                        + [
+                            f"🪑 {j}: <b>{player.get_name()}</b> (@{player.get_user_name()})"
+                            for j, player in enumerate(table_players, 1)
+                        ]
                     )
-                message.append("")  # Empty line between tables
+                )
 
-            await self._notification_public_tournament_channel_service.notify(
-                context.bot, "\n".join(message)
+            await self._notification_public_tournament_channel_service.notify_blocks(
+                context.bot, blocks
             )
 
             await self._notification_bot_channel_service.reply(
@@ -95,38 +111,107 @@ class TournamentManagement:
                 )
                 return
 
-            if summary["status"] == "registration_open":
-                status = "Регистрация открыта"
-            elif summary["status"] == "active":
-                status = "Активный"
-            elif summary["status"] == "finished":
-                status = "Завершенный"
-
-            message = [f"📊 <b>Турнир #{tournament.id}</b> ({status})\n"]
-
-            if not summary["players"]:
-                message.append("Игроков пока нет.")
+            pages = self._summary_pages(summary)
+            if TOURNAMENT_SUMMARY_PAGINATION == "inline" and len(pages) > 1:
+                # Одна страница с кнопками вместо потока сообщений
+                await self._notification_bot_channel_service.reply(
+                    update,
+                    pages[0],
+                    reply_markup=self._summary_keyboard(tournament.id, 0, len(pages)),
+                )
             else:
-                for idx, player_info in enumerate(summary["players"], 1):
-                    player = player_info["player"]
-                    rank = player_info["rank"]
-                    duration = player_info.get("duration_str")
-
-                    medal = "🏆 " if rank and 1 <= rank <= 3 else "🏅 "
-                    rank_str = f"{medal}Место: {rank}" if rank else "🎮 В игре"
-                    duration_str = f" (⏱ {duration})" if duration else ""
-                    message.append(
-                        f"{idx}. <b>{player.get_name()}</b> (@{player.get_user_name()}) — {rank_str}{duration_str}"
-                    )
-
-            await self._notification_bot_channel_service.reply(
-                update, "\n".join(message)
-            )
+                await self._notification_bot_channel_service.reply_pages(update, pages)
         except Exception as e:
             await self._notification_bot_channel_service.reply(
                 update, f"❌ Ошибка при получении сводки: {str(e)}"
             )
 
+    async def summary_page(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """Кнопки «◀»/«▶» под сводкой турнира: показывает выбранную страницу."""
+        query = update.callback_query
+        if not query or not query.data or not query.message:
+            return
+        await query.answer()
+
+        _, tournament_id, page = query.data.split(":")
+        summary = await self._get_tournament_summary_use_case.execute(
+            int(tournament_id)
+        )
+        if not summary["tournament"]:
+            return
+
+        pages = self._summary_pages(summary)
+        page = min(int(page), len(pages) - 1)
+        await outbound_queue.send(
+            query.message.chat.id,
+            lambda: query.edit_message_text(
+                pages[page],
+                parse_mode="HTML",
+                reply_markup=self._summary_keyboard(
+                    summary["tournament"].id, page, len(pages)
+                ),
+            ),
+            PRIORITY_REPLY,
+            idempotent=True,
+        )
+
+    @staticmethod
+    def _summary_pages(summary: Dict[str, Any]) -> List[str]:
+        tournament = summary["tournament"]
+        if summary["status"] == "registration_open":
+            status = "Регистрация открыта"
+        elif summary["status"] == "active":
+            status = "Активный"
+        else:
+            status = "Завершенный"
+
+        rows = MessageBuilder(limit=MESSAGE_LIMIT - SUMMARY_HEADER_RESERVE)
+        if not summary["players"]:
+            rows.add("Игроков пока нет.")
+        for idx, player_info in enumerate(summary["players"], 1):
+            player = player_info["player"]
+            rank = player_info["rank"]
+            duration = player_info.get("duration_str")
+
+            medal = "🏆 " if rank and 1 <= rank <= 3 else "🏅 "
+            rank_str = f"{medal}Место: {rank}" if rank else "🎮 В игре"
+            duration_str = f" (⏱ {duration})" if duration else ""
+            rows.add(
+                f"{idx}. <b>{player.get_name()}</b> (@{player.get_user_name()}) — {rank_str}{duration_str}"
+            )
+
+        pages = rows.pages()
+        header = f"📊 <b>Турнир #{tournament.id}</b> ({status})"
+        if len(pages) == 1:
+            return [f"{header}\n\n{pages[0]}"]
+        return [
+            f"{header}, стр. {number}/{len(pages)}\n\n{page}"
+            for number, page in enumerate(pages, 1)
+        ]
+
+    @staticmethod
+    def _summary_keyboard(
+        tournament_id: int, page: int, page_count: int
+    ) -> InlineKeyboardMarkup:
+        buttons = []
+        if page > 0:
+            buttons.append(
+                InlineKeyboardButton(
+                    "◀",
+                    callback_data=f"{SUMMARY_PAGE_CALLBACK}:{tournament_id}:{page - 1}",
+                )
+            )
+        if page < page_count - 1:
+            buttons.append(
+                InlineKeyboardButton(
+                    "▶",
+                    callback_data=f"{SUMMARY_PAGE_CALLBACK}:{tournament_id}:{page + 1}",
+                )
+            )
+        return InlineKeyboardMarkup([buttons])
+
     async def start_tournament(
         self, update: Update, context: ContextTypes.DEFAULT_TYPE
     ) -> None:
@@ -202,7 +287,7 @@ class TournamentManagement:
             player_data = PlayerData.from_telegram_user(update.effective_user)
 
             action = await self._register_player_use_case.execute(player_data)
-            await self._notification_public_tournament_channel_service.notify(
+            await self._notification_public_tournament_channel_service.notify_coalesced(
                 context.bot,
                 f"✅ Игрок <b>{action.get_player().get_name()}</b> (@{action.get_player().get_user_name()}) зарегистрирован в турнире!",
             )
@@ -227,18 +312,19 @@ class TournamentManagement:
             action = await self._eliminate_player_use_case.execute(player_data)
 
             if not action:
-                await self._notification_public_tournament_channel_service.notify(
+                await self._notification_public_tournament_channel_service.notify_coalesced(
                     context.bot,
                     f"Игрок <b>{player_data.name}</b> (@{player_data.username}) отменил свою регистрацию в турнире.",
                 )
                 return
 
-            await self._notification_public_tournament_channel_service.notify(
+            await self._notification_public_tournament_channel_service.notify_coalesced(
                 context.bot,
                 f"☠️ Игрок <b>{action.get_player().get_name()}</b> (@{action.get_player().get_user_name()}) выбыл из турнира.\n"
                 f"{'🏆 ' if action.rank and 1 <= action.rank <= 3 else '🏅 '}Место: {action.rank}\n"
                 f"⏱️ Время в игре: {action.get_duration_str()}",
             )
+            await self._rebalance_tables(context, [action])
         except RuntimeError as e:
             await self._notification_bot_channel_service.reply(
                 update, f"❌ Ошибка: {str(e)}"
@@ -266,7 +352,7 @@ class TournamentManagement:
             )
 
             if not action:
-                await self._notification_public_tournament_channel_service.notify(
+                await self._notification_public_tournament_channel_service.notify_coalesced(
                     context.bot,
                     f"🚫 Игрок <b>{player.get_name()}</b> (@{player.get_user_name()}) удален из списка участников администратором.",
                 )
@@ -281,12 +367,13 @@ class TournamentManagement:
             player_name = action.get_player().get_name()
             player_username = action.get_player().get_user_name()
 
-            await self._notification_public_tournament_channel_service.notify(
+            await self._notification_public_tournament_channel_service.notify_coalesced(
                 context.bot,
                 f"☠️ Игрок <b>{player_name}</b> (@{player_username}) выбыл из турнира (администратором).\n"
                 f"{'🏆 ' if action.rank and 1 <= action.rank <= 3 else '🏅 '}Место: {action.rank}\n"
                 f"⏱️ Время в игре: {action.get_duration_str()}",
             )
+            await self._rebalance_tables(context, [action])
 
             await self._notification_bot_channel_service.reply(
                 update, f"✅ Игрок {player_name} (@{player_username}) исключен."
@@ -299,3 +386,79 @@ class TournamentManagement:
             await self._notification_bot_channel_service.reply(
                 update, f"❌ Произошла непредвиденная ошибка: {str(e)}"
             )
+
+    async def kick_players(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """/bust id1 id2 ... — игроки выбыли в одной раздаче, от худшего места к лучшему.
+
+        /bust_tie id1 id2 ... — выбывшие делят место.
+        """
+        try:
+            if not update.effective_user or update.effective_user.id not in ADMIN_IDS:
+                return
+
+            if not context.match:
+                return
+
+            tied = context.match.group(1) is not None
+            telegram_ids = [int(i) for i in context.match.group(3).split()]
+
+            actions = await self._eliminate_player_use_case.execute_bulk(
+                telegram_ids, tied=tied
+            )
+            if not actions:
+                await self._notification_bot_channel_service.reply(
+                    update, "❌ Все указанные игроки уже выбыли."
+                )
+                return
+
+            for action in actions:
+                await self._notification_public_tournament_channel_service.notify_coalesced(
+                    context.bot,
+                    f"☠️ Игрок <b>{action.get_player().get_name()}</b> (@{action.get_player().get_user_name()}) выбыл из турнира.\n"
+                    f"{'🏆 ' if action.rank and 1 <= action.rank <= 3 else '🏅 '}Место: {action.rank}\n"
+                    f"⏱️ Время в игре: {action.get_duration_str()}",
+                )
+            await self._rebalance_tables(context, actions)
+
+            await self._notification_bot_channel_service.reply(
+                update,
+                "✅ Выбыли: "
+                + ", ".join(
+                    f"{action.get_player().get_name()} (место {action.rank})"
+                    for action in actions
+                ),
+            )
+        except RuntimeError as e:
+            await self._notification_bot_channel_service.reply(
+                update, f"❌ Ошибка: {str(e)}"
+            )
+        except Exception as e:
+            await self._notification_bot_channel_service.reply(
+                update, f"❌ Произошла непредвиденная ошибка: {str(e)}"
+            )
+
+    async def _rebalance_tables(
+        self, context: ContextTypes.DEFAULT_TYPE, eliminated_actions
+    ) -> None:
+        """Пересаживает игроков после выбывания и публикует одно сообщение о пересадке."""
+        result = await self._rebalance_tables_use_case.execute(
+            [action.player_id for action in eliminated_actions]
+        )
+        if not result["moves"]:
+            return
+
+        message = ["🔀 <b>Пересадка игроков</b>\n"]
+        for table_number in result["broken_tables"]:
+            message.append(f"Стол №{table_number} закрыт.")
+        for player, move in result["moves"]:
+            message.append(
+                f"🪑 <b>{player.get_name()}</b> (@{player.get_user_name()}): "
+                f"стол №{move.from_table} → стол №{move.to_table}, место {move.to_position}"
+            )
+
+        # Вместе с сообщениями о выбывании, чтобы сохранить их порядок
+        await self._notification_public_tournament_channel_service.notify_coalesced(
+            context.bot, "\n".join(message)
+        )
@@ -13,7 +13,69 @@ TIMEZONE = config["timezone"]
 USE_TABLE = config.get("use_table", True)
 SHOW_SUMMARY_ON_BUYIN = config["show_summary_on_buyin"]
 SHOW_SUMMARY_ON_QUIT = config["show_summary_on_quit"]
+# "message" — новая сводка после каждого закупа/выхода,
+# "pinned" — одно закреплённое сообщение на игру и чат, которое редактируется
+SUMMARY_MODE = config.get("summary_mode", "message")
+# Сколько секунд копить изменения перед редактированием закреплённой сводки
+SUMMARY_EDIT_DEBOUNCE = config.get("summary_edit_debounce", 3.0)
 LOG_AMOUNT_LAST_GAMES = config.get("log_amount_last_games", 3)
 LOG_AMOUNT_LAST_ACTIONS = config.get("log_amount_last_actions", 20)
 STATS_BLOCKED_USER_IDS = config.get("stats_blocked_user_ids", [])
 ADMIN_IDS = config.get("admin_ids", [])
+# Справочник имён игроков: размер кэша и минимальный интервал (с) между get_chat
+PLAYER_NAMES_CACHE_SIZE = config.get("player_names_cache_size", 10000)
+PLAYER_NAMES_LOOKUP_INTERVAL = config.get("player_names_lookup_interval", 0.5)
+# Кэш игроков (id, имя, username) по telegram_id
+PLAYER_CACHE_SIZE = config.get("player_cache_size", 10000)
+# Очередь исходящих сообщений: лимиты Telegram и размер буфера.
+# В группу — не чаще group_per_second и не больше group_per_minute сообщений
+# за любые group_window секунд
+OUTBOUND_QUEUE = {
+    "max_size": 1000,
+    "global_per_second": 30,
+    "private_per_second": 1,
+    "group_per_second": 1,
+    "group_per_minute": 20,
+    "group_window": 60,
+    "burst": 3,
+    "concurrency": 8,
+    "max_attempts": 5,
+    **config.get("outbound_queue", {}),
+}
+# Сколько обновлений обрабатывается одновременно (не больше пула соединений на запись)
+MAX_CONCURRENT_UPDATES = config.get("max_concurrent_updates", 4)
+# Режим получения обновлений: "polling" (bot_main.py) или "webhook" (asgi.py)
+BOT_MODE = config.get("bot_mode", "polling")
+WEBHOOK_URL = config.get("webhook_url")  # публичный адрес asgi-приложения
+WEBHOOK_SECRET = config.get("webhook_secret")
+# Окно (с), за которое события турнира объединяются в одно сообщение; 0 — без объединения
+TOURNAMENT_NOTIFICATION_WINDOW = config.get("tournament_notification_window", 3.0)
+# Длинная сводка турнира: "messages" — все страницы отдельными сообщениями,
+# "inline" — одна страница с кнопками «◀»/«▶»
+TOURNAMENT_SUMMARY_PAGINATION = config.get("tournament_summary_pagination", "messages")
+# Сколько секунд помнить результат проверки членства в группах
+MEMBERSHIP_CACHE_TTL = config.get("membership_cache_ttl", 300)
+
+# База данных: URL и настройки SQLite (pragma) и пулов соединений
+DATABASE_URL = config.get("database_url", "sqlite:///poker_bot.db")
+DATABASE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": 5000,  # мс
+    "mmap_size": 268435456,  # 256 МБ
+    "cache_size": -65536,  # 64 МБ (отрицательное значение — в КиБ)
+    **config.get("database_pragmas", {}),
+}
+# Бот — единственный писатель, API только читает
+DATABASE_WRITER_POOL = {
+    "pool_size": 5,
+    "max_overflow": 0,
+    "pool_timeout": 30,
+    **config.get("database_writer_pool", {}),
+}
+DATABASE_READER_POOL = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    **config.get("database_reader_pool", {}),
+}
@@ -1,21 +1,28 @@
 """
 Database initialization module.
 
-This module imports all entity models and initializes the database tables.
+This module imports all entity models, initializes the database tables and
+applies pending schema migrations (see the ``migrations`` package).
 It must be imported before using the database to ensure all tables are created.
 """
 
 from engine import Base, Engine
+from migrations import run_migrations
 
 # Import all models to register them with Base metadata
 # This ensures SQLAlchemy knows about all tables and their relationships
 from domain.entity.player import Player
 from domain.entity.game import Game
 from domain.entity.player_action import PlayerAction
+from domain.entity.game_player_balance import GamePlayerBalance
+from domain.entity.game_bank import GameBank
+from domain.entity.game_summary_message import GameSummaryMessage
+from domain.entity.player_stats_rollup import PlayerStatsRollup
 from domain.entity.tournament import Tournament
 from domain.entity.player_tournament_action import PlayerTournamentAction
 
 
 def init_db():
-    """Initialize database by creating all tables."""
+    """Initialize database by creating all tables and running migrations."""
     Base.metadata.create_all(Engine)
+    run_migrations(Engine)
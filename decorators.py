@@ -1,17 +1,26 @@
 from telegram import Update
+from domain.service.message_sender import MessageSender
 from domain.service.permission_checker import PermissionChecker
 
 
+async def _remember_sender(update: Update, context) -> None:
+    # Имена запоминаются только у тех, кто прошёл проверку прав
+    directory = context.bot_data.get("player_name_directory")
+    if directory is not None and update.effective_user:
+        await directory.remember(update.effective_user)
+
+
 # Декоратор для ограничения команд только пользователями в канале
 def restrict_to_members(func):
     async def wrapper(update: Update, context):
         if await PermissionChecker.check_is_group_member(update, context):
+            await _remember_sender(update, context)
             await func(update, context)
             return
 
         if update.message:
-            await update.message.reply_text(
-                "Эта команда обрабатывается только участниками группы."
+            await MessageSender.send_to_current_channel(
+                update, context, "Эта команда обрабатывается только участниками группы."
             )
         return
 
@@ -24,12 +33,15 @@ def restrict_to_members_and_private(func):
         if await PermissionChecker.check_is_group_member(
             update, context
         ) and await PermissionChecker.check_is_chat_private(update, context):
+            await _remember_sender(update, context)
             await func(update, context)
             return
 
         if update.message:
-            await update.message.reply_text(
-                "Эта команда обрабатывается только в канале бота или участниками группы."
+            await MessageSender.send_to_current_channel(
+                update,
+                context,
+                "Эта команда обрабатывается только в канале бота или участниками группы.",
             )
         return
 
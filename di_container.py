@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession, async_scoped_session
 
 from config import CHANNEL_ID, CHANNEL_TOURNAMENT_ID
 from domain.repository.player_repository import PlayerRepository
@@ -6,6 +6,11 @@ from domain.repository.tournament_repository import TournamentRepository
 from domain.repository.player_tournament_action_repository import (
     PlayerTournamentActionRepository,
 )
+from domain.service.coalescing_notification_service import (
+    CoalescingNotificationService,
+)
+from domain.service.player_name_directory import PlayerNameDirectory
+from domain.service.tournament_engine import TournamentEngine
 from domain.service.notification_public_channel_service import (
     NotificationPublicChannelService,
 )
@@ -21,11 +26,16 @@ from domain.use_cases.Tournament.get_tournament_summary_use_case import (
 )
 from domain.use_cases.Tournament.shuffle_players_use_case import ShufflePlayersUseCase
 from domain.use_cases.Tournament.kick_player_use_case import KickPlayerUseCase
+from domain.use_cases.Tournament.rebalance_tables_use_case import (
+    RebalanceTablesUseCase,
+)
 
 
 class DIContainer:
 
-    def __init__(self, db_session: Session) -> None:
+    def __init__(
+        self, db_session: AsyncSession | async_scoped_session[AsyncSession]
+    ) -> None:
         self._db_session = db_session
         self._instances: dict = {}
 
@@ -41,11 +51,27 @@ class DIContainer:
             self._instances["player_repository"] = PlayerRepository(self._db_session)
         return self._instances["player_repository"]
 
+    def get_player_name_directory(self) -> PlayerNameDirectory:
+        if "player_name_directory" not in self._instances:
+            self._instances["player_name_directory"] = PlayerNameDirectory(
+                self.get_player_repository()
+            )
+        return self._instances["player_name_directory"]
+
+    def get_tournament_engine(self) -> TournamentEngine:
+        if "tournament_engine" not in self._instances:
+            self._instances["tournament_engine"] = TournamentEngine(
+                tournament_repository=self.get_tournament_repository(),
+                player_tournament_action_repository=self.get_player_tournament_action_repository(),
+            )
+        return self._instances["tournament_engine"]
+
     def get_start_tournament_use_case(self) -> StartTournamentUseCase:
         if "start_tournament_use_case" not in self._instances:
             self._instances["start_tournament_use_case"] = StartTournamentUseCase(
                 tournament_repository=self.get_tournament_repository(),
                 player_repository=self.get_player_repository(),
+                tournament_engine=self.get_tournament_engine(),
             )
         return self._instances["start_tournament_use_case"]
 
@@ -55,6 +81,7 @@ class DIContainer:
                 tournament_repository=self.get_tournament_repository(),
                 player_repository=self.get_player_repository(),
                 player_tournament_action_repository=self.get_player_tournament_action_repository(),
+                tournament_engine=self.get_tournament_engine(),
             )
         return self._instances["end_tournament_use_case"]
 
@@ -73,24 +100,26 @@ class DIContainer:
                 tournament_repository=self.get_tournament_repository(),
                 player_repository=self.get_player_repository(),
                 player_tournament_action_repository=self.get_player_tournament_action_repository(),
+                tournament_engine=self.get_tournament_engine(),
             )
         return self._instances["register_player_use_case"]
 
     def get_eliminate_player_use_case(self) -> EliminatePlayerUseCase:
         if "eliminate_player_use_case" not in self._instances:
             self._instances["eliminate_player_use_case"] = EliminatePlayerUseCase(
-                tournament_repository=self.get_tournament_repository(),
-                player_repository=self.get_player_repository(),
                 player_tournament_action_repository=self.get_player_tournament_action_repository(),
+                tournament_engine=self.get_tournament_engine(),
             )
         return self._instances["eliminate_player_use_case"]
 
     def get_notification_public_tournament_channel_service(
         self,
-    ) -> NotificationPublicChannelService:
+    ) -> CoalescingNotificationService:
         if "notification_public_tournament_channel_service" not in self._instances:
             self._instances["notification_public_tournament_channel_service"] = (
-                NotificationPublicChannelService(CHANNEL_TOURNAMENT_ID)
+                CoalescingNotificationService(
+                    NotificationPublicChannelService(CHANNEL_TOURNAMENT_ID)
+                )
             )
         return self._instances["notification_public_tournament_channel_service"]
 
@@ -107,6 +136,7 @@ class DIContainer:
                 GetTournamentSummaryUseCase(
                     tournament_repository=self.get_tournament_repository(),
                     player_tournament_action_repository=self.get_player_tournament_action_repository(),
+                    tournament_engine=self.get_tournament_engine(),
                 )
             )
         return self._instances["get_tournament_summary_use_case"]
@@ -116,6 +146,7 @@ class DIContainer:
             self._instances["shuffle_players_use_case"] = ShufflePlayersUseCase(
                 tournament_repository=self.get_tournament_repository(),
                 player_tournament_action_repository=self.get_player_tournament_action_repository(),
+                tournament_engine=self.get_tournament_engine(),
             )
         return self._instances["shuffle_players_use_case"]
 
@@ -126,3 +157,11 @@ class DIContainer:
                 player_repository=self.get_player_repository(),
             )
         return self._instances["kick_player_use_case"]
+
+    def get_rebalance_tables_use_case(self) -> RebalanceTablesUseCase:
+        if "rebalance_tables_use_case" not in self._instances:
+            self._instances["rebalance_tables_use_case"] = RebalanceTablesUseCase(
+                player_tournament_action_repository=self.get_player_tournament_action_repository(),
+                tournament_engine=self.get_tournament_engine(),
+            )
+        return self._instances["rebalance_tables_use_case"]
@@ -1,6 +1,6 @@
 from sqlalchemy.orm import Mapped, mapped_column
 from typing import Optional
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, Index, text
 from datetime import datetime, timezone
 from engine import Base, Engine
 from utils import ensure_aware
@@ -8,6 +8,15 @@ from utils import ensure_aware
 
 class Game(Base):
     __tablename__ = "games"
+    __table_args__ = (
+        # Частичный индекс для поиска активной игры
+        Index(
+            "ix_games_active",
+            "id",
+            sqlite_where=text("end_time IS NULL"),
+            postgresql_where=text("end_time IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     start_time: Mapped[datetime] = mapped_column(
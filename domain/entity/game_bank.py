@@ -0,0 +1,20 @@
+from sqlalchemy import Integer, Float, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from engine import Base
+
+
+class GameBank(Base):
+    """Банк игры: сколько фишек и денег внесено закупами и выведено выходами."""
+
+    __tablename__ = "game_bank"
+
+    game_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("games.id"), primary_key=True
+    )
+    buyin_chips: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    buyin_amount: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    quit_chips: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    quit_amount: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+
+    def get_available_chips(self) -> int:
+        return self.buyin_chips - self.quit_chips
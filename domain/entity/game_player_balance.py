@@ -0,0 +1,21 @@
+from sqlalchemy import Integer, Float, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from engine import Base
+
+
+class GamePlayerBalance(Base):
+    """Баланс игрока в игре, обновляется вместе с каждым закупом и выходом."""
+
+    __tablename__ = "game_player_balance"
+
+    game_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("games.id"), primary_key=True
+    )
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    buyin_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    buyin_amount: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    quit_chips: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    quit_amount: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+
+    def get_balance(self) -> float:
+        return self.quit_amount - self.buyin_amount
@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Integer, String, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from engine import Base
+
+
+class GameSummaryMessage(Base):
+    """Закреплённое сообщение со сводкой игры в чате, редактируется при изменениях."""
+
+    __tablename__ = "game_summary_messages"
+
+    game_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("games.id"), primary_key=True
+    )
+    chat_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    message_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Хэш последнего отправленного текста: одинаковый текст не редактируется
+    text_hash: Mapped[str] = mapped_column(String, nullable=False)
@@ -1,11 +1,15 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import DateTime
+from sqlalchemy import DateTime, Index
 from datetime import datetime, timezone
 from engine import Base, Engine
 
 
 class Player(Base):
     __tablename__ = "players"
+    __table_args__ = (
+        # Версия имён игроков для кэша списка турниров
+        Index("ix_players_updated_at", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     telegram_id: Mapped[int] = mapped_column(unique=True)
@@ -14,6 +18,12 @@ class Player(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+    # Время последнего изменения username или name
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        default=lambda: datetime.now(timezone.utc),
+    )
 
     def get_user_name(self) -> str:
         return self.username
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, Float, ForeignKey, DateTime
+from sqlalchemy import Integer, String, Float, ForeignKey, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime, timezone
 from engine import Base, Engine
@@ -6,6 +6,20 @@ from engine import Base, Engine
 
 class PlayerAction(Base):
     __tablename__ = "player_actions"
+    __table_args__ = (
+        # Балансы игрока в игре (закуп/выход)
+        Index("ix_player_actions_game_user_action", "game_id", "user_id", "action"),
+        # Статистика игрока: покрывает COUNT/SUM без обращения к таблице
+        Index(
+            "ix_player_actions_user_action",
+            "user_id",
+            "action",
+            "game_id",
+            "amount",
+        ),
+        # Лог последних действий
+        Index("ix_player_actions_timestamp", "timestamp"),
+    )
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     game_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("games.id"), nullable=False
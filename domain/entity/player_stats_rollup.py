@@ -0,0 +1,19 @@
+from datetime import date
+from sqlalchemy import Integer, Float, String, Date
+from sqlalchemy.orm import Mapped, mapped_column
+from engine import Base
+
+
+class PlayerStatsRollup(Base):
+    """Статистика игрока за календарный день или месяц (в TIMEZONE)."""
+
+    __tablename__ = "player_stats_rollup"
+
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # "day" или "month"; для месяца bucket - первое число месяца
+    period: Mapped[str] = mapped_column(String, primary_key=True)
+    bucket: Mapped[date] = mapped_column(Date, primary_key=True)
+    games: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    buyin_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    buyin_amount: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    quit_amount: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
@@ -1,6 +1,6 @@
 import enum
 from datetime import datetime, timezone
-from sqlalchemy import Integer, Enum, ForeignKey, DateTime
+from sqlalchemy import Integer, Enum, ForeignKey, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from engine import Base, Engine
 from domain.entity.player import Player
@@ -8,6 +8,17 @@ from domain.entity.player import Player
 
 class PlayerTournamentAction(Base):
     __tablename__ = "player_tournament_actions"
+    __table_args__ = (
+        # A player can join a tournament only once
+        Index(
+            "uq_player_tournament_actions_tournament_player",
+            "tournament_id",
+            "player_id",
+            unique=True,
+        ),
+        # Player counts (total / eliminated) per tournament
+        Index("ix_player_tournament_actions_tournament_rank", "tournament_id", "rank"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     tournament_id: Mapped[int] = mapped_column(
@@ -16,7 +27,11 @@ class PlayerTournamentAction(Base):
     player_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("players.id"), nullable=False
     )
-    player: Mapped["Player"] = relationship("Player", foreign_keys=[player_id])
+    # Загрузка только явная (joinedload/selectinload в запросах чтения):
+    # случайное ленивое обращение сразу даёт ошибку, а не лишний SELECT
+    player: Mapped["Player"] = relationship(
+        "Player", foreign_keys=[player_id], lazy="raise"
+    )
     rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
     table_number: Mapped[int | None] = mapped_column(Integer, nullable=True)
     position_number: Mapped[int | None] = mapped_column(Integer, nullable=True)
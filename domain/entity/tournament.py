@@ -1,6 +1,6 @@
 from typing import Optional, TYPE_CHECKING
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import DateTime, ForeignKey
+from sqlalchemy import DateTime, ForeignKey, Index, text
 from datetime import datetime, timezone
 from engine import Base, Engine
 from domain.entity.player import Player
@@ -8,6 +8,15 @@ from domain.entity.player import Player
 
 class Tournament(Base):
     __tablename__ = "tournaments"
+    __table_args__ = (
+        # Partial index used to look up the active tournament
+        Index(
+            "ix_tournaments_active",
+            "id",
+            sqlite_where=text("end_time IS NULL"),
+            postgresql_where=text("end_time IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     created_at: Mapped[datetime] = mapped_column(
@@ -28,11 +37,12 @@ class Tournament(Base):
         ForeignKey("players.id"), nullable=True
     )
 
+    # Загрузка только явная, см. PlayerTournamentAction.player
     created_player: Mapped[Optional["Player"]] = relationship(
-        "Player", foreign_keys=[created_player_id]
+        "Player", foreign_keys=[created_player_id], lazy="raise"
     )
     ended_player: Mapped[Optional["Player"]] = relationship(
-        "Player", foreign_keys=[ended_player_id]
+        "Player", foreign_keys=[ended_player_id], lazy="raise"
     )
 
     def get_duration_str(self) -> str:
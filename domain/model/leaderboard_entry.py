@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from domain.model.player_statistics import PlayerStatistics
+
+
+@dataclass
+class LeaderboardEntry:
+    user_id: int
+    username: Optional[str]  # Последнее имя, под которым играл пользователь
+    statistics: PlayerStatistics
@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+from datetime import date
+
+
+@dataclass
+class RoiPoint:
+    date: date  # День (в TIMEZONE)
+    roi: float  # ROI с начала истории на конец дня, в процентах
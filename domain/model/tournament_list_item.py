@@ -0,0 +1,11 @@
+from dataclasses import dataclass, field
+from typing import List
+
+from domain.entity.tournament import Tournament
+
+
+@dataclass
+class TournamentListItem:
+    tournament: Tournament
+    total_players: int = 0  # Количество участников
+    winners: List[str] = field(default_factory=list)  # Призёры по местам (1–3)
@@ -1,18 +1,37 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_scoped_session
 from abc import ABC
 
 
 class BaseRepository(ABC):
-    db: Session
+    """Stages changes in the session; the unit of work commits them once."""
 
-    def __init__(self, db: Session):
+    # Сессия или ScopedSession, отдающая сессию текущего обновления
+    db: AsyncSession | async_scoped_session[AsyncSession]
+
+    def __init__(self, db: AsyncSession | async_scoped_session[AsyncSession]):
         self.db = db
         self.model = None  # позже будет переопределён в потомках
 
-    def save(self, model):
+    async def save(self, model):
         self.db.add(model)
-        self.db.commit()
+        await self.db.flush()
+
+    async def delete(self, model):
+        await self.db.delete(model)
+        await self.db.flush()
+
+    def insert_statement(self, model):
+        """INSERT supporting ON CONFLICT clauses for the dialect of the session."""
+        if self.db.bind.dialect.name == "postgresql":
+            return postgresql.insert(model)
+        return sqlite.insert(model)
 
-    def delete(self, model):
-        self.db.delete(model)
-        self.db.commit()
+    async def upsert_increment(self, model, keys: dict, deltas: dict) -> None:
+        """Inserts a counter row or adds the deltas to the existing one."""
+        query = self.insert_statement(model).values(**keys, **deltas)
+        query = query.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: getattr(model, name) + query.excluded[name] for name in deltas},
+        )
+        await self.db.execute(query)
@@ -0,0 +1,189 @@
+from typing import List, Optional
+
+from sqlalchemy import case, delete, func, insert, select
+
+from domain.entity.game_bank import GameBank
+from domain.entity.game_player_balance import GamePlayerBalance
+from domain.entity.player_action import PlayerAction
+from domain.repository.base_repository import BaseRepository
+
+LEDGER_ACTIONS = ("buyin", "quit")
+BALANCE_COLUMNS = ("buyin_count", "buyin_amount", "quit_chips", "quit_amount")
+BANK_COLUMNS = ("buyin_chips", "buyin_amount", "quit_chips", "quit_amount")
+FLOAT_TOLERANCE = 1e-6
+
+
+def _sum_for(action: str, column):
+    return func.coalesce(func.sum(case((PlayerAction.action == action, column))), 0)
+
+
+def balances_from_actions(game_id: Optional[int] = None):
+    """Player balances per game computed from raw actions."""
+    query = (
+        select(
+            PlayerAction.game_id,
+            PlayerAction.user_id,
+            func.count(case((PlayerAction.action == "buyin", PlayerAction.id))),
+            _sum_for("buyin", PlayerAction.amount),
+            _sum_for("quit", PlayerAction.chips),
+            _sum_for("quit", PlayerAction.amount),
+        )
+        .where(PlayerAction.action.in_(LEDGER_ACTIONS))
+        .group_by(PlayerAction.game_id, PlayerAction.user_id)
+    )
+    if game_id is not None:
+        query = query.where(PlayerAction.game_id == game_id)
+    return query
+
+
+def banks_from_actions(game_id: Optional[int] = None):
+    """Game banks computed from raw actions."""
+    query = (
+        select(
+            PlayerAction.game_id,
+            _sum_for("buyin", PlayerAction.chips),
+            _sum_for("buyin", PlayerAction.amount),
+            _sum_for("quit", PlayerAction.chips),
+            _sum_for("quit", PlayerAction.amount),
+        )
+        .where(PlayerAction.action.in_(LEDGER_ACTIONS))
+        .group_by(PlayerAction.game_id)
+    )
+    if game_id is not None:
+        query = query.where(PlayerAction.game_id == game_id)
+    return query
+
+
+def ledger_rebuild_statements(game_id: Optional[int] = None) -> list:
+    """Statements that replace the ledger (of one game or of all games) with
+    the one computed from raw actions."""
+    delete_balances = delete(GamePlayerBalance)
+    delete_banks = delete(GameBank)
+    if game_id is not None:
+        delete_balances = delete_balances.where(GamePlayerBalance.game_id == game_id)
+        delete_banks = delete_banks.where(GameBank.game_id == game_id)
+    return [
+        delete_balances,
+        delete_banks,
+        insert(GamePlayerBalance).from_select(
+            ["game_id", "user_id", *BALANCE_COLUMNS], balances_from_actions(game_id)
+        ),
+        insert(GameBank).from_select(
+            ["game_id", *BANK_COLUMNS], banks_from_actions(game_id)
+        ),
+    ]
+
+
+class GameLedgerRepository(BaseRepository):
+    """Per-game ledger: player balances and the bank, kept in sync with actions."""
+
+    async def apply_action(self, action: PlayerAction) -> None:
+        """Adds a buy-in or quit to the ledger in the current transaction."""
+        if action.action not in LEDGER_ACTIONS:
+            return
+
+        is_buyin = action.action == "buyin"
+        chips = action.chips or 0
+        amount = action.amount or 0.0
+
+        await self.upsert_increment(
+            GamePlayerBalance,
+            {"game_id": action.game_id, "user_id": action.user_id},
+            {
+                "buyin_count": 1 if is_buyin else 0,
+                "buyin_amount": amount if is_buyin else 0.0,
+                "quit_chips": 0 if is_buyin else chips,
+                "quit_amount": 0.0 if is_buyin else amount,
+            },
+        )
+        await self.upsert_increment(
+            GameBank,
+            {"game_id": action.game_id},
+            {
+                "buyin_chips": chips if is_buyin else 0,
+                "buyin_amount": amount if is_buyin else 0.0,
+                "quit_chips": 0 if is_buyin else chips,
+                "quit_amount": 0.0 if is_buyin else amount,
+            },
+        )
+
+    async def get_balance(
+        self, game_id: int, user_id: int
+    ) -> Optional[GamePlayerBalance]:
+        return await self.db.scalar(
+            select(GamePlayerBalance)
+            .filter_by(game_id=game_id, user_id=user_id)
+            .execution_options(populate_existing=True)
+        )
+
+    async def get_bank(self, game_id: int) -> Optional[GameBank]:
+        return await self.db.scalar(
+            select(GameBank)
+            .filter_by(game_id=game_id)
+            .execution_options(populate_existing=True)
+        )
+
+    async def find_balances_by_game(self, game_id: int) -> List[GamePlayerBalance]:
+        result = await self.db.scalars(
+            select(GamePlayerBalance)
+            .filter_by(game_id=game_id)
+            .execution_options(populate_existing=True)
+        )
+        return list(result.all())
+
+    async def rebuild(self, game_id: Optional[int] = None) -> None:
+        """Recomputes the ledger (of one game or of all games) from raw actions."""
+        for statement in ledger_rebuild_statements(game_id):
+            await self.db.execute(statement)
+
+    async def verify(self, game_id: Optional[int] = None) -> List[str]:
+        """Compares the ledger with raw actions and describes every mismatch."""
+        mismatches = []
+
+        expected = {
+            (row[0], row[1]): row[2:]
+            for row in await self.db.execute(balances_from_actions(game_id))
+        }
+        stored_query = select(
+            GamePlayerBalance.game_id,
+            GamePlayerBalance.user_id,
+            *[getattr(GamePlayerBalance, name) for name in BALANCE_COLUMNS],
+        )
+        if game_id is not None:
+            stored_query = stored_query.where(GamePlayerBalance.game_id == game_id)
+        stored = {
+            (row[0], row[1]): row[2:] for row in await self.db.execute(stored_query)
+        }
+        mismatches += self._compare(
+            "balance game={} user={}", BALANCE_COLUMNS, expected, stored
+        )
+
+        expected = {
+            (row[0],): row[1:]
+            for row in await self.db.execute(banks_from_actions(game_id))
+        }
+        stored_query = select(
+            GameBank.game_id, *[getattr(GameBank, name) for name in BANK_COLUMNS]
+        )
+        if game_id is not None:
+            stored_query = stored_query.where(GameBank.game_id == game_id)
+        stored = {(row[0],): row[1:] for row in await self.db.execute(stored_query)}
+        mismatches += self._compare("bank game={}", BANK_COLUMNS, expected, stored)
+
+        return mismatches
+
+    @staticmethod
+    def _compare(label: str, columns, expected: dict, stored: dict) -> List[str]:
+        mismatches = []
+        for key in sorted(expected.keys() | stored.keys()):
+            expected_values = expected.get(key, (0,) * len(columns))
+            stored_values = stored.get(key)
+            if stored_values is None:
+                mismatches.append(f"{label.format(*key)}: missing ledger row")
+                continue
+            for name, want, have in zip(columns, expected_values, stored_values):
+                if abs((want or 0) - (have or 0)) > FLOAT_TOLERANCE:
+                    mismatches.append(
+                        f"{label.format(*key)}: {name} is {have}, expected {want}"
+                    )
+        return mismatches
@@ -2,15 +2,21 @@ from typing import List
 
 from domain.entity.game import Game
 from domain.repository.base_repository import BaseRepository
-from sqlalchemy import desc
+from sqlalchemy import desc, select
 
 
 class GameRepository(BaseRepository):
-    def find_active_game(self) -> Game:
-        return self.db.query(Game).filter_by(end_time=None).first()
+    async def find_active_game(self) -> Game:
+        return await self.db.scalar(select(Game).filter_by(end_time=None).limit(1))
 
-    def get_games_by_limit(self, limit: int) -> List[Game]:
-        return self.db.query(Game).order_by(desc(Game.id)).limit(limit).all()
+    async def find_by_id(self, game_id: int) -> Game:
+        return await self.db.get_one(Game, game_id)
+
+    async def get_games_by_limit(self, limit: int) -> List[Game]:
+        result = await self.db.scalars(
+            select(Game).order_by(desc(Game.id)).limit(limit)
+        )
+        return list(result.all())
 
     # def get_all_games(self) -> List[Game]:
     #     return self.db.query(Game).all()
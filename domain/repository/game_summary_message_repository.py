@@ -0,0 +1,13 @@
+from typing import Optional
+
+from domain.entity.game_summary_message import GameSummaryMessage
+from domain.repository.base_repository import BaseRepository
+
+
+class GameSummaryMessageRepository(BaseRepository):
+    def __init__(self, db):
+        super().__init__(db)
+        self.model = GameSummaryMessage
+
+    async def find(self, game_id: int, chat_id: int) -> Optional[GameSummaryMessage]:
+        return await self.db.get(GameSummaryMessage, (game_id, chat_id))
@@ -1,9 +1,13 @@
-from typing import List
+from typing import List, Optional, Tuple
 
 from domain.entity.player_action import PlayerAction
 from domain.repository.base_repository import BaseRepository
+from domain.repository.game_ledger_repository import GameLedgerRepository
+from domain.repository.player_stats_rollup_repository import (
+    PlayerStatsRollupRepository,
+)
 from sqlalchemy.orm import aliased
-from sqlalchemy import or_, func
+from sqlalchemy import or_, func, select
 from domain.model.user_info_entity import UserInfoEntity
 
 
@@ -12,60 +16,45 @@ class PlayerActionRepository(BaseRepository):
         super().__init__(db)
         self.model = PlayerAction
 
-    def find_actions_by_game(self, game_id) -> List[PlayerAction]:
-        return (
-            self.db.query(PlayerAction)
-            .filter(
+    async def record_action(self, action: PlayerAction) -> None:
+        """Сохраняет действие и обновляет леджер игры и статистику игрока
+        в той же транзакции."""
+        # Игра засчитывается игроку по первому любому его действию в ней
+        new_game = not await self.user_has_actions_in_game(
+            action.user_id, action.game_id
+        )
+        await self.save(action)
+        await GameLedgerRepository(self.db).apply_action(action)
+        await PlayerStatsRollupRepository(self.db).apply_action(action, new_game)
+
+    async def find_actions_by_game(self, game_id) -> List[PlayerAction]:
+        result = await self.db.scalars(
+            select(PlayerAction).filter(
                 PlayerAction.game_id == game_id,
                 or_(PlayerAction.action == "buyin", PlayerAction.action == "quit"),
             )
-            .all()
-        )
-
-    def user_has_actions_in_game(self, user_id: int, game_id: int) -> bool:
-        return (
-            self.db.query(self.model)
-            .filter_by(user_id=user_id, game_id=game_id)
-            .limit(1)
-            .first()
-            is not None
-        )
-
-    def count_distinct_games_by_user(self, user_id: int) -> int:
-        return (
-            self.db.query(func.count(func.distinct(self.model.game_id)))
-            .filter_by(user_id=user_id)
-            .scalar()
-            or 0
         )
+        return list(result.all())
 
-    def get_total_buyin_amount(self, user_id: int) -> float:
-        return (
-            self.db.query(func.coalesce(func.sum(self.model.amount), 0))
-            .filter_by(user_id=user_id, action="buyin")
-            .scalar()
-            or 0
+    async def find_last_actions(self, limit: int) -> List[PlayerAction]:
+        result = await self.db.scalars(
+            select(PlayerAction).order_by(PlayerAction.timestamp.desc()).limit(limit)
         )
+        return list(result.all())
 
-    def get_total_quit_amount(self, user_id: int) -> float:
+    async def user_has_actions_in_game(self, user_id: int, game_id: int) -> bool:
         return (
-            self.db.query(func.coalesce(func.sum(self.model.amount), 0))
-            .filter_by(user_id=user_id, action="quit")
-            .scalar()
-            or 0
-        )
-
-    def get_buyin_count(self, user_id: int) -> int:
-        return (
-            self.db.query(func.count(self.model.id))
-            .filter_by(user_id=user_id, action="buyin")
-            .scalar()
-            or 0
+            await self.db.scalar(
+                select(self.model.id)
+                .filter_by(user_id=user_id, game_id=game_id)
+                .limit(1)
+            )
+            is not None
         )
 
-    def get_distinct_users(self) -> list[UserInfoEntity]:
+    async def get_distinct_users(self) -> list[UserInfoEntity]:
         subquery = (
-            self.db.query(
+            select(
                 PlayerAction.user_id,
                 func.max(PlayerAction.timestamp).label("latest_time"),
             )
@@ -76,21 +65,39 @@ class PlayerActionRepository(BaseRepository):
         # Присоединяем к подзапросу полную таблицу
         alias_action = aliased(PlayerAction)
         rows = (
-            self.db.query(alias_action.user_id, alias_action.username)
-            .join(
-                subquery,
-                (alias_action.user_id == subquery.c.user_id)
-                & (alias_action.timestamp == subquery.c.latest_time),
+            await self.db.execute(
+                select(alias_action.user_id, alias_action.username).join(
+                    subquery,
+                    (alias_action.user_id == subquery.c.user_id)
+                    & (alias_action.timestamp == subquery.c.latest_time),
+                )
             )
-            .all()
-        )
+        ).all()
 
         return [UserInfoEntity(user_id=row[0], username=row[1]) for row in rows]
 
-    def get_all_user_actions(self, user_id: int) -> List[PlayerAction]:
-        return (
-            self.db.query(self.model)
-            .filter_by(user_id=user_id)
-            .order_by(self.model.timestamp.asc())
-            .all()
+    async def get_all_user_actions(
+        self, user_id: int, after_id: Optional[int] = None
+    ) -> List[PlayerAction]:
+        """Actions of the user in the order they were recorded; with ``after_id``
+        only the ones recorded after it, so a delta always follows the earlier
+        list even if an action was recorded with an older timestamp."""
+        query = (
+            select(self.model).filter_by(user_id=user_id).order_by(self.model.id.asc())
         )
+        if after_id is not None:
+            query = query.where(self.model.id > after_id)
+        result = await self.db.scalars(query)
+        return list(result.all())
+
+    async def get_user_actions_version(self, user_id: int) -> Tuple[int, int]:
+        """Returns (last action id, number of actions) of the user."""
+        row = (
+            await self.db.execute(
+                select(
+                    func.coalesce(func.max(PlayerAction.id), 0),
+                    func.count(PlayerAction.id),
+                ).where(PlayerAction.user_id == user_id)
+            )
+        ).one()
+        return row[0], row[1]
@@ -1,32 +1,160 @@
-from typing import Optional, TYPE_CHECKING
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from domain.scheme.player_data import PlayerData
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from cachetools import LRUCache
+from sqlalchemy import event, func, or_, select
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from config import PLAYER_CACHE_SIZE
 from domain.entity.player import Player
 from domain.repository.base_repository import BaseRepository
 
+# Записи, изменённые в транзакции, попадают в кэш только после её коммита
+_PENDING_KEY = "player_cache_pending"
+
+
+class CachedPlayer(NamedTuple):
+    id: int
+    username: Optional[str]
+    name: Optional[str]
+
 
 class PlayerRepository(BaseRepository):
-    def find_by_telegram_id(self, telegram_id: int) -> Optional[Player]:
-        return self.db.scalar(select(Player).where(Player.telegram_id == telegram_id))
-
-    def get_or_create(self, player_data: "PlayerData") -> Player:
-        player = self.find_by_telegram_id(player_data.telegram_id)
-        if not player:
-            player = Player(
-                telegram_id=player_data.telegram_id,
-                username=player_data.username,
-                name=player_data.name,
-            )
-
-        # Update fields if changed and provided
-        if player_data.username and player.username != player_data.username:
-            player.username = player_data.username
-        if player_data.name and player.name != player_data.name:
-            player.name = player_data.name
-
-        self.save(player)
+    # telegram_id -> закоммиченные id, username и name игрока
+    _cache: LRUCache = LRUCache(maxsize=PLAYER_CACHE_SIZE)
+    cache_hits = 0
+    cache_misses = 0
+    writes = 0
+    writes_skipped = 0
+
+    async def find_by_telegram_id(self, telegram_id: int) -> Optional[Player]:
+        return await self.db.scalar(
+            select(Player).where(Player.telegram_id == telegram_id)
+        )
+
+    async def find_by_telegram_ids(self, telegram_ids: List[int]) -> List[Player]:
+        result = await self.db.scalars(
+            select(Player).where(Player.telegram_id.in_(telegram_ids))
+        )
+        return list(result.all())
+
+    async def get_or_create(self, player_data: "PlayerData") -> Player:
+        """Returns the player, writing only when the provided fields changed.
+
+        A cached player whose username and name are unchanged costs no query.
+        """
+        cached = PlayerRepository._cache.get(player_data.telegram_id)
+        if cached is not None:
+            PlayerRepository.cache_hits += 1
+            if not self._is_changed(cached, player_data):
+                PlayerRepository.writes_skipped += 1
+                return await self._attach(player_data.telegram_id, cached)
+        else:
+            PlayerRepository.cache_misses += 1
+            player = await self.find_by_telegram_id(player_data.telegram_id)
+            if player is not None:
+                cached = self._remember(player, committed=True)
+                if not self._is_changed(cached, player_data):
+                    PlayerRepository.writes_skipped += 1
+                    return player
+
+        player = await self.upsert(player_data)
+        if player is None:
+            # Строку уже изменили до нас, но значения совпадают с нашими
+            PlayerRepository.writes_skipped += 1
+            player = await self.find_by_telegram_id(player_data.telegram_id)
+        else:
+            PlayerRepository.writes += 1
+        self._remember(player, committed=False)
         return player
+
+    async def upsert(self, player_data: "PlayerData") -> Optional[Player]:
+        """Creates the player or updates the provided fields in one statement.
+
+        The conflict branch applies only when a field actually changes;
+        returns None when the stored player already matches.
+        """
+        query = self.insert_statement(Player).values(
+            telegram_id=player_data.telegram_id,
+            username=player_data.username,
+            name=player_data.name,
+            updated_at=datetime.now(timezone.utc),
+        )
+        username = func.coalesce(query.excluded.username, Player.username)
+        name = func.coalesce(query.excluded.name, Player.name)
+        query = query.on_conflict_do_update(
+            index_elements=[Player.telegram_id],
+            set_={
+                "username": username,
+                "name": name,
+                "updated_at": query.excluded.updated_at,
+            },
+            where=or_(
+                username.is_distinct_from(Player.username),
+                name.is_distinct_from(Player.name),
+            ),
+        ).returning(Player)
+        return await self.db.scalar(
+            query, execution_options={"populate_existing": True}
+        )
+
+    @staticmethod
+    def _is_changed(cached: CachedPlayer, player_data: "PlayerData") -> bool:
+        return bool(
+            (player_data.username and player_data.username != cached.username)
+            or (player_data.name and player_data.name != cached.name)
+        )
+
+    async def _attach(self, telegram_id: int, cached: CachedPlayer) -> Player:
+        """Puts the cached player into the session without loading it."""
+        player = Player(
+            id=cached.id,
+            telegram_id=telegram_id,
+            username=cached.username,
+            name=cached.name,
+        )
+        make_transient_to_detached(player)
+        return await self.db.merge(player, load=False)
+
+    def _remember(self, player: Player, committed: bool) -> CachedPlayer:
+        cached = CachedPlayer(player.id, player.username, player.name)
+        if committed:
+            PlayerRepository._cache[player.telegram_id] = cached
+        else:
+            self.db.info.setdefault(_PENDING_KEY, {})[player.telegram_id] = cached
+        return cached
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Drops the cached players, e.g. when switching to another database."""
+        PlayerRepository._cache.clear()
+
+    @staticmethod
+    def get_cache_stats() -> dict:
+        lookups = PlayerRepository.cache_hits + PlayerRepository.cache_misses
+        return {
+            "hits": PlayerRepository.cache_hits,
+            "misses": PlayerRepository.cache_misses,
+            "hit_rate": (
+                round(PlayerRepository.cache_hits / lookups, 3) if lookups else 0.0
+            ),
+            "writes": PlayerRepository.writes,
+            "writes_skipped": PlayerRepository.writes_skipped,
+            "size": len(PlayerRepository._cache),
+        }
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_cached_players(session: Session) -> None:
+    if session.in_nested_transaction():
+        return  # savepoint: the outer transaction may still roll back
+    pending: Dict[int, CachedPlayer] = session.info.pop(_PENDING_KEY, {})
+    PlayerRepository._cache.update(pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_cached_players(session: Session, previous_transaction) -> None:
+    # Откат и точки сохранения тоже: лишний промах кэша дешевле неверного id
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,304 @@
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import pytz
+from sqlalchemy import String, and_, case, cast, delete, func, insert, or_, select
+
+from config import TIMEZONE
+from domain.entity.player_action import PlayerAction
+from domain.entity.player_stats_rollup import PlayerStatsRollup
+from domain.repository.base_repository import BaseRepository
+
+ROLLUP_ACTIONS = ("buyin", "quit")
+PERIODS = ("day", "month")
+
+# Поля, по которым можно сортировать таблицу лидеров
+LEADERBOARD_SORT_FIELDS = (
+    "username",
+    "games_played",
+    "total_buyin",
+    "avg_buyins_per_game",
+    "profit",
+    "roi",
+)
+
+
+def bucket_dates(timestamp: datetime) -> Tuple[date, date]:
+    """Returns the (day, month) buckets of a timestamp in the configured timezone."""
+    if timestamp.tzinfo is None:
+        timestamp = pytz.utc.localize(timestamp)
+    day = timestamp.astimezone(pytz.timezone(TIMEZONE)).date()
+    return day, day.replace(day=1)
+
+
+def rollup_deltas(action: str, amount: Optional[float], new_game: bool) -> dict:
+    is_buyin = action == "buyin"
+    is_quit = action == "quit"
+    return {
+        "games": 1 if new_game else 0,
+        "buyin_count": 1 if is_buyin else 0,
+        "buyin_amount": (amount or 0.0) if is_buyin else 0.0,
+        "quit_amount": (amount or 0.0) if is_quit else 0.0,
+    }
+
+
+def build_rollups(actions: Iterable) -> List[dict]:
+    """Aggregates (game_id, user_id, action, amount, timestamp) rows, ordered by
+    time, into rollup rows. A game is counted in the bucket of the first action
+    of the player in it, whatever the action (as /mystats always counted)."""
+    rollups = {}
+    games_seen = set()
+    for game_id, user_id, action, amount, timestamp in actions:
+        new_game = (game_id, user_id) not in games_seen
+        if new_game:
+            games_seen.add((game_id, user_id))
+        elif action not in ROLLUP_ACTIONS:
+            continue
+
+        deltas = rollup_deltas(action, amount, new_game)
+        for period, bucket in zip(PERIODS, bucket_dates(timestamp)):
+            row = rollups.setdefault(
+                (user_id, period, bucket),
+                {
+                    "user_id": user_id,
+                    "period": period,
+                    "bucket": bucket,
+                    **dict.fromkeys(deltas, 0),
+                },
+            )
+            for name, value in deltas.items():
+                row[name] += value
+    return list(rollups.values())
+
+
+def rollup_source_query():
+    return select(
+        PlayerAction.game_id,
+        PlayerAction.user_id,
+        PlayerAction.action,
+        PlayerAction.amount,
+        PlayerAction.timestamp,
+    ).order_by(PlayerAction.timestamp, PlayerAction.id)
+
+
+def _next_month(bucket: date) -> date:
+    return (bucket.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+class PlayerStatsRollupRepository(BaseRepository):
+    """Daily and monthly player statistics, updated with every buy-in and quit."""
+
+    async def apply_action(self, action: PlayerAction, new_game: bool) -> None:
+        """Adds the action to the user's buckets; ``new_game`` is True for the
+        first action of the user in the game."""
+        if action.action not in ROLLUP_ACTIONS and not new_game:
+            return
+
+        deltas = rollup_deltas(action.action, action.amount, new_game)
+        for period, bucket in zip(PERIODS, bucket_dates(action.timestamp)):
+            await self.upsert_increment(
+                PlayerStatsRollup,
+                {"user_id": action.user_id, "period": period, "bucket": bucket},
+                deltas,
+            )
+
+    async def get_totals(
+        self,
+        user_id: int,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> Tuple[int, int, float, float]:
+        """Returns (games, buy-in count, buy-in amount, quit amount) of a user."""
+        row = (
+            await self.db.execute(
+                select(
+                    func.coalesce(func.sum(PlayerStatsRollup.games), 0),
+                    func.coalesce(func.sum(PlayerStatsRollup.buyin_count), 0),
+                    func.coalesce(func.sum(PlayerStatsRollup.buyin_amount), 0),
+                    func.coalesce(func.sum(PlayerStatsRollup.quit_amount), 0),
+                ).where(
+                    PlayerStatsRollup.user_id == user_id,
+                    self._bucket_conditions(date_from, date_to),
+                )
+            )
+        ).one()
+        return row[0], row[1], row[2], row[3]
+
+    async def get_leaderboard(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        min_games: int = 0,
+        exclude_user_ids: Sequence[int] = (),
+        sort: str = "roi",
+        descending: bool = True,
+    ) -> List[Tuple[int, Optional[str], int, int, float, float]]:
+        """Totals of every user in one grouped query over the rollup buckets.
+
+        Returns (user_id, username, games, buy-in count, buy-in amount, quit
+        amount) rows ordered by one of LEADERBOARD_SORT_FIELDS. The username
+        is the latest one the user played under.
+        """
+        games = func.sum(PlayerStatsRollup.games)
+        buyin_count = func.sum(PlayerStatsRollup.buyin_count)
+        buyin = func.sum(PlayerStatsRollup.buyin_amount)
+        quit_amount = func.sum(PlayerStatsRollup.quit_amount)
+        username = (
+            select(PlayerAction.username)
+            .where(PlayerAction.user_id == PlayerStatsRollup.user_id)
+            .order_by(PlayerAction.timestamp.desc(), PlayerAction.id.desc())
+            .limit(1)
+            .correlate(PlayerStatsRollup)
+            .scalar_subquery()
+        )
+        sort_columns = {
+            "username": func.lower(
+                func.coalesce(username, cast(PlayerStatsRollup.user_id, String))
+            ),
+            "games_played": games,
+            "total_buyin": buyin,
+            "avg_buyins_per_game": case(
+                (games > 0, buyin_count * 1.0 / games), else_=0.0
+            ),
+            "profit": quit_amount - buyin,
+            "roi": case((buyin > 0, (quit_amount - buyin) * 100.0 / buyin), else_=0.0),
+        }
+        order = sort_columns[sort]
+
+        query = (
+            select(
+                PlayerStatsRollup.user_id,
+                username,
+                games,
+                buyin_count,
+                buyin,
+                quit_amount,
+            )
+            .where(self._bucket_conditions(date_from, date_to))
+            .group_by(PlayerStatsRollup.user_id)
+            .order_by(
+                order.desc() if descending else order.asc(), PlayerStatsRollup.user_id
+            )
+        )
+        if exclude_user_ids:
+            query = query.where(PlayerStatsRollup.user_id.not_in(exclude_user_ids))
+        if min_games:
+            query = query.having(games >= min_games)
+        return [tuple(row) for row in await self.db.execute(query)]
+
+    async def get_roi_history(
+        self,
+        user_id: int,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> List[Tuple[date, float]]:
+        """Cumulative ROI (%) of a user at the end of every day with actions.
+
+        Running totals are window sums over the daily buckets of the whole
+        history, so the ROI of a day inside the range still counts the
+        games before ``date_from``.
+        """
+        by_day = PlayerStatsRollup.bucket
+        buyin = func.sum(PlayerStatsRollup.buyin_amount).over(order_by=by_day)
+        quit_amount = func.sum(PlayerStatsRollup.quit_amount).over(order_by=by_day)
+        days = (
+            select(
+                PlayerStatsRollup.bucket,
+                case(
+                    (buyin > 0, (quit_amount - buyin) * 100.0 / buyin), else_=0.0
+                ).label("roi"),
+            )
+            .where(
+                PlayerStatsRollup.user_id == user_id,
+                PlayerStatsRollup.period == "day",
+            )
+            .subquery()
+        )
+        query = select(days.c.bucket, days.c.roi).order_by(days.c.bucket)
+        if date_from:
+            query = query.where(days.c.bucket >= date_from)
+        if date_to:
+            query = query.where(days.c.bucket <= date_to)
+        return [(bucket, roi) for bucket, roi in await self.db.execute(query)]
+
+    async def get_user_version(self, user_id: int) -> Tuple:
+        """Cheap fingerprint of a user's statistics; changes with every buy-in
+        and quit of the user and every game the user joins."""
+        row = (
+            await self.db.execute(
+                select(
+                    func.count(),
+                    func.sum(PlayerStatsRollup.games),
+                    func.sum(PlayerStatsRollup.buyin_count),
+                    func.sum(PlayerStatsRollup.buyin_amount),
+                    func.sum(PlayerStatsRollup.quit_amount),
+                ).where(
+                    PlayerStatsRollup.user_id == user_id,
+                    PlayerStatsRollup.period == "day",
+                )
+            )
+        ).one()
+        return tuple(row)
+
+    async def get_version(self) -> Tuple:
+        """Cheap fingerprint of the statistics of all users.
+
+        The monthly rows change with every buy-in and quit; the last action
+        id also catches a new username shown on the leaderboard.
+        """
+        last_action = select(func.max(PlayerAction.id)).scalar_subquery()
+        row = (
+            await self.db.execute(
+                select(
+                    func.count(),
+                    func.sum(PlayerStatsRollup.games),
+                    func.sum(PlayerStatsRollup.buyin_count),
+                    func.sum(PlayerStatsRollup.buyin_amount),
+                    func.sum(PlayerStatsRollup.quit_amount),
+                    last_action,
+                ).where(PlayerStatsRollup.period == "month")
+            )
+        ).one()
+        return tuple(row)
+
+    def _bucket_conditions(
+        self, date_from: Optional[date] = None, date_to: Optional[date] = None
+    ):
+        """Selects the buckets covering the range (dates inclusive).
+
+        Whole months of the range are read from monthly buckets, the partial
+        months at its edges from daily ones: at most ~60 daily rows plus one
+        row per whole month, however many actions the user has.
+        """
+        end = date_to + timedelta(days=1) if date_to else None
+        months_from = date_from
+        if date_from and date_from.day != 1:
+            months_from = _next_month(date_from)
+        months_to = end.replace(day=1) if end else None
+
+        if months_from and months_to and months_from >= months_to:
+            return self._range("day", date_from, end)
+
+        conditions = [self._range("month", months_from, months_to)]
+        if date_from and months_from != date_from:
+            conditions.append(self._range("day", date_from, months_from))
+        if end and months_to != end:
+            conditions.append(self._range("day", months_to, end))
+        return or_(*conditions)
+
+    @staticmethod
+    def _range(period: str, start: Optional[date], end: Optional[date]):
+        condition = [PlayerStatsRollup.period == period]
+        if start:
+            condition.append(PlayerStatsRollup.bucket >= start)
+        if end:
+            condition.append(PlayerStatsRollup.bucket < end)
+        return and_(*condition)
+
+    async def rebuild(self) -> None:
+        """Recomputes all rollups from raw player actions."""
+        await self.db.execute(delete(PlayerStatsRollup))
+        actions = await self.db.execute(rollup_source_query())
+        rollups = build_rollups(actions)
+        if rollups:
+            await self.db.execute(insert(PlayerStatsRollup), rollups)
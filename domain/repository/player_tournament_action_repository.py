@@ -1,96 +1,269 @@
-from sqlalchemy import select, and_, func
-from datetime import datetime
+from sqlalchemy import (
+    select,
+    and_,
+    or_,
+    case,
+    func,
+    bindparam,
+    delete,
+    insert,
+    literal,
+    update,
+)
+from sqlalchemy.orm import aliased, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from datetime import datetime, timezone
 
+from domain.entity.player import Player
+from domain.entity.tournament import Tournament
 from domain.entity.player_tournament_action import (
     PlayerTournamentAction,
 )
 from domain.repository.base_repository import BaseRepository
-from typing import Optional, List
+from typing import Iterable, Optional, List, Sequence, Tuple
 
 
 class PlayerTournamentActionRepository(BaseRepository):
-    def register_player(
-        self, tournament_id: int, player_id: int
+    async def register_player(
+        self, tournament_id: int, player: Player
     ) -> PlayerTournamentAction:
         action = PlayerTournamentAction(
             tournament_id=tournament_id,
-            player_id=player_id,
+            player=player,
         )
-        self.save(action)
+        await self.save(action)
         return action
 
-    def eliminate_player(
+    async def register_in_open_tournament(
+        self, player: Player
+    ) -> Optional[PlayerTournamentAction]:
+        """Registers the player in the active tournament with one INSERT.
+
+        Returns None when there is no active tournament open for registration
+        or the player has already joined it: the unique
+        (tournament_id, player_id) index turns a repeated join into a no-op.
+        """
+        open_tournament = (
+            select(
+                Tournament.id,
+                literal(player.id),
+                literal(datetime.now(timezone.utc), Tournament.created_at.type),
+            )
+            .where(
+                Tournament.end_time.is_(None),
+                or_(Tournament.start_time.is_(None), Tournament.is_shuffled.is_(False)),
+            )
+            .limit(1)
+        )
+        query = (
+            self.insert_statement(PlayerTournamentAction)
+            .from_select(["tournament_id", "player_id", "created_at"], open_tournament)
+            .on_conflict_do_nothing(index_elements=["tournament_id", "player_id"])
+            .returning(PlayerTournamentAction)
+        )
+        action = await self.db.scalar(query)
+        if action is not None:
+            set_committed_value(action, "player", player)
+        return action
+
+    async def eliminate_player(
         self,
         tournament_id: int,
         player_id: int,
-        rank: int,
         duration_seconds: int,
         ended_at: datetime,
-    ) -> PlayerTournamentAction:
-        action = self.find_action(tournament_id, player_id)
-        if action:
-            action.rank = rank
-            action.duration_seconds = duration_seconds
-            action.ended_at = ended_at
-            self.save(action)
-        return action
+    ) -> Optional[PlayerTournamentAction]:
+        """Eliminates a player who is still in the game with one UPDATE.
 
-    def update_table_and_position_assignment(
+        The rank is the number of players still in the game, counted by the
+        same statement. Returns None when the player is not in the tournament
+        or has already been eliminated.
+        """
+        actions = await self.eliminate_players(
+            tournament_id, [player_id], duration_seconds, ended_at
+        )
+        return actions[0] if actions else None
+
+    async def eliminate_players(
+        self,
+        tournament_id: int,
+        player_ids: Sequence[int],
+        duration_seconds: int,
+        ended_at: datetime,
+        tied: bool = False,
+    ) -> List[PlayerTournamentAction]:
+        """Eliminates several players busted in one hand with one UPDATE.
+
+        ``player_ids`` go from the lowest place to the highest: with 10
+        players left, eliminating [a, b] gives a rank 10 and b rank 9. With
+        ``tied`` both share the higher place (9). Players already eliminated
+        are skipped. Returns the updated actions from the lowest place up.
+        """
+        player_ids = list(dict.fromkeys(player_ids))
+        if not player_ids:
+            return []
+
+        action = PlayerTournamentAction
+        other = aliased(PlayerTournamentAction)
+        players_left = (
+            select(func.count(other.id))
+            .where(other.tournament_id == tournament_id, other.rank.is_(None))
+            .scalar_subquery()
+        )
+        if tied:
+            # Все выбывшие в раздаче делят лучшее из их мест
+            new_rank = players_left - func.count().over() + 1
+        else:
+            order = {player_id: index for index, player_id in enumerate(player_ids)}
+            new_rank = (
+                players_left
+                + 1
+                - func.row_number().over(order_by=case(order, value=action.player_id))
+            )
+        # Места считаются один раз до изменения строк: SQLite иначе видит
+        # уже обновлённые строки того же UPDATE
+        ranks = (
+            select(action.player_id, new_rank.label("rank"))
+            .where(
+                action.tournament_id == tournament_id,
+                action.player_id.in_(player_ids),
+                action.rank.is_(None),
+            )
+            .cte("busted_ranks")
+            .prefix_with("MATERIALIZED")
+        )
+
+        query = (
+            update(action)
+            .where(
+                action.tournament_id == tournament_id,
+                action.player_id.in_(select(ranks.c.player_id)),
+            )
+            .values(
+                rank=select(ranks.c.rank)
+                .where(ranks.c.player_id == action.player_id)
+                .scalar_subquery(),
+                duration_seconds=duration_seconds,
+                ended_at=ended_at,
+            )
+            .returning(action)
+            # RETURNING нельзя соединить с players: игроки приходят вторым SELECT
+            .options(selectinload(action.player))
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        actions = (await self.db.scalars(query)).all()
+        return sorted(actions, key=lambda a: a.rank or 0, reverse=True)
+
+    async def register_players(
+        self, tournament_id: int, players: Iterable[Player]
+    ) -> None:
+        """Registers several players with a single multi-row INSERT."""
+        rows = [
+            {"tournament_id": tournament_id, "player_id": player.id}
+            for player in players
+        ]
+        if rows:
+            await self.db.execute(insert(PlayerTournamentAction), rows)
+
+    async def assign_seats(
+        self, tournament_id: int, assignments: Iterable[Tuple[int, int, int]]
+    ) -> None:
+        """Bulk-updates seats from (player_id, table_number, position_number)."""
+        rows = [
+            {
+                "b_tournament_id": tournament_id,
+                "b_player_id": player_id,
+                "b_table_number": table_number,
+                "b_position_number": position_number,
+            }
+            for player_id, table_number, position_number in assignments
+        ]
+        if not rows:
+            return
+
+        table = PlayerTournamentAction.__table__
+        query = (
+            update(table)
+            .where(
+                and_(
+                    table.c.tournament_id == bindparam("b_tournament_id"),
+                    table.c.player_id == bindparam("b_player_id"),
+                )
+            )
+            .values(
+                table_number=bindparam("b_table_number"),
+                position_number=bindparam("b_position_number"),
+            )
+        )
+        await self.db.execute(query, rows)
+
+    async def update_table_and_position_assignment(
         self,
         tournament_id: int,
         player_id: int,
         table_number: int,
         position_number: int,
     ) -> None:
-        action = self.find_action(tournament_id, player_id)
+        action = await self.find_action(tournament_id, player_id, with_player=False)
         if action:
             action.table_number = table_number
             action.position_number = position_number
-            self.save(action)
+            await self.save(action)
 
-    def find_action(
-        self, tournament_id: int, player_id: int
+    async def find_action(
+        self, tournament_id: int, player_id: int, with_player: bool = True
     ) -> Optional[PlayerTournamentAction]:
+        """The registration of the player; ``with_player`` joins the player row."""
         query = select(PlayerTournamentAction).where(
             and_(
                 PlayerTournamentAction.tournament_id == tournament_id,
                 PlayerTournamentAction.player_id == player_id,
             )
         )
-        return self.db.scalar(query)
+        if with_player:
+            query = query.options(
+                joinedload(PlayerTournamentAction.player, innerjoin=True)
+            )
+        return await self.db.scalar(query)
 
-    def count_total_players(self, tournament_id: int) -> int:
+    async def count_total_players(self, tournament_id: int) -> int:
         query = select(func.count(PlayerTournamentAction.id)).where(
             PlayerTournamentAction.tournament_id == tournament_id
         )
-        return self.db.scalar(query) or 0
+        return await self.db.scalar(query) or 0
 
-    def count_eliminated_players(self, tournament_id: int) -> int:
+    async def count_eliminated_players(self, tournament_id: int) -> int:
         query = select(func.count(PlayerTournamentAction.id)).where(
             and_(
                 PlayerTournamentAction.tournament_id == tournament_id,
                 PlayerTournamentAction.rank.is_not(None),
             )
         )
-        return self.db.scalar(query) or 0
+        return await self.db.scalar(query) or 0
+
+    async def has_player_joined(self, tournament_id: int, player_id: int) -> bool:
+        return await self._find_rank(tournament_id, player_id) is not None
 
-    def has_player_joined(self, tournament_id: int, player_id: int) -> bool:
-        return self.find_action(tournament_id, player_id) is not None
+    async def is_player_eliminated(self, tournament_id: int, player_id: int) -> bool:
+        found = await self._find_rank(tournament_id, player_id)
+        return found is not None and found.rank is not None
 
-    def is_player_eliminated(self, tournament_id: int, player_id: int) -> bool:
-        action = self.find_action(tournament_id, player_id)
-        return action is not None and action.rank is not None
+    async def _find_rank(self, tournament_id: int, player_id: int):
+        """The (rank,) row of the registration without loading the entities."""
+        query = select(PlayerTournamentAction.rank).where(
+            PlayerTournamentAction.tournament_id == tournament_id,
+            PlayerTournamentAction.player_id == player_id,
+        )
+        return (await self.db.execute(query)).first()
 
-    def get_active_players(self, tournament_id: int) -> List[str]:
-        players = self.find_active_player_entities(tournament_id)
+    async def get_active_players(self, tournament_id: int) -> List[str]:
+        players = await self.find_active_player_entities(tournament_id)
         return [
             f"<b>{p.get_name()}</b> (@{p.get_user_name()}) /kick_player_{p.get_telegram_id()}"
             for p in players
         ]
 
-    def find_active_player_entities(self, tournament_id: int) -> List["Player"]:
-        from domain.entity.player import Player
-
+    async def find_active_player_entities(self, tournament_id: int) -> List[Player]:
         # Get players who are in the tournament but have no rank (not eliminated)
         query = (
             select(Player)
@@ -103,22 +276,34 @@ class PlayerTournamentActionRepository(BaseRepository):
             )
         )
 
-        return list(self.db.scalars(query).all())
+        return list((await self.db.scalars(query)).all())
 
-    def find_actions_by_tournament_id(
+    async def find_actions_by_tournament_id(
         self, tournament_id: int
     ) -> List[PlayerTournamentAction]:
+        # Игроки приходят в том же SELECT: ленивая загрузка отключена
         query = (
             select(PlayerTournamentAction)
             .where(PlayerTournamentAction.tournament_id == tournament_id)
             .order_by(PlayerTournamentAction.created_at.asc())
+            .options(joinedload(PlayerTournamentAction.player, innerjoin=True))
         )
-        return list(self.db.scalars(query).all())
+        return list((await self.db.scalars(query)).all())
 
-    def unregister_player(self, action: PlayerTournamentAction):
-        self.delete(action)
+    async def unregister_player(self, action: PlayerTournamentAction):
+        await self.delete(action)
+
+    async def unregister_player_by_id(self, tournament_id: int, player_id: int) -> bool:
+        """Removes a registration with one DELETE; False when there was none."""
+        result = await self.db.execute(
+            delete(PlayerTournamentAction).where(
+                PlayerTournamentAction.tournament_id == tournament_id,
+                PlayerTournamentAction.player_id == player_id,
+            )
+        )
+        return result.rowcount > 0
 
-    def get_winners(self, tournament_id: int) -> List[PlayerTournamentAction]:
+    async def get_winners(self, tournament_id: int) -> List[PlayerTournamentAction]:
         query = (
             select(PlayerTournamentAction)
             .where(
@@ -129,5 +314,6 @@ class PlayerTournamentActionRepository(BaseRepository):
                 )
             )
             .order_by(PlayerTournamentAction.rank.asc())
+            .options(joinedload(PlayerTournamentAction.player, innerjoin=True))
         )
-        return list(self.db.scalars(query).all())
+        return list((await self.db.scalars(query)).all())
@@ -1,15 +1,116 @@
-from typing import List
+from typing import List, Optional, Tuple
 
+from sqlalchemy import JSON, case, func, select, true
+from sqlalchemy.orm import aliased
+
+from domain.entity.player import Player
+from domain.entity.player_tournament_action import PlayerTournamentAction
 from domain.entity.tournament import Tournament
+from domain.model.tournament_list_item import TournamentListItem
 from domain.repository.base_repository import BaseRepository
 
 
 class TournamentRepository(BaseRepository):
-    def find_active_tournament(self) -> Tournament:
-        return self.db.query(Tournament).filter_by(end_time=None).first()
+    async def find_active_tournament(self) -> Tournament:
+        return await self.db.scalar(
+            select(Tournament).filter_by(end_time=None).limit(1)
+        )
+
+    async def find_latest_tournament(self) -> Tournament:
+        return await self.db.scalar(
+            select(Tournament).order_by(Tournament.id.desc()).limit(1)
+        )
+
+    async def find_by_id(self, tournament_id: int) -> Tournament | None:
+        return await self.db.get(Tournament, tournament_id)
+
+    async def get_all_tournaments(self) -> List[Tournament]:
+        result = await self.db.scalars(
+            select(Tournament).order_by(Tournament.id.desc())
+        )
+        return list(result.all())
+
+    async def find_tournament_list_page(
+        self, limit: Optional[int] = None, before_id: Optional[int] = None
+    ) -> List[TournamentListItem]:
+        """Newest tournaments first, with participant counts and top-3 winners.
+
+        One grouped statement: participants are counted over a join and the
+        winners come from a correlated subquery aggregated into a JSON array
+        of ``[rank, name]`` pairs. Keyset pagination: pass the id of the last
+        tournament of the previous page as ``before_id``.
+        """
+        participant = aliased(PlayerTournamentAction)
+        winner = aliased(PlayerTournamentAction)
+        winners = (
+            select(
+                self._json_array_agg(
+                    winner.rank,
+                    func.coalesce(func.nullif(Player.name, ""), Player.username),
+                )
+            )
+            .join(Player, Player.id == winner.player_id)
+            .where(
+                winner.tournament_id == Tournament.id,
+                winner.rank.is_not(None),
+                winner.rank <= 3,
+            )
+            .correlate(Tournament)
+            .scalar_subquery()
+        )
+        query = (
+            select(Tournament, func.count(participant.id), winners)
+            .outerjoin(participant, participant.tournament_id == Tournament.id)
+            .group_by(Tournament.id)
+            .order_by(Tournament.id.desc())
+        )
+        if before_id is not None:
+            query = query.where(Tournament.id < before_id)
+        if limit is not None:
+            query = query.limit(limit)
+
+        return [
+            TournamentListItem(
+                tournament=tournament,
+                total_players=total_players,
+                winners=[
+                    str(name)
+                    for _, name in sorted(ranked or [], key=lambda pair: pair[0])
+                ],
+            )
+            for tournament, total_players, ranked in (await self.db.execute(query))
+        ]
+
+    async def get_list_version(self) -> Tuple:
+        """Cheap fingerprint of what the tournament list shows.
 
-    def find_latest_tournament(self) -> Tournament:
-        return self.db.query(Tournament).order_by(Tournament.id.desc()).first()
+        Changes when a tournament is created, started, shuffled, ended or
+        deleted, when a player joins, leaves, is eliminated or gets another
+        rank, and when a player changes the name shown among the winners.
+        """
+        tournaments = select(
+            func.count(Tournament.id),
+            func.max(Tournament.id),
+            func.count(Tournament.start_time),
+            func.count(Tournament.end_time),
+            func.sum(Tournament.ended_player_id),
+            func.sum(case((Tournament.is_shuffled, 1), else_=0)),
+        ).subquery()
+        actions = select(
+            func.count(PlayerTournamentAction.id),
+            func.max(PlayerTournamentAction.id),
+            func.count(PlayerTournamentAction.rank),
+            # Перестановка мест при том же числе мест меняет эту сумму
+            func.sum(PlayerTournamentAction.rank * PlayerTournamentAction.id),
+        ).subquery()
+        players = select(func.max(Player.updated_at)).subquery()
+        query = select(tournaments, actions, players).select_from(
+            tournaments.join(actions, true()).join(players, true())
+        )
+        return tuple((await self.db.execute(query)).one())
 
-    def get_all_tournaments(self) -> List[Tournament]:
-        return self.db.query(Tournament).order_by(Tournament.id.desc()).all()
+    def _json_array_agg(self, *values):
+        """Aggregates rows into a JSON array of arrays for the session's dialect."""
+        if self.db.bind.dialect.name == "postgresql":
+            return func.json_agg(func.json_build_array(*values), type_=JSON)
+        return func.json_group_array(func.json_array(*values), type_=JSON)
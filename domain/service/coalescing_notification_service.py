@@ -0,0 +1,84 @@
+import asyncio
+import weakref
+from typing import List, Optional
+
+from telegram import Bot
+
+from config import TOURNAMENT_NOTIFICATION_WINDOW
+from domain.service.message_builder import split_message
+from domain.service.notification_public_channel_service import (
+    NotificationPublicChannelService,
+)
+
+EVENT_SEPARATOR = "\n\n"
+
+
+class CoalescingNotificationService:
+    """Wraps a channel notifier: bursts of events (registrations,
+    eliminations) are buffered for ``window`` seconds and sent as one message.
+
+    Immediate notifications flush the buffer first, so the channel sees events
+    in the order they happened.
+    """
+
+    _instances: "weakref.WeakSet[CoalescingNotificationService]" = weakref.WeakSet()
+
+    def __init__(
+        self,
+        notification_service: NotificationPublicChannelService,
+        window: float = TOURNAMENT_NOTIFICATION_WINDOW,
+    ):
+        self._notification_service = notification_service
+        self._window = window
+        self._events: List[str] = []
+        self._bot: Optional[Bot] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self.events_count = 0
+        self.messages_count = 0
+        CoalescingNotificationService._instances.add(self)
+
+    async def notify(self, bot: Bot, message: str) -> None:
+        """Sends a notification right away (after the buffered events)."""
+        await self.flush()
+        await self._send(bot, [message])
+
+    async def notify_blocks(self, bot: Bot, blocks: List[str]) -> None:
+        """Sends blocks (e.g. tables) right away, never splitting a block that fits."""
+        await self.flush()
+        await self._send(bot, blocks)
+
+    async def notify_coalesced(self, bot: Bot, message: str) -> None:
+        """Buffers an event; the buffer is sent when the window closes."""
+        if self._window <= 0:
+            await self._send(bot, [message])
+            return
+
+        self._events.append(message)
+        self._bot = bot
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> None:
+        if self._flush_task is not None:
+            if self._flush_task is not asyncio.current_task():
+                self._flush_task.cancel()
+            self._flush_task = None
+
+        events, self._events = self._events, []
+        if events and self._bot is not None:
+            await self._send(self._bot, events)
+
+    @classmethod
+    async def flush_all(cls) -> None:
+        for service in list(cls._instances):
+            await service.flush()
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._window)
+        await self.flush()
+
+    async def _send(self, bot: Bot, events: List[str]) -> None:
+        self.events_count += len(events)
+        for message in split_message(events, EVENT_SEPARATOR):
+            self.messages_count += 1
+            await self._notification_service.notify(bot, message)
@@ -0,0 +1,55 @@
+"""
+Downsampling of chart series.
+
+``largest_triangle_three_buckets`` (LTTB, Steinarsson 2013) keeps the
+first and the last point and picks one point from each of the buckets in
+between: the one forming the largest triangle with the point chosen in
+the previous bucket and the average of the next bucket. Peaks and dips
+survive, unlike with plain averaging or taking every n-th point.
+"""
+
+from typing import List, Sequence, Tuple
+
+
+def largest_triangle_three_buckets(
+    points: Sequence[Tuple[float, float]], threshold: int
+) -> List[int]:
+    """Returns the indexes of at most ``threshold`` points to keep, in order.
+
+    ``points`` are (x, y) pairs sorted by x. With ``threshold`` below 3 or
+    not below the number of points every index is returned.
+    """
+    count = len(points)
+    if threshold < 3 or threshold >= count:
+        return list(range(count))
+
+    selected = [0]
+    # Первая и последняя точки остаются, остальные делятся на корзины
+    bucket_size = (count - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        # Среднее следующей корзины (для последней — последняя точка)
+        next_start, next_end = end, min(int((bucket + 2) * bucket_size) + 1, count)
+        if bucket == threshold - 3:
+            next_start, next_end = count - 1, count
+        next_size = next_end - next_start
+        avg_x = sum(points[i][0] for i in range(next_start, next_end)) / next_size
+        avg_y = sum(points[i][1] for i in range(next_start, next_end)) / next_size
+
+        prev_x, prev_y = points[previous]
+        best, best_area = start, -1.0
+        for index in range(start, end):
+            x, y = points[index]
+            area = abs(
+                (prev_x - avg_x) * (y - prev_y) - (prev_x - x) * (avg_y - prev_y)
+            )
+            if area > best_area:
+                best, best_area = index, area
+        selected.append(best)
+        previous = best
+
+    selected.append(count - 1)
+    return selected
@@ -0,0 +1,141 @@
+import asyncio
+import contextvars
+import hashlib
+import logging
+from typing import Awaitable, Callable, Dict, Tuple
+
+from telegram import Bot
+from telegram.error import BadRequest, TelegramError
+
+from config import SUMMARY_EDIT_DEBOUNCE
+from domain.entity.game_summary_message import GameSummaryMessage
+from domain.repository.game_summary_message_repository import (
+    GameSummaryMessageRepository,
+)
+from domain.service.outbound_message_queue import PRIORITY_BROADCAST, outbound_queue
+from unit_of_work import ScopedSession, UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+Renderer = Callable[[], Awaitable[str]]
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class LiveGameSummaryService:
+    """Keeps one pinned summary message per game and chat up to date.
+
+    Refresh requests are debounced: the message is re-rendered once the
+    changes of the last ``debounce`` seconds are in, and edited only when the
+    text differs from what was sent. Message ids are stored in the database,
+    so a restarted bot keeps editing the same message.
+    """
+
+    def __init__(self, debounce: float = SUMMARY_EDIT_DEBOUNCE):
+        self._debounce = debounce
+        self._pending: Dict[Tuple[int, int], Tuple[Bot, Renderer]] = {}
+        self._tasks: Dict[Tuple[int, int], asyncio.Task] = {}
+        self._locks: Dict[Tuple[int, int], asyncio.Lock] = {}
+
+    def schedule(self, bot: Bot, game_id: int, chat_id: int, render: Renderer) -> None:
+        """Requests a refresh; ``render`` builds the summary text when it runs."""
+        key = (game_id, chat_id)
+        self._pending[key] = (bot, render)
+        if key not in self._tasks:
+            # Обновление выполняется вне текущего обновления Telegram,
+            # в собственной единице работы
+            self._tasks[key] = asyncio.create_task(
+                self._refresh_later(key), context=contextvars.Context()
+            )
+
+    async def flush_all(self) -> None:
+        for task in list(self._tasks.values()):
+            task.cancel()
+        self._tasks.clear()
+        for key in list(self._pending):
+            await self._run_refresh(key)
+
+    async def _refresh_later(self, key: Tuple[int, int]) -> None:
+        await asyncio.sleep(self._debounce)
+        self._tasks.pop(key, None)
+        await self._run_refresh(key)
+
+    async def _run_refresh(self, key: Tuple[int, int]) -> None:
+        # Одновременно идёт не больше одного обновления сообщения
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            pending = self._pending.pop(key, None)
+            if pending is None:
+                return
+            bot, render = pending
+            try:
+                async with UnitOfWork():
+                    await self.refresh(bot, key[0], key[1], render)
+            except Exception as e:
+                logger.error("Could not refresh the summary of game %s: %s", key[0], e)
+
+    async def refresh(
+        self, bot: Bot, game_id: int, chat_id: int, render: Renderer
+    ) -> None:
+        repository = GameSummaryMessageRepository(ScopedSession())
+        text = await render()
+        text_hash = _text_hash(text)
+
+        summary_message = await repository.find(game_id, chat_id)
+        if summary_message is not None:
+            if summary_message.text_hash == text_hash:
+                return
+            if await self._edit(bot, summary_message, text):
+                summary_message.text_hash = text_hash
+                await repository.save(summary_message)
+                return
+
+        message = await (
+            await outbound_queue.send(
+                chat_id,
+                lambda: bot.send_message(chat_id, text, parse_mode="HTML"),
+                PRIORITY_BROADCAST,
+            )
+        )
+        try:
+            await bot.pin_chat_message(
+                chat_id, message.message_id, disable_notification=True
+            )
+        except TelegramError as e:
+            logger.warning("Could not pin the summary in chat %s: %s", chat_id, e)
+
+        if summary_message is None:
+            summary_message = GameSummaryMessage(game_id=game_id, chat_id=chat_id)
+        summary_message.message_id = message.message_id
+        summary_message.text_hash = text_hash
+        await repository.save(summary_message)
+
+    @staticmethod
+    async def _edit(bot: Bot, summary_message: GameSummaryMessage, text: str) -> bool:
+        """Edits the pinned message; False if it no longer exists."""
+        try:
+            await (
+                await outbound_queue.send(
+                    summary_message.chat_id,
+                    lambda: bot.edit_message_text(
+                        text,
+                        chat_id=summary_message.chat_id,
+                        message_id=summary_message.message_id,
+                        parse_mode="HTML",
+                    ),
+                    PRIORITY_BROADCAST,
+                    idempotent=True,
+                )
+            )
+        except BadRequest as e:
+            if "not modified" in str(e).lower():
+                return True
+            logger.warning(
+                "Could not edit the summary in chat %s: %s", summary_message.chat_id, e
+            )
+            return False
+        return True
+
+
+live_game_summary = LiveGameSummaryService()
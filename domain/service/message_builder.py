@@ -0,0 +1,150 @@
+"""
+Splitting long texts into Telegram messages.
+
+Telegram rejects messages longer than 4096 characters, counted in UTF-16
+code units of the text left after parsing the HTML markup: tags do not
+count, an entity counts as one character. ``MessageBuilder`` collects the
+text block by block (a table with its seats, a row of the summary) and
+closes a page whenever the next block would not fit, so blocks are kept
+whole. A block longer than a page is cut at line breaks; a line longer than
+a page is cut at a space outside tags and entities, and tags still open at
+the cut are closed and reopened on the next page.
+"""
+
+import html
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Максимальная длина текста сообщения Telegram
+MESSAGE_LIMIT = 4096
+
+_MARKUP = re.compile(r"<[^>]*>|&#?\w+;")
+
+
+def message_length(text: str) -> int:
+    """Length of an HTML message as Telegram counts it against the limit."""
+    visible = html.unescape(re.sub(r"<[^>]*>", "", text))
+    return len(visible.encode("utf-16-le")) // 2
+
+
+class MessageBuilder:
+    def __init__(self, separator: str = "\n", limit: int = MESSAGE_LIMIT):
+        self._separator = separator
+        self._separator_length = message_length(separator)
+        self._limit = limit
+        self._pages: List[str] = []
+        self._current = ""
+        self._current_length = 0
+
+    def add(self, block: str) -> "MessageBuilder":
+        for part in self._split_block(block):
+            length = message_length(part)
+            if self._current and self._fits(length):
+                self._current += self._separator + part
+                self._current_length += self._separator_length + length
+                continue
+            if self._current:
+                self._pages.append(self._current)
+            self._current = part
+            self._current_length = length
+        return self
+
+    def add_all(self, blocks: Iterable[str]) -> "MessageBuilder":
+        for block in blocks:
+            self.add(block)
+        return self
+
+    def take_ready(self) -> List[str]:
+        """Returns the pages completed so far, e.g. to send them while building."""
+        pages, self._pages = self._pages, []
+        return pages
+
+    def pages(self) -> List[str]:
+        """Returns the remaining pages, including the last unfinished one."""
+        if self._current:
+            self._pages.append(self._current)
+            self._current = ""
+            self._current_length = 0
+        return self.take_ready()
+
+    def _fits(self, length: int) -> bool:
+        return self._current_length + self._separator_length + length <= self._limit
+
+    def _split_block(self, block: str) -> Iterator[str]:
+        if message_length(block) <= self._limit:
+            yield block
+            return
+
+        current = ""
+        current_length = 0
+        for line in block.split("\n"):
+            while message_length(line) > self._limit:
+                if current:
+                    yield current
+                    current = ""
+                head, line = self._cut_line(line)
+                yield head
+            length = message_length(line)
+            if current and current_length + 1 + length > self._limit:
+                yield current
+                current = line
+                current_length = length
+            elif current:
+                current = f"{current}\n{line}"
+                current_length += 1 + length
+            else:
+                current = line
+                current_length = length
+        if current:
+            yield current
+
+    def _cut_line(self, line: str) -> Tuple[str, str]:
+        """Splits an over-long line into a head within the limit and the rest.
+
+        Cuts at the last space that fits, or, when a single word is longer
+        than a page, at the last character that fits; never inside a tag or
+        an entity.
+        """
+        open_tags: List[Tuple[str, str]] = []  # (имя, открывающий тег)
+        space_cut: Optional[Tuple[int, List[Tuple[str, str]]]] = None
+        any_cut: Optional[Tuple[int, List[Tuple[str, str]]]] = None
+        length = 0
+        position = 0
+        while position < len(line):
+            if length:
+                any_cut = (position, list(open_tags))
+                if line[position] == " ":
+                    space_cut = any_cut
+
+            match = _MARKUP.match(line, position)
+            if match is None:
+                length += message_length(line[position])
+                position += 1
+            else:
+                token = match.group()
+                position = match.end()
+                if token.startswith("&"):
+                    length += message_length(token)
+                elif token.startswith("</"):
+                    if open_tags:
+                        open_tags.pop()
+                elif not token.endswith("/>"):
+                    open_tags.append((re.split(r"[\s>]", token[1:], 1)[0], token))
+            if length > self._limit:
+                break
+
+        position, tags = space_cut or any_cut or (self._limit, [])
+        # Незакрытые теги закрываются в конце страницы и открываются на следующей
+        closing = "".join(f"</{name}>" for name, _ in reversed(tags))
+        reopening = "".join(tag for _, tag in tags)
+        rest = line[position:]
+        if rest.startswith(" "):
+            rest = rest[1:]
+        return line[:position] + closing, reopening + rest
+
+
+def split_message(
+    blocks: Iterable[str], separator: str = "\n", limit: int = MESSAGE_LIMIT
+) -> List[str]:
+    """Joins blocks into as few messages as possible, each within ``limit``."""
+    return MessageBuilder(separator, limit).add_all(blocks).pages()
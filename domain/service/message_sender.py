@@ -2,26 +2,43 @@ from config import CHANNEL_ID
 from telegram import Update
 from telegram.ext import ContextTypes
 
+from domain.service.outbound_message_queue import (
+    PRIORITY_BROADCAST,
+    PRIORITY_REPLY,
+    outbound_queue,
+)
+
 
 class MessageSender:
+    """Sends messages through the outbound queue: awaiting a send only queues
+    the message; the returned future resolves to the sent Message."""
 
     @staticmethod
-    def send_to_channel(
+    async def send_to_channel(
         _: Update, context: ContextTypes.DEFAULT_TYPE, text, parse_mode=None
     ):
-        return context.bot.send_message(CHANNEL_ID, text, parse_mode=parse_mode)
+        return await outbound_queue.send(
+            CHANNEL_ID,
+            lambda: context.bot.send_message(CHANNEL_ID, text, parse_mode=parse_mode),
+            PRIORITY_BROADCAST,
+        )
 
     @staticmethod
-    def send_to_current_channel(
+    async def send_to_current_channel(
         update: Update,
         _: ContextTypes.DEFAULT_TYPE,
         text,
         reply_markup=None,
         parse_mode=None,
     ):
-        if update.message:
-            return update.message.reply_text(
-                text, reply_markup=reply_markup, parse_mode=parse_mode
+        message = update.message
+        if message:
+            return await outbound_queue.send(
+                message.chat_id,
+                lambda: message.reply_text(
+                    text, reply_markup=reply_markup, parse_mode=parse_mode
+                ),
+                PRIORITY_REPLY,
             )
         else:
             raise ValueError("update.message отсутствует")
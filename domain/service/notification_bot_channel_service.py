@@ -1,8 +1,31 @@
+from typing import List
+
 from telegram import Update
 
+from domain.service.message_builder import split_message
+from domain.service.outbound_message_queue import PRIORITY_REPLY, outbound_queue
+
 
 class NotificationBotChannelService:
-    async def reply(self, update: Update, message: str) -> None:
-        """Replies to the user who sent the command."""
+    async def reply(self, update: Update, message: str, reply_markup=None) -> None:
+        """Queues a reply to the user who sent the command.
+
+        A reply longer than one message is sent as several, split at line breaks.
+        """
+        await self.reply_pages(update, split_message([message]), reply_markup)
+
+    async def reply_pages(
+        self, update: Update, pages: List[str], reply_markup=None
+    ) -> None:
+        """Queues the pages in order; ``reply_markup`` goes with the last one."""
         if update.message:
-            await update.message.reply_text(message, parse_mode="HTML")
+            user_message = update.message
+            for index, page in enumerate(pages, 1):
+                markup = reply_markup if index == len(pages) else None
+                await outbound_queue.send(
+                    user_message.chat_id,
+                    lambda page=page, markup=markup: user_message.reply_text(
+                        page, parse_mode="HTML", reply_markup=markup
+                    ),
+                    PRIORITY_REPLY,
+                )
@@ -1,12 +1,18 @@
 from telegram import Bot
 
+from domain.service.outbound_message_queue import PRIORITY_BROADCAST, outbound_queue
+
 
 class NotificationPublicChannelService:
     def __init__(self, channel_id: int | str):
         self._channel_id = channel_id
 
     async def notify(self, bot: Bot, message: str) -> None:
-        """Sends a notification to the configured channel."""
-        await bot.send_message(
-            chat_id=self._channel_id, text=message, parse_mode="HTML"
+        """Queues a notification to the configured channel."""
+        await outbound_queue.send(
+            self._channel_id,
+            lambda: bot.send_message(
+                chat_id=self._channel_id, text=message, parse_mode="HTML"
+            ),
+            PRIORITY_BROADCAST,
         )
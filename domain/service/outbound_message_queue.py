@@ -0,0 +1,359 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
+
+from config import OUTBOUND_QUEUE
+
+logger = logging.getLogger(__name__)
+
+# Ответы пользователю отправляются раньше рассылок в каналы
+PRIORITY_REPLY = 0
+PRIORITY_BROADCAST = 1
+
+
+class TokenBucket:
+    """Allows ``rate`` sends per second with bursts of up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available."""
+        self._refill(now)
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(wait, self.paused_until - now)
+
+    def consume(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_idle(self, now: float) -> bool:
+        """True when the bucket is full and not paused, as a new one would be."""
+        self._refill(now)
+        return self.tokens >= self.capacity and self.paused_until <= now
+
+    def pause(self, seconds: float) -> None:
+        """Stops sending for the period requested by Telegram (RetryAfter)."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+class SlidingWindow:
+    """Allows at most ``limit`` sends in any ``window`` seconds.
+
+    Unlike a token bucket refilled at ``limit / window``, a batch of up to
+    ``limit`` messages goes out at once after a quiet period.
+    """
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.sent: Deque[float] = deque()
+
+    def _expire(self, now: float) -> None:
+        while self.sent and now - self.sent[0] >= self.window:
+            self.sent.popleft()
+
+    def delay(self, now: float) -> float:
+        """Seconds until the oldest send in the window expires."""
+        self._expire(now)
+        if len(self.sent) < self.limit:
+            return 0.0
+        return self.sent[0] + self.window - now
+
+    def consume(self, now: float) -> None:
+        self._expire(now)
+        self.sent.append(now)
+
+    def is_idle(self, now: float) -> bool:
+        """True when no send is left in the window."""
+        self._expire(now)
+        return not self.sent
+
+
+@dataclass(order=True)
+class OutboundMessage:
+    # Сообщения одного чата упорядочены по seq (порядку постановки в очередь)
+    seq: int
+    priority: int = field(compare=False)
+    chat_id: Any = field(compare=False)
+    send: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    idempotent: bool = field(default=False, compare=False)
+    attempts: int = field(default=0, compare=False)
+    not_before: float = field(default=0.0, compare=False)
+
+
+class OutboundMessageQueue:
+    """Queue of outgoing Telegram messages.
+
+    Handlers enqueue a message and return at once; a background worker sends
+    it respecting per-chat and global rate limits, honours RetryAfter and
+    retries network errors. The buffer is bounded: when it is full, ``send``
+    waits for a free slot. Messages to one chat keep their order; the
+    priority only decides which chat is served first.
+    """
+
+    def __init__(self, settings: dict = OUTBOUND_QUEUE):
+        self._settings = settings
+        # Очередь каждого чата — куча по seq
+        self._pending: Dict[Any, List[OutboundMessage]] = {}
+        self._pending_count = 0
+        self._slots = asyncio.Semaphore(settings["max_size"])
+        self._changed = asyncio.Event()
+        self._global_bucket = TokenBucket(
+            settings["global_per_second"], settings["global_per_second"]
+        )
+        self._chat_buckets: Dict[Any, TokenBucket] = {}
+        self._group_windows: Dict[Any, SlidingWindow] = {}
+        self._swept_at = time.monotonic()
+        self._in_flight: set = set()
+        self._senders: set = set()
+        self._seq = itertools.count()
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Sends what is still queued (up to ``timeout``) and stops the worker."""
+        if self._worker is None:
+            return
+        deadline = time.monotonic() + timeout
+        while (self._pending_count or self._senders) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        self._worker.cancel()
+        self._worker = None
+        for messages in self._pending.values():
+            for message in messages:
+                message.future.cancel()
+        self._pending.clear()
+        self._pending_count = 0
+
+    async def send(
+        self,
+        chat_id: Any,
+        send: Callable[[], Awaitable[Any]],
+        priority: int = PRIORITY_BROADCAST,
+        idempotent: bool = False,
+    ) -> asyncio.Future:
+        """Queues ``send`` (a call of the Bot API) for ``chat_id``.
+
+        Returns a future with the result of the call. Without a running worker
+        the call is made immediately. Only ``idempotent`` calls (edits) are
+        repeated after a timeout: a timed out message may have been delivered.
+        """
+        future = asyncio.get_running_loop().create_future()
+        # Ошибка отправки уже записана в лог, ждать future не обязательно
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        if not self.running:
+            try:
+                future.set_result(await send())
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            return future
+
+        await self._slots.acquire()
+        self._push(
+            OutboundMessage(
+                next(self._seq), priority, chat_id, send, future, idempotent
+            )
+        )
+        return future
+
+    @staticmethod
+    def _is_private(chat_id: Any) -> bool:
+        return isinstance(chat_id, int) and chat_id > 0
+
+    def _bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if self._is_private(chat_id):
+                rate = self._settings["private_per_second"]
+            else:
+                rate = self._settings["group_per_second"]
+            bucket = TokenBucket(rate, self._settings["burst"])
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _window(self, chat_id: Any) -> Optional[SlidingWindow]:
+        """The per-minute limit of a group; private chats have none."""
+        if self._is_private(chat_id):
+            return None
+        window = self._group_windows.get(chat_id)
+        if window is None:
+            window = SlidingWindow(
+                self._settings["group_per_minute"], self._settings["group_window"]
+            )
+            self._group_windows[chat_id] = window
+        return window
+
+    def _delay(self, chat_id: Any, now: float) -> float:
+        """Seconds until the chat and the global limits allow a send."""
+        window = self._window(chat_id)
+        return max(
+            self._bucket(chat_id).delay(now),
+            window.delay(now) if window else 0.0,
+            self._global_bucket.delay(now),
+        )
+
+    def _consume(self, chat_id: Any, now: float) -> None:
+        self._bucket(chat_id).consume(now)
+        window = self._window(chat_id)
+        if window:
+            window.consume(now)
+        self._global_bucket.consume(now)
+
+    def _sweep(self, now: float) -> None:
+        """Forgets the limits of chats with nothing queued whose bucket is full
+        and whose window is empty: new ones would behave the same."""
+        for chat_id in set(self._chat_buckets) | set(self._group_windows):
+            if chat_id in self._pending or chat_id in self._in_flight:
+                continue
+            bucket = self._chat_buckets.get(chat_id)
+            window = self._group_windows.get(chat_id)
+            if (bucket is None or bucket.is_idle(now)) and (
+                window is None or window.is_idle(now)
+            ):
+                self._chat_buckets.pop(chat_id, None)
+                self._group_windows.pop(chat_id, None)
+        self._swept_at = now
+
+    def _push(self, message: OutboundMessage) -> None:
+        heapq.heappush(self._pending.setdefault(message.chat_id, []), message)
+        self._pending_count += 1
+        self._changed.set()
+
+    def _pop(self, message: OutboundMessage) -> None:
+        messages = self._pending[message.chat_id]
+        heapq.heappop(messages)
+        if not messages:
+            del self._pending[message.chat_id]
+        self._pending_count -= 1
+
+    def _next_ready(self, now: float):
+        """Returns the first message that may be sent now, or the wait time.
+
+        Only the oldest message of each chat is a candidate, so messages to
+        one chat keep their order; between chats the priority decides.
+        """
+        wait = float("inf")
+        best = None
+        for chat_id, messages in self._pending.items():
+            if chat_id in self._in_flight:
+                continue
+            message = messages[0]
+            delay = max(message.not_before - now, self._delay(chat_id, now))
+            if delay > 0:
+                wait = min(wait, max(delay, 0.01))
+            elif best is None or (message.priority, message.seq) < (
+                best.priority,
+                best.seq,
+            ):
+                best = message
+        if best is not None and len(self._senders) < self._settings["concurrency"]:
+            return best, 0.0
+        if best is not None:
+            wait = min(wait, 0.01)
+        return None, wait
+
+    async def _run(self) -> None:
+        while True:
+            self._changed.clear()
+            now = time.monotonic()
+            # Лимиты чатов без сообщений не должны копиться бесконечно
+            if now - self._swept_at >= self._settings["group_window"]:
+                self._sweep(now)
+            message, wait = self._next_ready(now)
+            if message is None:
+                try:
+                    await asyncio.wait_for(
+                        self._changed.wait(), None if wait == float("inf") else wait
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._pop(message)
+            self._consume(message.chat_id, now)
+            self._in_flight.add(message.chat_id)
+            sender = asyncio.create_task(self._deliver(message))
+            self._senders.add(sender)
+            sender.add_done_callback(self._senders.discard)
+
+    async def _deliver(self, message: OutboundMessage) -> None:
+        message.attempts += 1
+        requeue = False
+        try:
+            result = await message.send()
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            if not isinstance(retry_after, (int, float)):
+                retry_after = retry_after.total_seconds()
+            logger.warning(
+                "Flood limit for chat %s, retrying in %ss", message.chat_id, retry_after
+            )
+            self._bucket(message.chat_id).pause(retry_after)
+            requeue = True
+        except BadRequest as e:
+            self._fail(message, e)
+        except TimedOut as e:
+            # Запрос мог дойти до Telegram: повторная отправка задвоила бы сообщение
+            requeue = message.idempotent and self._retry_later(message)
+            if not requeue:
+                self._fail(message, e)
+        except NetworkError as e:
+            requeue = self._retry_later(message)
+            if not requeue:
+                self._fail(message, e)
+        except Exception as e:
+            self._fail(message, e)
+        else:
+            message.future.set_result(result)
+
+        self._in_flight.discard(message.chat_id)
+        if requeue:
+            # Сообщение возвращается на своё место в очереди чата
+            self._push(message)
+        else:
+            self._slots.release()
+            self._changed.set()
+
+    def _retry_later(self, message: OutboundMessage) -> bool:
+        """Schedules a retry with exponential backoff; False when out of attempts."""
+        if message.attempts >= self._settings["max_attempts"]:
+            return False
+        message.not_before = time.monotonic() + 2 ** (message.attempts - 1)
+        return True
+
+    @staticmethod
+    def _fail(message: OutboundMessage, error: Exception) -> None:
+        logger.error("Could not send a message to chat %s: %s", message.chat_id, error)
+        message.future.set_exception(error)
+
+
+outbound_queue = OutboundMessageQueue()
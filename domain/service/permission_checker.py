@@ -1,37 +1,68 @@
-from config import CHANNEL_ID, CHANNEL_TOURNAMENT_ID
+import asyncio
+
+from cachetools import TTLCache
+from config import CHANNEL_ID, CHANNEL_TOURNAMENT_ID, MEMBERSHIP_CACHE_TTL
 from telegram import Update
 from telegram.ext import ContextTypes
 from telegram.constants import ChatMemberStatus
 
+MEMBER_CHATS = (CHANNEL_ID, CHANNEL_TOURNAMENT_ID)
+MEMBER_STATUSES = (
+    ChatMemberStatus.MEMBER,
+    ChatMemberStatus.ADMINISTRATOR,
+    ChatMemberStatus.OWNER,
+)
+
 
 class PermissionChecker:
+    # user_id -> состоит ли пользователь хотя бы в одной из групп
+    _membership_cache: TTLCache = TTLCache(maxsize=10000, ttl=MEMBERSHIP_CACHE_TTL)
+    cache_hits = 0
+    cache_misses = 0
+
     @staticmethod
     async def check_is_group_member(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if not update.effective_user:
             return False
 
-        try:
-            user_id = update.effective_user.id
+        user_id = update.effective_user.id
+        is_member = PermissionChecker._membership_cache.get(user_id)
+        if is_member is not None:
+            PermissionChecker.cache_hits += 1
+            return is_member
+        PermissionChecker.cache_misses += 1
 
-            chat_member = await context.bot.get_chat_member(CHANNEL_ID, user_id)
-            chat_tournament_member = await context.bot.get_chat_member(
-                CHANNEL_TOURNAMENT_ID, user_id
+        try:
+            chat_members = await asyncio.gather(
+                *[context.bot.get_chat_member(chat, user_id) for chat in MEMBER_CHATS]
             )
-            if chat_member.status in [
-                ChatMemberStatus.MEMBER,
-                ChatMemberStatus.ADMINISTRATOR,
-                ChatMemberStatus.OWNER,
-            ] or chat_tournament_member.status in [
-                ChatMemberStatus.MEMBER,
-                ChatMemberStatus.ADMINISTRATOR,
-                ChatMemberStatus.OWNER,
-            ]:
-                return True
-
-            return False
         except Exception:
             return False
 
+        is_member = any(member.status in MEMBER_STATUSES for member in chat_members)
+        PermissionChecker._membership_cache[user_id] = is_member
+        return is_member
+
+    @staticmethod
+    async def handle_chat_member_update(
+        update: Update, _: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        """Сбрасывает кэш членства, когда пользователь вступает в группу или покидает её."""
+        if update.chat_member and update.chat_member.chat.id in MEMBER_CHATS:
+            user_id = update.chat_member.new_chat_member.user.id
+            PermissionChecker._membership_cache.pop(user_id, None)
+
+    @staticmethod
+    def get_membership_cache_stats() -> dict:
+        hits = PermissionChecker.cache_hits
+        checks = hits + PermissionChecker.cache_misses
+        return {
+            "hits": hits,
+            "misses": PermissionChecker.cache_misses,
+            "hit_rate": hits / checks if checks else 0.0,
+            "saved_api_calls": hits * len(MEMBER_CHATS),
+        }
+
     @staticmethod
     async def check_is_chat_private(update: Update, _: ContextTypes.DEFAULT_TYPE):
         if update.effective_chat and update.effective_chat.type == "private":
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from cachetools import LRUCache, TTLCache
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from telegram import Bot, User
+from telegram.error import TelegramError
+
+from config import PLAYER_NAMES_CACHE_SIZE, PLAYER_NAMES_LOOKUP_INTERVAL
+from domain.repository.player_repository import PlayerRepository
+from domain.scheme.player_data import PlayerData
+from utils import format_display_name
+
+logger = logging.getLogger(__name__)
+
+# Незнакомые Telegram пользователи не запрашиваются повторно это время (с)
+UNKNOWN_USER_TTL = 600
+# Имена, записанные в транзакции, попадают в кэш только после её коммита
+_PENDING_KEY = "player_names_pending"
+
+
+class PlayerNameDirectory:
+    """Display names of players: an in-memory LRU over the ``players`` table.
+
+    Names are refreshed passively from the sender of every command that passes
+    the permission check. ``get_chat`` is only a rate-limited fallback for ids
+    the bot has never seen.
+    """
+
+    def __init__(
+        self,
+        player_repository: PlayerRepository,
+        cache_size: int = PLAYER_NAMES_CACHE_SIZE,
+        lookup_interval: float = PLAYER_NAMES_LOOKUP_INTERVAL,
+    ):
+        self._player_repository = player_repository
+        # telegram_id -> (name, username)
+        self._names: LRUCache = LRUCache(maxsize=cache_size)
+        self._unknown: TTLCache = TTLCache(maxsize=1000, ttl=UNKNOWN_USER_TTL)
+        self._lookup_interval = lookup_interval
+        self._lookup_lock = asyncio.Lock()
+        self._last_lookup = 0.0
+        self.telegram_lookups = 0
+
+    async def remember(self, user: User) -> None:
+        """Records the current name of a user who sent a permitted command."""
+        entry = (user.full_name or None, user.username)
+        if user.is_bot or self._cached(user.id) == entry:
+            return
+
+        player = await self._player_repository.find_by_telegram_id(user.id)
+        if player is None or (player.name, player.username) != entry:
+            await self._store(PlayerData.from_telegram_user(user))
+        self._remember_after_commit(user.id, entry)
+
+    async def get_name(self, user_id: int, bot: Bot) -> Optional[str]:
+        return (await self.get_names([user_id], bot))[user_id]
+
+    async def get_names(
+        self, user_ids: Iterable[int], bot: Bot
+    ) -> Dict[int, Optional[str]]:
+        """Names of several users: one DB query for the ones not cached."""
+        entries: Dict[int, Optional[Tuple[Optional[str], Optional[str]]]] = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            entries[user_id] = self._cached(user_id)
+            if entries[user_id] is None:
+                missing.append(user_id)
+
+        if missing:
+            for player in await self._player_repository.find_by_telegram_ids(missing):
+                entry = (player.name, player.username)
+                entries[player.telegram_id] = entry
+                self._remember_after_commit(player.telegram_id, entry)
+
+        for user_id in missing:
+            if entries[user_id] is None:
+                entries[user_id] = await self._lookup(user_id, bot)
+
+        return {
+            user_id: format_display_name(*entry) if entry else None
+            for user_id, entry in entries.items()
+        }
+
+    async def _lookup(
+        self, user_id: int, bot: Bot
+    ) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        if user_id in self._unknown:
+            return None
+
+        async with self._lookup_lock:
+            delay = self._last_lookup + self._lookup_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last_lookup = time.monotonic()
+            self.telegram_lookups += 1
+            try:
+                chat = await bot.get_chat(user_id)
+            except TelegramError as e:
+                logger.warning("Could not resolve the name of user %s: %s", user_id, e)
+                self._unknown[user_id] = True
+                return None
+
+        entry = (chat.full_name, chat.username)
+        await self._store(
+            PlayerData(telegram_id=user_id, username=chat.username, name=chat.full_name)
+        )
+        self._remember_after_commit(user_id, entry)
+        return entry
+
+    def _cached(self, user_id: int) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        entry = self._names.get(user_id)
+        if entry is None:
+            pending = self._player_repository.db.info.get(_PENDING_KEY, {})
+            entry = pending.get((self, user_id))
+        return entry
+
+    def _remember_after_commit(
+        self, user_id: int, entry: Tuple[Optional[str], Optional[str]]
+    ) -> None:
+        # Кэш обещает, что имя уже в БД: строки, записанные или прочитанные
+        # в транзакции, до её коммита ещё могут откатиться
+        pending = self._player_repository.db.info.setdefault(_PENDING_KEY, {})
+        pending[(self, user_id)] = entry
+
+    async def _store(self, player_data: PlayerData) -> None:
+        # Savepoint: a clash on the unique username must not break the update
+        try:
+            async with self._player_repository.db.begin_nested():
+                await self._player_repository.get_or_create(player_data)
+        except IntegrityError as e:
+            logger.warning(
+                "Could not store the name of user %s: %s", player_data.telegram_id, e
+            )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_remembered_names(session: Session) -> None:
+    if session.in_nested_transaction():
+        return  # savepoint: the outer transaction may still roll back
+    for (directory, user_id), entry in session.info.pop(_PENDING_KEY, {}).items():
+        directory._names[user_id] = entry
+        directory._unknown.pop(user_id, None)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_remembered_names(session: Session, previous_transaction) -> None:
+    if previous_transaction.nested:
+        return  # the savepoint of _store: the name is remembered anyway
+    session.info.pop(_PENDING_KEY, None)
@@ -1,21 +1,82 @@
 # domain/service/player_statistics_service.py
-from sqlalchemy.orm import Session
+from datetime import date
+from typing import List, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.repository.player_action_repository import PlayerActionRepository
+from domain.repository.player_stats_rollup_repository import (
+    PlayerStatsRollupRepository,
+)
+from domain.model.leaderboard_entry import LeaderboardEntry
 from domain.model.player_statistics import PlayerStatistics
+from domain.model.roi_point import RoiPoint
+from domain.service.downsampling import largest_triangle_three_buckets
 
 
 class PlayerStatisticsService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.action_repo = PlayerActionRepository(db)
+        self.rollup_repo = PlayerStatsRollupRepository(db)
+
+    async def get_statistics_for_user(
+        self,
+        user_id: int,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> PlayerStatistics:
+        """Статистика за всё время или за период (даты включительно, в TIMEZONE)."""
+        games_num, total_buyin_count, total_buyin, total_quit = (
+            await self.rollup_repo.get_totals(user_id, date_from, date_to)
+        )
+
+        return self._to_statistics(
+            games_num, total_buyin_count, total_buyin, total_quit
+        )
+
+    async def get_leaderboard(
+        self,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        min_games: int = 0,
+        exclude_user_ids: Sequence[int] = (),
+        sort: str = "roi",
+        descending: bool = True,
+    ) -> List[LeaderboardEntry]:
+        """Статистика всех игроков за период одним запросом, в порядке сортировки."""
+        rows = await self.rollup_repo.get_leaderboard(
+            date_from, date_to, min_games, exclude_user_ids, sort, descending
+        )
+        return [
+            LeaderboardEntry(
+                user_id=user_id,
+                username=username,
+                statistics=self._to_statistics(games, buyin_count, buyin, quit_sum),
+            )
+            for user_id, username, games, buyin_count, buyin, quit_sum in rows
+        ]
 
-    def get_statistics_for_user(self, user_id: int) -> PlayerStatistics:
-        games_num = self.action_repo.count_distinct_games_by_user(user_id)
-        total_buyin = self.action_repo.get_total_buyin_amount(user_id)
-        total_quit = self.action_repo.get_total_quit_amount(user_id)
-        total_buyin_count = self.action_repo.get_buyin_count(user_id)
+    async def get_roi_history(
+        self,
+        user_id: int,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        points: Optional[int] = None,
+    ) -> List[RoiPoint]:
+        """Накопленный ROI по дням; ``points`` ограничивает число точек (LTTB)."""
+        history = await self.rollup_repo.get_roi_history(user_id, date_from, date_to)
+        if points:
+            keep = largest_triangle_three_buckets(
+                [(day.toordinal(), roi) for day, roi in history], points
+            )
+            history = [history[i] for i in keep]
+        return [RoiPoint(date=day, roi=round(roi, 1)) for day, roi in history]
 
+    @staticmethod
+    def _to_statistics(
+        games_num: int, total_buyin_count: int, total_buyin: float, total_quit: float
+    ) -> PlayerStatistics:
         # Прибыль
         profit = total_quit - total_buyin
 
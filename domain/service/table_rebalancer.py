@@ -0,0 +1,94 @@
+"""
+Table balancing for multi-table tournaments.
+
+After eliminations the tables drift apart. ``plan_rebalance`` keeps the
+field on as few tables as it fits on (``ceil(players / table size)``) with
+table sizes within one player of each other, moving as few players as
+possible: the smallest tables are broken first, the largest tables keep
+the extra seats, and only the players above their table's target move.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Tuple
+
+MAX_PLAYERS_PER_TABLE = 9
+
+
+@dataclass(frozen=True)
+class SeatMove:
+    player_id: int
+    from_table: Optional[int]
+    from_position: Optional[int]
+    to_table: int
+    to_position: int
+
+
+@dataclass(frozen=True)
+class RebalancePlan:
+    moves: List[SeatMove] = field(default_factory=list)
+    broken_tables: List[int] = field(default_factory=list)
+
+    def seats(self) -> List[Tuple[int, int, int]]:
+        """New seats as (player_id, table_number, position_number)."""
+        return [(m.player_id, m.to_table, m.to_position) for m in self.moves]
+
+
+def plan_rebalance(
+    seats: Mapping[int, Tuple[Optional[int], Optional[int]]],
+    max_per_table: int = MAX_PLAYERS_PER_TABLE,
+) -> RebalancePlan:
+    """Plans the moves for the players still in the game.
+
+    ``seats`` maps player id to its (table_number, position_number); players
+    without a table are seated as well.
+    """
+    if not seats:
+        return RebalancePlan()
+
+    tables: Dict[int, List[Tuple[int, int]]] = {}
+    unseated = []
+    for player_id, (table_number, position_number) in sorted(seats.items()):
+        if table_number is None:
+            unseated.append(player_id)
+        else:
+            tables.setdefault(table_number, []).append(
+                (position_number or 0, player_id)
+            )
+
+    table_count = -(-len(seats) // max_per_table)
+    # Крупные столы остаются и получают лишние места: так пересаживается меньше всего игроков
+    by_size = sorted(tables, key=lambda t: (-len(tables[t]), t))
+    kept, broken = by_size[:table_count], sorted(by_size[table_count:])
+    new_table = 1
+    while len(kept) < table_count:
+        while new_table in tables or new_table in kept:
+            new_table += 1
+        kept.append(new_table)
+
+    base, extra = divmod(len(seats), table_count)
+    targets = {table: base + (i < extra) for i, table in enumerate(kept)}
+
+    movers = [
+        (table, position, player_id)
+        for table in broken
+        for position, player_id in sorted(tables[table])
+    ]
+    movers += [(None, None, player_id) for player_id in unseated]
+    for table in kept:
+        players = sorted(tables.get(table, []))
+        # Со стола уходят игроки с последних мест
+        for position, player_id in players[targets[table] :]:
+            movers.append((table, position, player_id))
+
+    pending = iter(movers)
+    moves = []
+    for table in sorted(kept):
+        occupied = {position for position, _ in tables.get(table, [])}
+        free = (p for p in range(1, max_per_table + 1) if p not in occupied)
+        for _ in range(targets[table] - len(tables.get(table, []))):
+            from_table, from_position, player_id = next(pending)
+            moves.append(
+                SeatMove(player_id, from_table, from_position, table, next(free))
+            )
+
+    return RebalancePlan(moves=moves, broken_tables=broken)
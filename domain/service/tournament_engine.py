@@ -0,0 +1,299 @@
+"""
+In-memory state of the active tournament.
+
+The engine loads the active tournament and its players once and then
+answers the tournament commands (who joined, who is still in the game,
+seats, ranks, the summary) from memory. Changes are still written by the
+repositories inside the unit of work of the update; the engine applies them
+to its state only after that session commits, so a rolled back update
+never shows up in memory. After a restart the state is loaded from the
+database again on first use.
+"""
+
+import logging
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from domain.entity.player import Player
+from domain.entity.player_tournament_action import PlayerTournamentAction
+from domain.entity.tournament import Tournament
+from domain.repository.player_tournament_action_repository import (
+    PlayerTournamentActionRepository,
+)
+from domain.repository.tournament_repository import TournamentRepository
+
+logger = logging.getLogger(__name__)
+
+# Изменения состояния, ожидающие коммита сессии
+_PENDING_KEY = "tournament_engine_pending"
+
+
+@dataclass(frozen=True)
+class TournamentPlayer:
+    id: int
+    telegram_id: int
+    username: Optional[str]
+    name: Optional[str]
+
+    @classmethod
+    def from_entity(cls, player: Player) -> "TournamentPlayer":
+        return cls(player.id, player.telegram_id, player.username, player.name)
+
+    def get_user_name(self) -> Optional[str]:
+        return self.username
+
+    def get_name(self) -> Optional[str]:
+        return self.name
+
+    def get_telegram_id(self) -> int:
+        return self.telegram_id
+
+
+@dataclass(frozen=True)
+class TournamentEntry:
+    player: TournamentPlayer
+    created_at: datetime
+    rank: Optional[int] = None
+    table_number: Optional[int] = None
+    position_number: Optional[int] = None
+    duration_seconds: Optional[int] = None
+    ended_at: Optional[datetime] = None
+
+    @classmethod
+    def from_action(cls, action: PlayerTournamentAction) -> "TournamentEntry":
+        return cls(
+            player=TournamentPlayer.from_entity(action.player),
+            created_at=action.created_at,
+            rank=action.rank,
+            table_number=action.table_number,
+            position_number=action.position_number,
+            duration_seconds=action.duration_seconds,
+            ended_at=action.ended_at,
+        )
+
+    def get_player(self) -> TournamentPlayer:
+        return self.player
+
+    def get_duration_str(self) -> str:
+        if self.duration_seconds is None:
+            return "00:00:00"
+        hours, remainder = divmod(self.duration_seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        return f"{hours:02}:{minutes:02}:{seconds:02}"
+
+
+@dataclass
+class TournamentState:
+    """The active tournament with its players in join order, keyed by player id."""
+
+    id: int
+    created_at: datetime
+    start_time: Optional[datetime] = None
+    is_shuffled: bool = False
+    entries: Dict[int, TournamentEntry] = field(default_factory=dict)
+
+    @classmethod
+    def from_entities(
+        cls, tournament: Tournament, actions: Iterable[PlayerTournamentAction]
+    ) -> "TournamentState":
+        return cls(
+            id=tournament.id,
+            created_at=tournament.created_at,
+            start_time=tournament.start_time,
+            is_shuffled=tournament.is_shuffled,
+            entries={
+                action.player_id: TournamentEntry.from_action(action)
+                for action in actions
+            },
+        )
+
+    def is_tournament_started(self) -> bool:
+        return self.start_time is not None and self.is_shuffled
+
+    def is_tournament_ended(self) -> bool:
+        return False
+
+    def find_entry(self, telegram_id: int) -> Optional[TournamentEntry]:
+        for entry in self.entries.values():
+            if entry.player.telegram_id == telegram_id:
+                return entry
+        return None
+
+    def active_entries(self) -> List[TournamentEntry]:
+        return [entry for entry in self.entries.values() if entry.rank is None]
+
+    def count_total_players(self) -> int:
+        return len(self.entries)
+
+    def count_active_players(self) -> int:
+        return sum(1 for entry in self.entries.values() if entry.rank is None)
+
+
+def _with_seats(
+    state: TournamentState, seats: Iterable[Tuple[int, int, int]]
+) -> TournamentState:
+    entries = dict(state.entries)
+    for player_id, table_number, position_number in seats:
+        if player_id in entries:
+            entries[player_id] = replace(
+                entries[player_id],
+                table_number=table_number,
+                position_number=position_number,
+            )
+    return replace(state, entries=entries)
+
+
+Change = Callable[[Optional[TournamentState]], Optional[TournamentState]]
+
+
+class TournamentEngine:
+    """Serves the active tournament from memory, kept in step with commits."""
+
+    def __init__(
+        self,
+        tournament_repository: TournamentRepository,
+        player_tournament_action_repository: PlayerTournamentActionRepository,
+    ) -> None:
+        self._tournament_repository = tournament_repository
+        self._player_tournament_action_repository = player_tournament_action_repository
+        self._state: Optional[TournamentState] = None
+        self._loaded = False
+        # Растёт с каждым применённым коммитом: загрузка, которую он обогнал, не кэшируется
+        self._version = 0
+
+    async def get_active(self) -> Optional[TournamentState]:
+        """Returns the active tournament, loading it on first use."""
+        if self._loaded:
+            return self._state
+
+        version = self._version
+        tournament = await self._tournament_repository.find_active_tournament()
+        state = None
+        if tournament:
+            actions = await self._player_tournament_action_repository.find_actions_by_tournament_id(
+                tournament.id
+            )
+            state = TournamentState.from_entities(tournament, actions)
+
+        # Незакоммиченные изменения этой же сессии в кэш не попадают
+        if version == self._version and not self._db.info.get(_PENDING_KEY):
+            self._state, self._loaded = state, True
+        return state
+
+    def invalidate(self) -> None:
+        """Forgets the state; the next call loads it from the database again."""
+        self._state, self._loaded = None, False
+        self._version += 1
+
+    def tournament_created(self, tournament: Tournament) -> None:
+        state = TournamentState.from_entities(tournament, [])
+        self._stage(lambda current: state)
+
+    def tournament_ended(self, tournament_id: int) -> None:
+        self._stage(
+            lambda current: None if current and current.id == tournament_id else current
+        )
+
+    def tournament_started(
+        self,
+        tournament: Tournament,
+        seats: Iterable[Tuple[int, int, int]] = (),
+    ) -> None:
+        """Records the start and the seats as (player_id, table, position)."""
+        tournament_id, start_time = tournament.id, tournament.start_time
+        seats = list(seats)
+
+        def change(current: Optional[TournamentState]) -> Optional[TournamentState]:
+            if not current or current.id != tournament_id:
+                return current
+            return replace(
+                _with_seats(current, seats), start_time=start_time, is_shuffled=True
+            )
+
+        self._stage(change)
+
+    def players_seated(
+        self, tournament_id: int, seats: Iterable[Tuple[int, int, int]]
+    ) -> None:
+        """Records new seats as (player_id, table, position)."""
+        seats = list(seats)
+        self._stage(
+            lambda current: (
+                _with_seats(current, seats)
+                if current and current.id == tournament_id
+                else current
+            )
+        )
+
+    def players_updated(self, actions: Iterable[PlayerTournamentAction]) -> None:
+        """Records joined or eliminated players from their saved actions."""
+        # Снимок берётся сейчас: после коммита атрибуты сущностей могут устареть
+        updates = [
+            (
+                action.tournament_id,
+                action.player_id,
+                TournamentEntry.from_action(action),
+            )
+            for action in actions
+        ]
+
+        def change(current: Optional[TournamentState]) -> Optional[TournamentState]:
+            if not current:
+                return current
+            entries = dict(current.entries)
+            for tournament_id, player_id, entry in updates:
+                if tournament_id == current.id:
+                    entries[player_id] = entry
+            return replace(current, entries=entries)
+
+        self._stage(change)
+
+    def player_unregistered(self, tournament_id: int, player_id: int) -> None:
+        def change(current: Optional[TournamentState]) -> Optional[TournamentState]:
+            if not current or current.id != tournament_id:
+                return current
+            entries = dict(current.entries)
+            entries.pop(player_id, None)
+            return replace(current, entries=entries)
+
+        self._stage(change)
+
+    @property
+    def _db(self):
+        return self._tournament_repository.db
+
+    def _stage(self, change: Change) -> None:
+        self._db.info.setdefault(_PENDING_KEY, []).append((self, change))
+
+    def _apply(self, change: Optional[Change]) -> None:
+        if change is None:
+            self.invalidate()
+            return
+        self._version += 1
+        if self._loaded:
+            self._state = change(self._state)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_tournament_changes(session: Session) -> None:
+    if session.in_nested_transaction():
+        return  # savepoint: the outer transaction may still roll back
+    for engine, change in session.info.pop(_PENDING_KEY, []):
+        try:
+            engine._apply(change)
+        except Exception:
+            logger.exception("Failed to apply a tournament change, reloading")
+            engine.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_tournament_changes(session: Session, previous_transaction) -> None:
+    pending = session.info.pop(_PENDING_KEY, [])
+    if pending and previous_transaction.nested:
+        # Откат точки сохранения: внешняя транзакция ещё может закоммитить часть
+        # изменений, поэтому после её коммита состояние перечитывается
+        session.info[_PENDING_KEY] = [(engine, None) for engine, _ in pending]
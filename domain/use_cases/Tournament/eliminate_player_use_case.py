@@ -3,64 +3,95 @@ from domain.scheme.player_data import PlayerData
 from domain.entity.player_tournament_action import (
     PlayerTournamentAction,
 )
-from domain.repository.player_repository import PlayerRepository
 from domain.repository.player_tournament_action_repository import (
     PlayerTournamentActionRepository,
 )
-from domain.repository.tournament_repository import TournamentRepository
-from typing import Optional
+from domain.service.tournament_engine import TournamentEngine
+from typing import List, Optional
 
 
 class EliminatePlayerUseCase:
     def __init__(
         self,
-        tournament_repository: TournamentRepository,
-        player_repository: PlayerRepository,
         player_tournament_action_repository: PlayerTournamentActionRepository,
+        tournament_engine: TournamentEngine,
     ):
-        self._tournament_repository = tournament_repository
-        self._player_repository = player_repository
         self._player_tournament_action_repository = player_tournament_action_repository
+        self._tournament_engine = tournament_engine
 
     async def execute(
         self, player_data: PlayerData
     ) -> Optional[PlayerTournamentAction]:
-        active_tournament = self._tournament_repository.find_active_tournament()
+        active_tournament = await self._tournament_engine.get_active()
         if not active_tournament:
             raise RuntimeError("Нет активного турнира. Нельзя выбыть.")
 
-        player = self._player_repository.get_or_create(player_data)
-
-        # Retrieve JOIN record (which is the only record for this player/tournament)
-        action = self._player_tournament_action_repository.find_action(
-            active_tournament.id, player.id
-        )
-
-        if not action:
+        entry = active_tournament.find_entry(player_data.telegram_id)
+        if not entry:
             raise RuntimeError("Вы не участвуете в этом турнире.")
+        player_id = entry.player.id
 
         if not active_tournament.is_tournament_started():
-            self._player_tournament_action_repository.unregister_player(action)
-
+            if not await self._player_tournament_action_repository.unregister_player_by_id(
+                active_tournament.id, player_id
+            ):
+                self._tournament_engine.invalidate()
+                raise RuntimeError("Вы не участвуете в этом турнире.")
+            self._tournament_engine.player_unregistered(active_tournament.id, player_id)
             return None
 
-        if action.rank is not None:
+        if entry.rank is not None:
             raise RuntimeError("Вы уже выбыли из этого турнира.")
 
-        # Calculate Rank
-        total_players = self._player_tournament_action_repository.count_total_players(
-            active_tournament.id
-        )
-        eliminated_count = (
-            self._player_tournament_action_repository.count_eliminated_players(
-                active_tournament.id
-            )
+        # Rank is assigned by the UPDATE itself, only to a player still in the game
+        now = datetime.now(timezone.utc)
+        action = await self._player_tournament_action_repository.eliminate_player(
+            tournament_id=active_tournament.id,
+            player_id=player_id,
+            duration_seconds=self._duration_seconds(active_tournament, now),
+            ended_at=now,
         )
-        rank = total_players - eliminated_count
+        if not action:
+            # The database disagrees with the state in memory: reload it next time
+            self._tournament_engine.invalidate()
+            raise RuntimeError("Вы уже выбыли из этого турнира.")
+
+        self._tournament_engine.players_updated([action])
+        return action
+
+    async def execute_bulk(
+        self, telegram_ids: List[int], tied: bool = False
+    ) -> List[PlayerTournamentAction]:
+        """Eliminates players busted in one hand, from the lowest place up."""
+        active_tournament = await self._tournament_engine.get_active()
+        if not active_tournament or not active_tournament.is_tournament_started():
+            raise RuntimeError("Нет начатого турнира. Нельзя выбить игроков.")
+
+        entries = {}
+        missing = []
+        for telegram_id in telegram_ids:
+            entry = active_tournament.find_entry(telegram_id)
+            if entry:
+                entries[telegram_id] = entry
+            else:
+                missing.append(str(telegram_id))
+        if missing:
+            raise RuntimeError(f"Игроки не участвуют в турнире: {', '.join(missing)}.")
 
-        # Calculate Duration
         now = datetime.now(timezone.utc)
-        start_time = active_tournament.start_time
+        actions = await self._player_tournament_action_repository.eliminate_players(
+            tournament_id=active_tournament.id,
+            player_ids=[entries[i].player.id for i in telegram_ids],
+            duration_seconds=self._duration_seconds(active_tournament, now),
+            ended_at=now,
+            tied=tied,
+        )
+        self._tournament_engine.players_updated(actions)
+        return actions
+
+    @staticmethod
+    def _duration_seconds(tournament, now: datetime) -> int:
+        start_time = tournament.start_time
         if not start_time:
             # Fallback if start_time is missing (should not happen for active tournament)
             start_time = now
@@ -68,13 +99,4 @@ class EliminatePlayerUseCase:
         if start_time.tzinfo is None:
             start_time = start_time.replace(tzinfo=timezone.utc)
 
-        duration_seconds = int((now - start_time).total_seconds())
-
-        action = self._player_tournament_action_repository.eliminate_player(
-            tournament_id=active_tournament.id,
-            player_id=player.id,
-            rank=rank,
-            duration_seconds=duration_seconds,
-            ended_at=now,
-        )
-        return action
+        return int((now - start_time).total_seconds())
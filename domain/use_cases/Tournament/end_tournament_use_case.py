@@ -5,6 +5,10 @@ from domain.repository.player_repository import PlayerRepository
 from domain.repository.player_tournament_action_repository import (
     PlayerTournamentActionRepository,
 )
+from domain.service.tournament_engine import TournamentEngine
+
+# Сколько активных игроков перечислять в ошибке, остальные — одним числом
+ACTIVE_PLAYERS_LISTED = 20
 
 
 from domain.entity.tournament import Tournament
@@ -16,41 +20,46 @@ class EndTournamentUseCase:
         tournament_repository: TournamentRepository,
         player_repository: PlayerRepository,
         player_tournament_action_repository: PlayerTournamentActionRepository,
+        tournament_engine: TournamentEngine,
     ) -> None:
         self._tournament_repository = tournament_repository
         self._player_repository = player_repository
         self._player_tournament_action_repository = player_tournament_action_repository
+        self._tournament_engine = tournament_engine
 
     async def execute(self, player_data: PlayerData) -> Tournament:
-        active_tournament = self._tournament_repository.find_active_tournament()
-        if not active_tournament:
+        active_state = await self._tournament_engine.get_active()
+        if not active_state:
             raise RuntimeError("Нельзя завершить турнир. Активный турнир не найден.")
 
         # Check if all players are eliminated
-        total_players = self._player_tournament_action_repository.count_total_players(
-            active_tournament.id
-        )
-        eliminated_count = (
-            self._player_tournament_action_repository.count_eliminated_players(
-                active_tournament.id
-            )
-        )
-
-        if total_players > eliminated_count:
-            active_players = (
-                self._player_tournament_action_repository.get_active_players(
-                    active_tournament.id
+        active_entries = active_state.active_entries()
+        if active_entries:
+            active_players = [
+                f"<b>{p.get_name()}</b> (@{p.get_user_name()}) /kick_player_{p.get_telegram_id()}"
+                for p in (
+                    entry.player for entry in active_entries[:ACTIVE_PLAYERS_LISTED]
+                )
+            ]
+            if len(active_entries) > ACTIVE_PLAYERS_LISTED:
+                active_players.append(
+                    f"… и ещё {len(active_entries) - ACTIVE_PLAYERS_LISTED} (/summary_tournament)"
                 )
-            )
             raise RuntimeError(
-                f"Нельзя завершить турнир. Ещё осталось {len(active_players)} активных игроков.\n\n"
+                f"Нельзя завершить турнир. Ещё осталось {len(active_entries)} активных игроков.\n\n"
                 f"Активные игроки:\n" + "\n".join(active_players)
             )
 
-        player = self._player_repository.get_or_create(player_data)
+        player = await self._player_repository.get_or_create(player_data)
+        active_tournament = await self._tournament_repository.find_by_id(
+            active_state.id
+        )
+        if not active_tournament:
+            raise RuntimeError("Нельзя завершить турнир. Активный турнир не найден.")
 
         active_tournament.end_time = datetime.now(timezone.utc)
         active_tournament.ended_player = player
 
-        self._tournament_repository.save(active_tournament)
+        await self._tournament_repository.save(active_tournament)
+        self._tournament_engine.tournament_ended(active_tournament.id)
         return active_tournament
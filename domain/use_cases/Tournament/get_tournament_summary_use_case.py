@@ -3,6 +3,7 @@ from domain.repository.tournament_repository import TournamentRepository
 from domain.repository.player_tournament_action_repository import (
     PlayerTournamentActionRepository,
 )
+from domain.service.tournament_engine import TournamentEngine
 
 
 class GetTournamentSummaryUseCase:
@@ -10,15 +11,24 @@ class GetTournamentSummaryUseCase:
         self,
         tournament_repository: TournamentRepository,
         player_tournament_action_repository: PlayerTournamentActionRepository,
+        tournament_engine: TournamentEngine,
     ) -> None:
         self._tournament_repository = tournament_repository
         self._player_tournament_action_repository = player_tournament_action_repository
+        self._tournament_engine = tournament_engine
 
-    async def execute(self) -> Dict[str, Any]:
-        tournament = self._tournament_repository.find_active_tournament()
+    async def execute(self, tournament_id: Optional[int] = None) -> Dict[str, Any]:
+        """Summary of the given tournament, by default the active or the latest one."""
+        # The active tournament comes from memory, a finished one from the database
+        tournament = await self._tournament_engine.get_active()
 
-        if not tournament:
-            tournament = self._tournament_repository.find_latest_tournament()
+        if tournament_id is not None and (
+            not tournament or tournament.id != tournament_id
+        ):
+            tournament = await self._tournament_repository.find_by_id(tournament_id)
+            status = "not_found"
+        elif not tournament:
+            tournament = await self._tournament_repository.find_latest_tournament()
             status = "not_found"
 
         if not tournament:
@@ -31,12 +41,11 @@ class GetTournamentSummaryUseCase:
 
         if tournament.is_tournament_ended():
             status = "finished"
-
-        actions = (
-            self._player_tournament_action_repository.find_actions_by_tournament_id(
+            actions = await self._player_tournament_action_repository.find_actions_by_tournament_id(
                 tournament.id
             )
-        )
+        else:
+            actions = list(tournament.entries.values())
 
         sorted_players = []
         for action in actions:
@@ -18,7 +18,7 @@ class KickPlayerUseCase:
     async def execute(
         self, telegram_id: int
     ) -> Tuple[Player, Optional[PlayerTournamentAction]]:
-        player = self._player_repository.find_by_telegram_id(telegram_id)
+        player = await self._player_repository.find_by_telegram_id(telegram_id)
         if not player:
             raise RuntimeError("Игрок не найден.")
 
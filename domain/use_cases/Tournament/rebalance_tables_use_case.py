@@ -0,0 +1,51 @@
+from typing import Any, Dict, Iterable
+
+from domain.repository.player_tournament_action_repository import (
+    PlayerTournamentActionRepository,
+)
+from domain.service.table_rebalancer import plan_rebalance
+from domain.service.tournament_engine import TournamentEngine
+
+
+class RebalanceTablesUseCase:
+    def __init__(
+        self,
+        player_tournament_action_repository: PlayerTournamentActionRepository,
+        tournament_engine: TournamentEngine,
+    ) -> None:
+        self._player_tournament_action_repository = player_tournament_action_repository
+        self._tournament_engine = tournament_engine
+
+    async def execute(self, eliminated_player_ids: Iterable[int]) -> Dict[str, Any]:
+        """Moves players between tables after the given players were eliminated.
+
+        The eliminations of the current update are not in the engine state
+        until it commits, so their player ids are passed in.
+        """
+        active_tournament = await self._tournament_engine.get_active()
+        if not active_tournament or not active_tournament.is_tournament_started():
+            return {"moves": [], "broken_tables": []}
+
+        eliminated = set(eliminated_player_ids)
+        remaining = {
+            player_id: entry
+            for player_id, entry in active_tournament.entries.items()
+            if entry.rank is None and player_id not in eliminated
+        }
+        plan = plan_rebalance(
+            {
+                player_id: (entry.table_number, entry.position_number)
+                for player_id, entry in remaining.items()
+            }
+        )
+        if plan.moves:
+            # Все пересадки сохраняются одним UPDATE
+            await self._player_tournament_action_repository.assign_seats(
+                active_tournament.id, plan.seats()
+            )
+            self._tournament_engine.players_seated(active_tournament.id, plan.seats())
+
+        return {
+            "moves": [(remaining[move.player_id].player, move) for move in plan.moves],
+            "broken_tables": plan.broken_tables,
+        }
@@ -5,6 +5,7 @@ from domain.repository.player_tournament_action_repository import (
 )
 from domain.repository.tournament_repository import TournamentRepository
 from domain.entity.player_tournament_action import PlayerTournamentAction
+from domain.service.tournament_engine import TournamentEngine
 
 
 class RegisterPlayerUseCase:
@@ -13,37 +14,41 @@ class RegisterPlayerUseCase:
         tournament_repository: TournamentRepository,
         player_repository: PlayerRepository,
         player_tournament_action_repository: PlayerTournamentActionRepository,
+        tournament_engine: TournamentEngine,
     ):
         self._tournament_repository = tournament_repository
         self._player_repository = player_repository
         self._player_tournament_action_repository = player_tournament_action_repository
+        self._tournament_engine = tournament_engine
 
     async def execute(self, player_data: PlayerData) -> PlayerTournamentAction:
-        active_tournament = self._tournament_repository.find_active_tournament()
+        # Repeated joins are answered from memory without touching the database
+        active_tournament = await self._tournament_engine.get_active()
         if not active_tournament:
             raise RuntimeError("Нет активного турнира. Нельзя зарегистрироваться.")
 
         if active_tournament.is_tournament_started():
             raise RuntimeError("Турнир уже начался. Регистрация закрыта.")
 
-        player = self._player_repository.get_or_create(player_data)
-
-        if self._player_tournament_action_repository.has_player_joined(
-            active_tournament.id, player.id
-        ):
+        entry = active_tournament.find_entry(player_data.telegram_id)
+        if entry and entry.rank is not None:
+            raise RuntimeError("Вы выбыли из турнира и не можете вернуться.")
+        if entry:
             raise RuntimeError(
                 "Вы уже участвуете в этом турнире. Нельзя зарегистрироваться повторно."
             )
 
-        # In the new session model, joined means we have a record.
-        # If we have a record and rank is not None, they are eliminated.
-        if self._player_tournament_action_repository.is_player_eliminated(
-            active_tournament.id, player.id
-        ):
-            raise RuntimeError("Вы выбыли из турнира и не можете вернуться.")
-
-        action = self._player_tournament_action_repository.register_player(
-            active_tournament.id, player.id
+        # A known player costs no query, so a join is usually the INSERT alone
+        player = await self._player_repository.get_or_create(player_data)
+        action = (
+            await self._player_tournament_action_repository.register_in_open_tournament(
+                player
+            )
         )
+        if not action:
+            # The database disagrees with the state in memory: reload it next time
+            self._tournament_engine.invalidate()
+            raise RuntimeError("Регистрация недоступна. Попробуйте ещё раз.")
 
+        self._tournament_engine.players_updated([action])
         return action
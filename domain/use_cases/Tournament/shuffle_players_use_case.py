@@ -4,6 +4,8 @@ from domain.repository.tournament_repository import TournamentRepository
 from domain.repository.player_tournament_action_repository import (
     PlayerTournamentActionRepository,
 )
+from domain.service.table_rebalancer import MAX_PLAYERS_PER_TABLE
+from domain.service.tournament_engine import TournamentEngine
 
 
 class ShufflePlayersUseCase:
@@ -11,34 +13,37 @@ class ShufflePlayersUseCase:
         self,
         tournament_repository: TournamentRepository,
         player_tournament_action_repository: PlayerTournamentActionRepository,
+        tournament_engine: TournamentEngine,
     ) -> None:
         self._tournament_repository = tournament_repository
         self._player_tournament_action_repository = player_tournament_action_repository
+        self._tournament_engine = tournament_engine
 
     async def execute(self) -> Dict[str, Any]:
-        tournament = self._tournament_repository.find_active_tournament()
-        if not tournament:
+        active_state = await self._tournament_engine.get_active()
+        if not active_state:
             raise RuntimeError("Нет активного турнира для перемешивания игроков.")
 
-        players = self._player_tournament_action_repository.find_active_player_entities(
-            tournament.id
-        )
+        players = [entry.player for entry in active_state.active_entries()]
 
         if not players:
             raise RuntimeError("В турнире пока нет активных игроков.")
 
-        if tournament.is_shuffled:
+        if active_state.is_shuffled:
             raise RuntimeError("Игроки уже были перемешаны для этого турнира.")
 
         # Shuffle players randomly
         random.shuffle(players)
 
+        tournament = await self._tournament_repository.find_by_id(active_state.id)
+        if not tournament:
+            raise RuntimeError("Нет активного турнира для перемешивания игроков.")
         tournament.make_tournament_started()
-        self._tournament_repository.save(tournament)
+        await self._tournament_repository.save(tournament)
 
         # Determine number of tables (max 9 players per table)
         num_players = len(players)
-        num_tables = (num_players + 8) // 9  # Equivalent to ceil(num_players / 9)
+        num_tables = -(-num_players // MAX_PLAYERS_PER_TABLE)  # ceil division
 
         # Divide players into tables as evenly as possible
         tables = []
@@ -52,12 +57,16 @@ class ShufflePlayersUseCase:
             tables.append(players[current_idx : current_idx + size])
             current_idx += size
 
-        # Update table and position assignments in repository
-        for i, table_players in enumerate(tables, 1):
-            for j, player in enumerate(table_players, 1):
-                self._player_tournament_action_repository.update_table_and_position_assignment(
-                    tournament.id, player.id, i, j
-                )
+        # Update table and position assignments with one bulk statement
+        seats = [
+            (player.id, i, j)
+            for i, table_players in enumerate(tables, 1)
+            for j, player in enumerate(table_players, 1)
+        ]
+        await self._player_tournament_action_repository.assign_seats(
+            tournament.id, seats
+        )
+        self._tournament_engine.tournament_started(tournament, seats)
 
         return {
             "tournament_id": tournament.id,
@@ -7,6 +7,7 @@ from domain.repository.tournament_repository import TournamentRepository
 
 
 from domain.repository.player_repository import PlayerRepository
+from domain.service.tournament_engine import TournamentEngine
 
 
 class StartTournamentUseCase:
@@ -14,18 +15,20 @@ class StartTournamentUseCase:
         self,
         tournament_repository: TournamentRepository,
         player_repository: PlayerRepository,
+        tournament_engine: TournamentEngine,
     ) -> None:
         self._tournament_repository = tournament_repository
         self._player_repository = player_repository
+        self._tournament_engine = tournament_engine
 
     async def execute(self, player_data: PlayerData) -> Tournament:
-        active_tournament = self._tournament_repository.find_active_tournament()
+        active_tournament = await self._tournament_engine.get_active()
         if active_tournament:
             raise RuntimeError(
                 f"Нельзя создать новый турнир. Турнир #{active_tournament.id} уже активен."
             )
 
-        player = self._player_repository.get_or_create(player_data)
+        player = await self._player_repository.get_or_create(player_data)
 
         new_tournament = Tournament(
             created_at=datetime.now(timezone.utc),
@@ -34,6 +37,7 @@ class StartTournamentUseCase:
             created_player=player,
         )
 
-        self._tournament_repository.save(new_tournament)
+        await self._tournament_repository.save(new_tournament)
+        self._tournament_engine.tournament_created(new_tournament)
 
         return new_tournament
@@ -1,8 +1,84 @@
-from sqlalchemy import create_engine
+import sqlalchemy
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from config import (
+    DATABASE_URL,
+    DATABASE_PRAGMAS,
+    DATABASE_READER_POOL,
+    DATABASE_WRITER_POOL,
+)
+
+POOL_SETTINGS = {"writer": DATABASE_WRITER_POOL, "reader": DATABASE_READER_POOL}
+
+
+def _is_file_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database not in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def _engine_options(url, role: str, poolclass) -> dict:
+    if not _is_file_sqlite(url):
+        return {}
+    return {"poolclass": poolclass, **POOL_SETTINGS[role]}
+
+
+def _apply_sqlite_pragmas(engine: sqlalchemy.Engine, pragmas: dict) -> None:
+    """Applies the pragmas to every new SQLite connection of the engine."""
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_db_engine(
+    url: str = DATABASE_URL, role: str = "writer", pragmas: dict | None = None
+) -> sqlalchemy.Engine:
+    """Creates a sync engine with the pool settings of the role ("writer" or "reader")."""
+    db_url = make_url(url)
+    engine = create_engine(db_url, **_engine_options(db_url, role, QueuePool))
+    if _is_file_sqlite(db_url):
+        _apply_sqlite_pragmas(engine, DATABASE_PRAGMAS if pragmas is None else pragmas)
+    return engine
+
+
+def create_async_db_engine(
+    url: str = DATABASE_URL, role: str = "writer", pragmas: dict | None = None
+) -> sqlalchemy.ext.asyncio.AsyncEngine:
+    """Async counterpart of create_db_engine; plain sqlite URLs use aiosqlite."""
+    db_url = make_url(url)
+    if db_url.drivername == "sqlite":
+        db_url = db_url.set(drivername="sqlite+aiosqlite")
+    engine = create_async_engine(
+        db_url, **_engine_options(db_url, role, AsyncAdaptedQueuePool)
+    )
+    if _is_file_sqlite(db_url):
+        _apply_sqlite_pragmas(
+            engine.sync_engine, DATABASE_PRAGMAS if pragmas is None else pragmas
+        )
+    return engine
+
 
 Base = declarative_base()
-Engine = create_engine("sqlite:///poker_bot.db")
+Engine = create_db_engine()
 Session = sessionmaker(bind=Engine)
-session = Session()
+
+# Асинхронный движок для обработчиков бота: запросы не блокируют event loop
+AsyncEngine = create_async_db_engine(role="writer")
+AsyncSession = async_sessionmaker(bind=AsyncEngine, expire_on_commit=False)
+
+# Отдельный пул для чтения из веб-API, чтобы читатели не занимали соединения бота
+ReadAsyncEngine = create_async_db_engine(role="reader")
+ReadAsyncSession = async_sessionmaker(bind=ReadAsyncEngine, expire_on_commit=False)
@@ -0,0 +1,210 @@
+"""
+Maintenance commands for the bot database.
+
+Usage (from the project root, config.json is required):
+    python manage.py migrate
+    python manage.py check-query-plans
+    python manage.py rebuild-ledger [--game-id ID]
+    python manage.py verify-ledger [--game-id ID]
+    python manage.py rebuild-stats
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import date
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import db_init  # noqa: F401  registers all models
+from engine import (
+    AsyncSession,
+    Base,
+    create_async_db_engine,
+    create_db_engine,
+    Engine,
+)
+from migrations import run_migrations
+from domain.repository.game_ledger_repository import GameLedgerRepository
+from domain.repository.game_repository import GameRepository
+from domain.repository.player_action_repository import PlayerActionRepository
+from domain.repository.player_stats_rollup_repository import (
+    PlayerStatsRollupRepository,
+)
+from domain.repository.player_tournament_action_repository import (
+    PlayerTournamentActionRepository,
+)
+from domain.repository.tournament_repository import TournamentRepository
+
+
+def migrate(_: argparse.Namespace) -> int:
+    Base.metadata.create_all(Engine)
+    applied = run_migrations(Engine)
+    print(f"Applied migrations: {applied}" if applied else "Schema is up to date.")
+    return 0
+
+
+# Hot queries of the bot: each must be served by an index, not a table scan
+HOT_QUERIES = [
+    ("buyin/quit: user balance", GameLedgerRepository, "get_balance", (1, 1)),
+    ("quit: bank chips", GameLedgerRepository, "get_bank", (1,)),
+    ("summary: game balances", GameLedgerRepository, "find_balances_by_game", (1,)),
+    ("stats: lifetime", PlayerStatsRollupRepository, "get_totals", (1,)),
+    (
+        "stats: date range",
+        PlayerStatsRollupRepository,
+        "get_totals",
+        (1, date(2024, 1, 15), date(2024, 3, 10)),
+    ),
+    ("log: last actions", PlayerActionRepository, "find_last_actions", (20,)),
+    ("active game", GameRepository, "find_active_game", ()),
+    ("active tournament", TournamentRepository, "find_active_tournament", ()),
+    (
+        "tournament player",
+        PlayerTournamentActionRepository,
+        "find_action",
+        (1, 1),
+    ),
+    (
+        "tournament players",
+        PlayerTournamentActionRepository,
+        "count_total_players",
+        (1,),
+    ),
+    (
+        "tournament eliminated players",
+        PlayerTournamentActionRepository,
+        "count_eliminated_players",
+        (1,),
+    ),
+]
+
+
+async def _capture_hot_queries(url: str) -> list:
+    """Runs the hot repository methods and records the SELECTs they issue."""
+    engine = create_async_db_engine(url)
+    captured = []
+    label = None
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((label, statement, parameters))
+
+    try:
+        async with async_sessionmaker(bind=engine)() as session:
+            for label, repository_class, method, args in HOT_QUERIES:
+                await getattr(repository_class(session), method)(*args)
+    finally:
+        await engine.dispose()
+    return captured
+
+
+def find_full_scans(path: str, captured: list) -> list:
+    """Returns (label, plan detail) for every step that scans a whole table."""
+    full_scans = []
+    with sqlite3.connect(path) as connection:
+        for label, statement, parameters in captured:
+            plan = connection.execute(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            ).fetchall()
+            for row in plan:
+                detail = row[-1]
+                if detail.startswith("SCAN ") and " USING " not in detail:
+                    full_scans.append((label, detail))
+    return full_scans
+
+
+def check_query_plans(_: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "query_plans.db")
+        url = f"sqlite:///{path}"
+        engine = create_db_engine(url)
+        Base.metadata.create_all(engine)
+        run_migrations(engine)
+        engine.dispose()
+
+        captured = asyncio.run(_capture_hot_queries(url))
+        full_scans = find_full_scans(path, captured)
+
+    for label, detail in full_scans:
+        print(f"FULL SCAN in '{label}': {detail}")
+    if full_scans:
+        return 1
+
+    print(f"OK: {len(captured)} hot queries use indexes.")
+    return 0
+
+
+async def _rebuild_ledger(game_id) -> None:
+    async with AsyncSession() as session:
+        await GameLedgerRepository(session).rebuild(game_id)
+        await session.commit()
+
+
+def rebuild_ledger(args: argparse.Namespace) -> int:
+    asyncio.run(_rebuild_ledger(args.game_id))
+    print("Ledger rebuilt from player actions.")
+    return 0
+
+
+async def _verify_ledger(game_id) -> list:
+    async with AsyncSession() as session:
+        return await GameLedgerRepository(session).verify(game_id)
+
+
+def verify_ledger(args: argparse.Namespace) -> int:
+    mismatches = asyncio.run(_verify_ledger(args.game_id))
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch}")
+    if mismatches:
+        return 1
+
+    print("OK: ledger matches player actions.")
+    return 0
+
+
+async def _rebuild_stats() -> None:
+    async with AsyncSession() as session:
+        await PlayerStatsRollupRepository(session).rebuild()
+        await session.commit()
+
+
+def rebuild_stats(_: argparse.Namespace) -> int:
+    asyncio.run(_rebuild_stats())
+    print("Player statistics rollups rebuilt from player actions.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("migrate", help="apply pending schema migrations").set_defaults(
+        handler=migrate
+    )
+    commands.add_parser(
+        "check-query-plans", help="fail if a hot query scans a whole table"
+    ).set_defaults(handler=check_query_plans)
+    for name, handler, help_text in [
+        ("rebuild-ledger", rebuild_ledger, "recompute game ledgers from actions"),
+        ("verify-ledger", verify_ledger, "fail if a game ledger drifted from actions"),
+    ]:
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--game-id", type=int, help="only this game")
+        command.set_defaults(handler=handler)
+    commands.add_parser(
+        "rebuild-stats", help="recompute player statistics rollups from actions"
+    ).set_defaults(handler=rebuild_stats)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
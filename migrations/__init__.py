@@ -0,0 +1,66 @@
+"""
+Versioned schema migrations.
+
+Every migration is a module of this package named ``mNNNN_<description>.py``
+with an ``upgrade(connection)`` function. Applied versions are recorded in the
+``schema_version`` table, so ``db_init.init_db`` upgrades existing databases
+in place. Each migration runs in its own transaction.
+"""
+
+import importlib
+import logging
+import pkgutil
+import re
+from datetime import datetime, timezone
+from types import ModuleType
+from typing import List, Tuple
+
+from sqlalchemy import Column, DateTime, Engine, Integer, MetaData, Table, select
+
+logger = logging.getLogger(__name__)
+
+_MODULE_NAME = re.compile(r"^m(\d{4})_\w+$")
+
+metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    metadata,
+    Column("version", Integer, primary_key=True),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def get_migrations() -> List[Tuple[int, ModuleType]]:
+    """Returns all migrations of the package ordered by version."""
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        match = _MODULE_NAME.match(module_info.name)
+        if match:
+            module = importlib.import_module(f"{__name__}.{module_info.name}")
+            migrations.append((int(match.group(1)), module))
+    return sorted(migrations, key=lambda migration: migration[0])
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """Applies pending migrations and returns the versions that were applied."""
+    metadata.create_all(engine)
+
+    with engine.connect() as connection:
+        applied = set(connection.scalars(select(schema_version.c.version)))
+
+    newly_applied = []
+    for version, module in get_migrations():
+        if version in applied:
+            continue
+
+        logger.info("Applying migration %s", module.__name__)
+        with engine.begin() as connection:
+            module.upgrade(connection)
+            connection.execute(
+                schema_version.insert().values(
+                    version=version, applied_at=datetime.now(timezone.utc)
+                )
+            )
+        newly_applied.append(version)
+
+    return newly_applied
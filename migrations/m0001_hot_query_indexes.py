@@ -0,0 +1,34 @@
+"""Indexes for the hot query paths and one registration per tournament player."""
+
+from sqlalchemy import Connection, text
+
+
+def upgrade(connection: Connection) -> None:
+    # Keep only the first registration of a player before enforcing uniqueness
+    connection.execute(
+        text(
+            "DELETE FROM player_tournament_actions WHERE id NOT IN ("
+            " SELECT MIN(id) FROM player_tournament_actions"
+            " GROUP BY tournament_id, player_id)"
+        )
+    )
+
+    statements = [
+        "CREATE INDEX IF NOT EXISTS ix_player_actions_game_user_action"
+        " ON player_actions (game_id, user_id, action)",
+        "CREATE INDEX IF NOT EXISTS ix_player_actions_user_action"
+        " ON player_actions (user_id, action, game_id, amount)",
+        "CREATE INDEX IF NOT EXISTS ix_player_actions_timestamp"
+        " ON player_actions (timestamp)",
+        "CREATE INDEX IF NOT EXISTS ix_games_active"
+        " ON games (id) WHERE end_time IS NULL",
+        "CREATE INDEX IF NOT EXISTS ix_tournaments_active"
+        " ON tournaments (id) WHERE end_time IS NULL",
+        "CREATE UNIQUE INDEX IF NOT EXISTS"
+        " uq_player_tournament_actions_tournament_player"
+        " ON player_tournament_actions (tournament_id, player_id)",
+        "CREATE INDEX IF NOT EXISTS ix_player_tournament_actions_tournament_rank"
+        " ON player_tournament_actions (tournament_id, rank)",
+    ]
+    for statement in statements:
+        connection.execute(text(statement))
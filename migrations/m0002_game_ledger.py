@@ -0,0 +1,30 @@
+"""Fill the per-game ledger (player balances and bank) from existing actions."""
+
+from sqlalchemy import Connection, text
+
+
+def upgrade(connection: Connection) -> None:
+    statements = [
+        "DELETE FROM game_player_balance",
+        "DELETE FROM game_bank",
+        "INSERT INTO game_player_balance"
+        " (game_id, user_id, buyin_count, buyin_amount, quit_chips, quit_amount)"
+        " SELECT game_id, user_id,"
+        " COUNT(CASE WHEN action = 'buyin' THEN id END),"
+        " COALESCE(SUM(CASE WHEN action = 'buyin' THEN amount END), 0),"
+        " COALESCE(SUM(CASE WHEN action = 'quit' THEN chips END), 0),"
+        " COALESCE(SUM(CASE WHEN action = 'quit' THEN amount END), 0)"
+        " FROM player_actions WHERE action IN ('buyin', 'quit')"
+        " GROUP BY game_id, user_id",
+        "INSERT INTO game_bank"
+        " (game_id, buyin_chips, buyin_amount, quit_chips, quit_amount)"
+        " SELECT game_id,"
+        " COALESCE(SUM(CASE WHEN action = 'buyin' THEN chips END), 0),"
+        " COALESCE(SUM(CASE WHEN action = 'buyin' THEN amount END), 0),"
+        " COALESCE(SUM(CASE WHEN action = 'quit' THEN chips END), 0),"
+        " COALESCE(SUM(CASE WHEN action = 'quit' THEN amount END), 0)"
+        " FROM player_actions WHERE action IN ('buyin', 'quit')"
+        " GROUP BY game_id",
+    ]
+    for statement in statements:
+        connection.execute(text(statement))
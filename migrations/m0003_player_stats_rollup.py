@@ -0,0 +1,67 @@
+"""Fill daily and monthly player statistics rollups from existing actions."""
+
+from datetime import date, datetime
+from typing import Tuple
+
+import pytz
+from sqlalchemy import Connection, Date, DateTime, bindparam, text
+
+from config import TIMEZONE
+
+
+def _buckets(timestamp: datetime) -> Tuple[date, date]:
+    if timestamp.tzinfo is None:
+        timestamp = pytz.utc.localize(timestamp)
+    day = timestamp.astimezone(pytz.timezone(TIMEZONE)).date()
+    return day, day.replace(day=1)
+
+
+def upgrade(connection: Connection) -> None:
+    connection.execute(text("DELETE FROM player_stats_rollup"))
+
+    actions = connection.execute(
+        text(
+            "SELECT game_id, user_id, action, amount, timestamp"
+            " FROM player_actions ORDER BY timestamp, id"
+        ).columns(timestamp=DateTime(timezone=True))
+    )
+
+    # A game counts in the bucket of the first action of the player in it
+    rollups = {}
+    games_seen = set()
+    for game_id, user_id, action, amount, timestamp in actions:
+        new_game = (game_id, user_id) not in games_seen
+        games_seen.add((game_id, user_id))
+        if not new_game and action not in ("buyin", "quit"):
+            continue
+
+        for period, bucket in zip(("day", "month"), _buckets(timestamp)):
+            row = rollups.setdefault(
+                (user_id, period, bucket),
+                {
+                    "user_id": user_id,
+                    "period": period,
+                    "bucket": bucket,
+                    "games": 0,
+                    "buyin_count": 0,
+                    "buyin_amount": 0.0,
+                    "quit_amount": 0.0,
+                },
+            )
+            row["games"] += 1 if new_game else 0
+            if action == "buyin":
+                row["buyin_count"] += 1
+                row["buyin_amount"] += amount or 0.0
+            elif action == "quit":
+                row["quit_amount"] += amount or 0.0
+
+    if rollups:
+        connection.execute(
+            text(
+                "INSERT INTO player_stats_rollup"
+                " (user_id, period, bucket, games, buyin_count, buyin_amount,"
+                " quit_amount) VALUES (:user_id, :period, :bucket, :games,"
+                " :buyin_count, :buyin_amount, :quit_amount)"
+            ).bindparams(bindparam("bucket", type_=Date)),
+            list(rollups.values()),
+        )
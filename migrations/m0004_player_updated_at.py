@@ -0,0 +1,18 @@
+"""Time of the last name change of every player (version of the player names)."""
+
+from sqlalchemy import Connection, inspect, text
+
+
+def upgrade(connection: Connection) -> None:
+    # New databases already get the column from create_all
+    columns = {column["name"] for column in inspect(connection).get_columns("players")}
+    if "updated_at" not in columns:
+        connection.execute(
+            text("ALTER TABLE players ADD COLUMN updated_at TIMESTAMP WITH TIME ZONE")
+        )
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_players_updated_at"
+            " ON players (updated_at)"
+        )
+    )
@@ -0,0 +1,48 @@
+"""Recount the games of the player statistics rollups: every game with any
+action of the player, as /mystats counted them before the rollups."""
+
+from collections import Counter
+from datetime import date, datetime
+from typing import Tuple
+
+import pytz
+from sqlalchemy import Connection, Date, DateTime, bindparam, text
+
+from config import TIMEZONE
+
+
+def _buckets(timestamp: datetime) -> Tuple[date, date]:
+    if timestamp.tzinfo is None:
+        timestamp = pytz.utc.localize(timestamp)
+    day = timestamp.astimezone(pytz.timezone(TIMEZONE)).date()
+    return day, day.replace(day=1)
+
+
+def upgrade(connection: Connection) -> None:
+    # A game counts in the bucket of the first action of the player in it
+    first_actions = connection.execute(
+        text(
+            "SELECT user_id, MIN(timestamp) AS first_action FROM player_actions"
+            " GROUP BY game_id, user_id"
+        ).columns(first_action=DateTime(timezone=True))
+    )
+    games = Counter()
+    for user_id, first_action in first_actions:
+        for period, bucket in zip(("day", "month"), _buckets(first_action)):
+            games[user_id, period, bucket] += 1
+
+    connection.execute(text("UPDATE player_stats_rollup SET games = 0"))
+    if games:
+        connection.execute(
+            text(
+                "INSERT INTO player_stats_rollup"
+                " (user_id, period, bucket, games, buyin_count, buyin_amount,"
+                " quit_amount) VALUES (:user_id, :period, :bucket, :games, 0, 0, 0)"
+                " ON CONFLICT (user_id, period, bucket)"
+                " DO UPDATE SET games = excluded.games"
+            ).bindparams(bindparam("bucket", type_=Date)),
+            [
+                {"user_id": user_id, "period": period, "bucket": bucket, "games": count}
+                for (user_id, period, bucket), count in games.items()
+            ],
+        )
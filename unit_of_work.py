@@ -0,0 +1,209 @@
+"""
+Unit of work module.
+
+Every Telegram update is processed inside its own unit of work: a fresh
+AsyncSession is opened for the update, shared by all repositories and use
+cases that run while handling it, and committed (or rolled back) once when
+the update is done. Repositories receive the scoped session registry, so the
+DI graph can still be built once at startup. Effects that may only happen
+once the changes are stored (replies, ``bot_data``) are staged with
+``call_after_commit``.
+"""
+
+import asyncio
+import contextvars
+import inspect
+import logging
+from contextlib import AsyncExitStack, asynccontextmanager
+from contextvars import ContextVar, Token
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_scoped_session
+from sqlalchemy.orm import Session
+from telegram.ext import SimpleUpdateProcessor
+
+from engine import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+_current_unit_of_work: ContextVar[Optional["UnitOfWork"]] = ContextVar(
+    "current_unit_of_work", default=None
+)
+
+
+def _scope_key() -> "UnitOfWork":
+    unit_of_work = _current_unit_of_work.get()
+    if unit_of_work is None:
+        raise RuntimeError("Database session requested outside of a unit of work.")
+    return unit_of_work
+
+
+ScopedSession = async_scoped_session(AsyncSession, scopefunc=_scope_key)
+
+# Действия, ожидающие коммита сессии
+_AFTER_COMMIT_KEY = "unit_of_work_after_commit"
+# Задачи, отправляющие сообщения после коммита (ссылки держатся до их завершения)
+_after_commit_tasks: Set[asyncio.Task] = set()
+
+
+class UnitOfWork:
+    """Opens a session scope, commits it on success and rolls it back on error.
+
+    Nested units of work join the outer one, so only the outermost scope
+    commits.
+    """
+
+    def __init__(self) -> None:
+        self.rollback_only = False
+        self._outer: Optional[UnitOfWork] = None
+        self._token: Optional[Token[Optional[UnitOfWork]]] = None
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self._outer = _current_unit_of_work.get()
+        if self._outer is not None:
+            return self._outer
+
+        self._token = _current_unit_of_work.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._outer is not None:
+            if exc_type is not None:
+                self._outer.rollback_only = True
+            return
+
+        try:
+            if exc_type is None and not self.rollback_only:
+                await ScopedSession.commit()
+            else:
+                await ScopedSession.rollback()
+        finally:
+            await ScopedSession.remove()
+            if self._token is not None:
+                _current_unit_of_work.reset(self._token)
+
+
+def call_after_commit(callback: Callable[[], Any]) -> None:
+    """Calls ``callback`` once the current unit of work commits.
+
+    For effects the transaction must not outlive: a reply saying that an
+    action was recorded, ``bot_data`` pointing at a new row. On rollback the
+    callback is dropped. Plain callbacks run inside the commit; coroutines
+    they return are awaited afterwards in one task, in the order staged.
+    """
+    ScopedSession().info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session) -> None:
+    if session.in_nested_transaction():
+        return  # savepoint: the outer transaction may still roll back
+    awaitables = []
+    for callback in session.info.pop(_AFTER_COMMIT_KEY, []):
+        try:
+            result = callback()
+        except Exception:
+            logger.exception("After-commit callback failed")
+            continue
+        if inspect.isawaitable(result):
+            awaitables.append(result)
+    if awaitables:
+        # Вне единицы работы: сессия этого обновления уже закрывается
+        task = asyncio.get_running_loop().create_task(
+            _await_in_order(awaitables), context=contextvars.Context()
+        )
+        _after_commit_tasks.add(task)
+        task.add_done_callback(_after_commit_tasks.discard)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_after_commit(session: Session, previous_transaction) -> None:
+    if previous_transaction.nested:
+        return  # a rolled back savepoint: the outer transaction may still commit
+    session.info.pop(_AFTER_COMMIT_KEY, None)
+
+
+async def _await_in_order(awaitables: List[Awaitable[Any]]) -> None:
+    for awaitable in awaitables:
+        try:
+            await awaitable
+        except Exception:
+            logger.exception("After-commit callback failed")
+
+
+def mark_rollback_only() -> None:
+    """Makes the current unit of work roll back instead of committing."""
+    unit_of_work = _current_unit_of_work.get()
+    if unit_of_work is not None:
+        unit_of_work.rollback_only = True
+
+
+async def rollback_on_error(update: object, context: Any) -> None:
+    """Application error handler: discards the changes of the failed update."""
+    mark_rollback_only()
+    logger.error("Exception while handling an update", exc_info=context.error)
+
+
+class UnitOfWorkUpdateProcessor(SimpleUpdateProcessor):
+    """Runs every update inside its own unit of work.
+
+    Up to ``max_concurrent_updates`` updates run at the same time. Updates
+    that share an ordering key (returned by ``ordering_keys``, e.g. "game")
+    run one after another in arrival order, including their commit, so a
+    check-then-write in one of them never interleaves with another. Updates
+    waiting for a key do not take a slot from the others; at most
+    ``max_pending_updates`` updates are accepted before new ones wait.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_updates: int,
+        ordering_keys: Optional[Callable[[object], Iterable[Hashable]]] = None,
+        max_pending_updates: int = 256,
+    ) -> None:
+        # Семафор базового класса ограничивает принятые обновления, свой — запущенные
+        super().__init__(max(max_pending_updates, max_concurrent_updates))
+        self._running = asyncio.Semaphore(max_concurrent_updates)
+        self._ordering_keys = ordering_keys or (lambda update: ())
+        # Замок ключа и число обновлений, которые его держат или ждут
+        self._key_locks: Dict[Hashable, Tuple[asyncio.Lock, int]] = {}
+
+    @asynccontextmanager
+    async def _hold_key(self, key: Hashable) -> AsyncIterator[None]:
+        lock, users = self._key_locks.get(key) or (asyncio.Lock(), 0)
+        self._key_locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._key_locks[key]
+            if users == 1:
+                # Никто больше не ждёт этот ключ — замок больше не нужен
+                del self._key_locks[key]
+            else:
+                self._key_locks[key] = (lock, users - 1)
+
+    async def do_process_update(
+        self, update: object, coroutine: Awaitable[Any]
+    ) -> None:
+        async with AsyncExitStack() as stack:
+            # Ключи берутся в одном порядке, чтобы обновления не ждали друг друга по кругу
+            for key in sorted(set(self._ordering_keys(update)), key=str):
+                await stack.enter_async_context(self._hold_key(key))
+            await stack.enter_async_context(self._running)
+
+            async with UnitOfWork():
+                await coroutine
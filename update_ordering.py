@@ -0,0 +1,47 @@
+"""
+Ordering keys of incoming updates.
+
+Updates are processed concurrently (see ``UnitOfWorkUpdateProcessor``).
+Commands that read and then change the current game or the active
+tournament get the key of that game or tournament, so they run one after
+another: ``quit`` checks the bank before recording the quit, elimination
+computes the rank from the number of players still in the game. Updates of
+one user are kept in order as well, because confirmations rely on
+``user_data`` left by the previous update. Everything else runs in parallel.
+"""
+
+import re
+from typing import Hashable, List
+
+from telegram import Update
+
+GAME_KEY = "game"
+TOURNAMENT_KEY = "tournament"
+
+_COMMAND = r"^\s*/({})(@\w+)?(\s|$)"
+
+GAME_COMMANDS = re.compile(_COMMAND.format("buyin|quit|startgame|endgame"))
+GAME_CONFIRMATIONS = re.compile(r"^(Да, вывести (0|\d{4,5})|Да, завершить игру)$")
+TOURNAMENT_COMMANDS = re.compile(
+    _COMMAND.format(
+        "start_tournament|end_tournament|join_tournament|leave_tournament"
+        r"|shuffle_players|kick_player_\d+|bust|bust_tie"
+    )
+)
+
+
+def ordering_keys(update: object) -> List[Hashable]:
+    if not isinstance(update, Update):
+        return []
+
+    keys = []
+    if update.effective_user:
+        keys.append(("user", update.effective_user.id))
+
+    message = update.effective_message
+    text = message.text if message and message.text else ""
+    if GAME_COMMANDS.match(text) or GAME_CONFIRMATIONS.match(text):
+        keys.append(GAME_KEY)
+    elif TOURNAMENT_COMMANDS.match(text):
+        keys.append(TOURNAMENT_KEY)
+    return keys
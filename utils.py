@@ -25,7 +25,35 @@ def format_datetime_by_format(dt: datetime, format) -> str:
     return dt.astimezone(timezone).strftime(format)
 
 
+def escape_html(text: str) -> str:
+    return (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+        .replace("'", "&apos;")
+        .replace("/", "&#47;")
+    )
+
+
+def format_display_name(name: str | None, username: str | None) -> str | None:
+    """
+    Имя игрока для сообщений: имя и фамилия, иначе @username, иначе None.
+    """
+    if name:
+        return escape_html(name)
+    if username:
+        return f"@{username}"
+    return None
+
+
 async def get_user_info(user_id: int, context: ContextTypes.DEFAULT_TYPE) -> str | None:
+    # Справочник имён отвечает из памяти или БД и обращается к Telegram
+    # только для незнакомых пользователей
+    directory = context.bot_data.get("player_name_directory")
+    if directory is not None:
+        return await directory.get_name(user_id, context.bot)
+
     try:
         # Получаем информацию о пользователе
         user = await context.bot.get_chat(user_id)
@@ -34,23 +62,9 @@ async def get_user_info(user_id: int, context: ContextTypes.DEFAULT_TYPE) -> str
         if user.first_name or user.last_name:
             name_parts = []
             if user.first_name:
-                name_parts.append(
-                    user.first_name.replace("&", "&amp;")
-                    .replace("<", "&lt;")
-                    .replace(">", "&gt;")
-                    .replace('"', "&quot;")
-                    .replace("'", "&apos;")
-                    .replace("/", "&#47;")
-                )
+                name_parts.append(escape_html(user.first_name))
             if user.last_name:
-                name_parts.append(
-                    user.last_name.replace("&", "&amp;")
-                    .replace("<", "&lt;")
-                    .replace(">", "&gt;")
-                    .replace('"', "&quot;")
-                    .replace("'", "&apos;")
-                    .replace("/", "&#47;")
-                )
+                name_parts.append(escape_html(user.last_name))
             return " ".join(name_parts)
 
         # Если имя и фамилия отсутствуют, используем username
@@ -66,7 +80,19 @@ async def get_user_info(user_id: int, context: ContextTypes.DEFAULT_TYPE) -> str
         return None
 
 
-from engine import Session
+async def get_user_infos(
+    user_ids: list[int], context: ContextTypes.DEFAULT_TYPE
+) -> dict[int, str | None]:
+    """
+    Имена нескольких пользователей сразу: один запрос к БД для всех, кого нет в кэше.
+    """
+    directory = context.bot_data.get("player_name_directory")
+    if directory is not None:
+        return await directory.get_names(user_ids, context.bot)
+    return {user_id: await get_user_info(user_id, context) for user_id in user_ids}
+
+
+from engine import AsyncSession
 from domain.repository.tournament_repository import TournamentRepository
 from telegram import BotCommandScopeAllPrivateChats
 
@@ -82,10 +108,10 @@ def ensure_aware(dt: datetime) -> datetime:
 
 async def setup_bot_commands(bot) -> None:
     """Sets bot commands based on the current state (e.g., active tournament)."""
-    db_session = Session()
+    db_session = AsyncSession()
     try:
         has_active_tournament = (
-            TournamentRepository(db_session).find_active_tournament() is not None
+            await TournamentRepository(db_session).find_active_tournament() is not None
         )
 
         commands = [
@@ -108,4 +134,4 @@ async def setup_bot_commands(bot) -> None:
             scope=BotCommandScopeAllPrivateChats(),
         )
     finally:
-        db_session.close()
+        await db_session.close()
@@ -5,16 +5,39 @@ async function fetchUsers() {
     return await res.json();
 }
 
-async function fetchUserActions(userId) {
-    const res = await fetch(`${API_URL}/api/stats/${userId}/actions`);
+const TOURNAMENTS_PAGE_SIZE = 100;
+
+async function fetchRoiHistory(userId, { from, to, points }) {
+    const query = new URLSearchParams();
+    if (from) query.set("from", from);
+    if (to) query.set("to", to);
+    if (points) query.set("points", points);
+    const res = await fetch(`${API_URL}/api/stats/${userId}/roi_history?${query}`);
+    if (!res.ok) throw new Error("ROI history not available");
     return await res.json();
 }
 
-async function fetchTournaments() {
-    const res = await fetch(`${API_URL}/api/tournaments`);
+async function fetchLeaderboard({ from, to, minGames, sort }) {
+    const query = new URLSearchParams({ min_games: minGames, sort });
+    if (from) query.set("from", from);
+    if (to) query.set("to", to);
+    const res = await fetch(`${API_URL}/api/leaderboard?${query}`);
     return await res.json();
 }
 
+async function* fetchTournamentPages() {
+    // Keyset pagination: the next page cursor comes in the X-Next-Cursor header;
+    // every page is yielded as soon as it arrives
+    let cursor = null;
+    do {
+        const query = new URLSearchParams({ limit: TOURNAMENTS_PAGE_SIZE });
+        if (cursor) query.set("cursor", cursor);
+        const res = await fetch(`${API_URL}/api/tournaments?${query}`);
+        yield await res.json();
+        cursor = res.headers.get("X-Next-Cursor");
+    } while (cursor);
+}
+
 async function fetchTournamentDetails(id) {
     const res = await fetch(`${API_URL}/api/tournaments/${id}`);
     if (!res.ok) throw new Error("Tournament not found");
@@ -1,3 +1,6 @@
+// Points of the ROI curve requested from the server
+const ROI_CHART_POINTS = 300;
+
 function userStatsTable() {
     return {
         users: [],
@@ -5,6 +8,7 @@ function userStatsTable() {
         sortField: "roi",
         sortAsc: false,
         hideSmallSample: true,
+        leaderboardRequest: 0,
 
         // Main table date filter
         tableStartDate: '',
@@ -29,41 +33,41 @@ function userStatsTable() {
 
         async init() {
             // Set default dates for main table: current year
-            const now = new Date();
-            const startOfYear = new Date(now.getFullYear(), 0, 1);
+            this.setThisYear();
+            await this.loadLeaderboard();
 
-            this.tableStartDate = formatDate(startOfYear);
-            this.tableEndDate = formatDate(now);
-
-            // Fetch users
-            const userList = await fetchUsers();
-
-            // Fetch full actions history for each user
-            const enriched = await Promise.all(
-                userList.users.map(async (user) => {
-                    try {
-                        const data = await fetchUserActions(user.user_id);
-                        return { ...user, actions: data.actions };
-                    } catch (e) {
-                        console.error("Error fetching actions for user:", user.user_id, e);
-                        return { ...user, actions: [] };
-                    }
-                })
-            );
-
-            this.users = enriched;
+            // The server aggregates and sorts; reload when the query changes
+            for (const field of ['tableStartDate', 'tableEndDate', 'hideSmallSample', 'sortField', 'sortAsc']) {
+                this.$watch(field, () => this.loadLeaderboard());
+            }
         },
 
-        setAllTime() {
-            let earliest = new Date();
-            this.users.forEach(u => {
-                u.actions.forEach(a => {
-                    const d = new Date(a.timestamp * 1000);
-                    if (d < earliest) earliest = d;
+        async loadLeaderboard() {
+            const sort = (this.sortAsc ? '' : '-') + this.sortField;
+            // Only the latest request updates the table
+            const request = ++this.leaderboardRequest;
+            try {
+                const data = await fetchLeaderboard({
+                    from: this.tableStartDate,
+                    to: this.tableEndDate,
+                    minGames: this.hideSmallSample ? 3 : 0,
+                    sort,
                 });
-            });
+                if (request !== this.leaderboardRequest) return;
+                this.users = data.players.map(p => ({
+                    user_id: p.user_id,
+                    username: p.username,
+                    displayStats: p,
+                }));
+            } catch (e) {
+                console.error("Error fetching leaderboard:", e);
+                this.users = [];
+            }
+        },
 
-            this.tableStartDate = formatDate(earliest);
+        setAllTime() {
+            // No start date: the whole history
+            this.tableStartDate = '';
             this.tableEndDate = formatDate(new Date());
         },
 
@@ -84,34 +88,12 @@ function userStatsTable() {
         },
 
         get filteredAndSorted() {
-            // Add displayStats to each user based on current table date range
-            const withStats = this.users.map(u => ({
-                ...u,
-                displayStats: calculateStats(u.actions, this.tableStartDate, this.tableEndDate)
-            }));
-
-            const filtered = withStats.filter((u) => {
+            // Rows come sorted and filtered by sample size from the server
+            const search = this.search.toLowerCase();
+            return this.users.filter((u) => {
                 const name = u.username?.toLowerCase() ?? "";
                 const id = u.user_id.toString();
-                const nameMatches =
-                    name.includes(this.search.toLowerCase()) || id.includes(this.search);
-                const sampleOk = !this.hideSmallSample || u.displayStats.games_played >= 3;
-                return nameMatches && sampleOk;
-            });
-
-            return filtered.sort((a, b) => {
-                let valA, valB;
-                if (this.sortField === 'username') {
-                    valA = a.username || a.user_id.toString();
-                    valB = b.username || b.user_id.toString();
-                    if (valA === valB) return 0;
-                    return this.sortAsc ? valA.localeCompare(valB) : valB.localeCompare(valA);
-                } else {
-                    valA = a.displayStats[this.sortField];
-                    valB = b.displayStats[this.sortField];
-                    if (valA === valB) return 0;
-                    return this.sortAsc ? valA - valB : valB - valA;
-                }
+                return name.includes(search) || id.includes(this.search);
             });
         },
 
@@ -120,11 +102,11 @@ function userStatsTable() {
             this.showRoiModal = true;
 
             try {
-                this.roiData = calculateRoiHistory(user.actions);
+                const data = await fetchRoiHistory(user.user_id, { points: ROI_CHART_POINTS });
+                this.roiData = data.points;
 
                 // Set dates based on data
                 if (this.roiData.length > 0) {
-                    // Data is already sorted by date in calculateRoiHistory
                     this.startDate = this.roiData[0].date;
                     this.endDate = this.roiData[this.roiData.length - 1].date;
                 } else {
@@ -135,7 +117,7 @@ function userStatsTable() {
 
                 // Wait for modal to render canvas
                 this.$nextTick(() => {
-                    this.updateChart();
+                    this.renderChart();
                 });
             } catch (e) {
                 console.error(e);
@@ -152,23 +134,28 @@ function userStatsTable() {
             }
         },
 
-        get filteredRoiData() {
-            if (!this.roiData) return [];
-            const start = new Date(this.startDate).getTime();
-            const end = new Date(this.endDate).getTime();
-
-            return this.roiData.filter(item => {
-                const itemDate = new Date(item.date).getTime();
-                return itemDate >= start && itemDate <= end;
-            });
+        async updateChart() {
+            // The server downsamples the chosen period to the chart size
+            try {
+                const data = await fetchRoiHistory(this.chartUser.user_id, {
+                    from: this.startDate,
+                    to: this.endDate,
+                    points: ROI_CHART_POINTS,
+                });
+                this.roiData = data.points;
+            } catch (e) {
+                console.error(e);
+                return;
+            }
+            this.renderChart();
         },
 
-        updateChart() {
+        renderChart() {
             const ctx = document.getElementById('roiChart').getContext('2d');
             if (this.chartInstance) {
                 this.chartInstance.destroy();
             }
-            this.chartInstance = renderRoiChart(ctx, this.filteredRoiData, this.chartUser.username ?? this.chartUser.user_id);
+            this.chartInstance = renderRoiChart(ctx, this.roiData, this.chartUser.username ?? this.chartUser.user_id);
         }
     };
 }
@@ -0,0 +1,60 @@
+"""
+Webhook mode.
+
+Telegram delivers updates to ``WEBHOOK_PATH`` of the ASGI app (``asgi.py``),
+which puts them into ``Application.update_queue``. The bot and the API then
+share one process and event loop. ``bot_main.py`` (polling) remains the
+fallback: starting it removes the webhook.
+"""
+
+import hmac
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from telegram import Update
+from telegram.ext import Application
+
+WEBHOOK_PATH = "/telegram/webhook"
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+async def start_application(
+    application: Application, webhook_url: str | None, secret: str
+) -> None:
+    """Runs the same start sequence as ``run_polling``, without the updater."""
+    await application.initialize()
+    if application.post_init:
+        await application.post_init(application)
+    await application.start()
+    if webhook_url:
+        await application.bot.set_webhook(
+            webhook_url.rstrip("/") + WEBHOOK_PATH,
+            secret_token=secret,
+            allowed_updates=Update.ALL_TYPES,
+        )
+
+
+async def stop_application(application: Application) -> None:
+    await application.stop()
+    if application.post_stop:
+        await application.post_stop(application)
+    await application.shutdown()
+    if application.post_shutdown:
+        await application.post_shutdown(application)
+
+
+def create_webhook_router(secret: str) -> APIRouter:
+    """Endpoint for Telegram; the application is taken from ``app.state``."""
+    router = APIRouter()
+
+    @router.post(WEBHOOK_PATH, include_in_schema=False)
+    async def receive_update(request: Request) -> Response:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token.encode(), secret.encode()):
+            raise HTTPException(status_code=403, detail="Invalid secret token.")
+
+        application: Application = request.app.state.telegram_application
+        update = Update.de_json(await request.json(), application.bot)
+        await application.update_queue.put(update)
+        return Response(status_code=200)
+
+    return router